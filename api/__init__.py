@@ -2,6 +2,17 @@ from api.models.entry import Entry
 from api.repositories.interface_repository import DatabaseInterface
 from api.repositories.postgres_repository import PostgresDB
 from api.routers.journal_router import router as journal_router
+from api.routers.metrics_router import router as metrics_router
+from api.services.cache import CacheBackend, LRUCache
 from api.services.entry_service import EntryService
 
-__all__ = ["DatabaseInterface", "Entry", "EntryService", "PostgresDB", "journal_router"]
+__all__ = [
+    "CacheBackend",
+    "DatabaseInterface",
+    "Entry",
+    "EntryService",
+    "LRUCache",
+    "PostgresDB",
+    "journal_router",
+    "metrics_router",
+]
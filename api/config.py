@@ -33,6 +33,243 @@ class Settings(BaseSettings):
         description="Provider model ID or deployment name passed to responses.create().",
     )
 
+    openai_timeout_seconds: float = Field(
+        default=60.0,
+        gt=0,
+        description="Seconds an LLM request may take (per attempt) before it is abandoned.",
+    )
+    openai_connect_timeout_seconds: float = Field(
+        default=5.0,
+        gt=0,
+        description="Seconds allowed to establish a connection to the LLM provider.",
+    )
+    openai_max_retries: int = Field(
+        default=0,
+        ge=0,
+        description=(
+            "Times the OpenAI SDK itself retries failed requests. Retries are "
+            "normally left to the API's own policy (llm_retry_*)."
+        ),
+    )
+    openai_max_connections: int = Field(
+        default=20,
+        ge=1,
+        description="Upper bound on concurrent HTTP connections held by the shared LLM client.",
+    )
+    openai_max_keepalive_connections: int = Field(
+        default=10,
+        ge=0,
+        description="Idle connections the shared LLM client keeps open for reuse.",
+    )
+    openai_keepalive_expiry_seconds: float = Field(
+        default=30.0,
+        ge=0,
+        description="Seconds an idle LLM connection is kept before being closed.",
+    )
+
+    llm_retry_attempts: int = Field(
+        default=3,
+        ge=0,
+        description=(
+            "Times an LLM call is retried after a connection error, timeout, "
+            "408/409/429 or 5xx response."
+        ),
+    )
+    llm_retry_base_delay_seconds: float = Field(
+        default=0.5,
+        gt=0,
+        description="Base of the jittered exponential backoff between LLM retries.",
+    )
+    llm_retry_max_delay_seconds: float = Field(
+        default=20.0,
+        gt=0,
+        description=(
+            "Longest wait before an LLM retry; a longer Retry-After from the "
+            "provider fails the call instead."
+        ),
+    )
+    llm_breaker_failure_threshold: int = Field(
+        default=5,
+        ge=1,
+        description="Consecutive LLM provider failures that open the circuit breaker.",
+    )
+    llm_breaker_reset_seconds: float = Field(
+        default=30.0,
+        gt=0,
+        description="Seconds the circuit stays open before a single trial call is let through.",
+    )
+    llm_hedge_percentile: float = Field(
+        default=0,
+        ge=0,
+        lt=100,
+        description=(
+            "Send a duplicate LLM request when the first is slower than this "
+            "percentile of recent latencies (0 disables hedging)."
+        ),
+    )
+    llm_hedge_min_samples: int = Field(
+        default=20,
+        ge=1,
+        description="Successful LLM calls observed before hedging starts.",
+    )
+    llm_requests_per_minute: int = Field(
+        default=0,
+        ge=0,
+        description="Client-side cap on LLM requests per minute (0 disables it).",
+    )
+    llm_tokens_per_minute: int = Field(
+        default=0,
+        ge=0,
+        description=(
+            "Client-side cap on estimated LLM tokens (prompt and output) per minute "
+            "(0 disables it)."
+        ),
+    )
+    llm_rate_limit_max_wait_seconds: float = Field(
+        default=10.0,
+        ge=0,
+        description=(
+            "Longest an LLM call queues for rate-limit capacity before the API answers 429 instead."
+        ),
+    )
+
+    db_pool_min_size: int = Field(
+        default=2,
+        ge=0,
+        description="Connections the shared asyncpg pool opens at startup and keeps warm.",
+    )
+    db_pool_max_size: int = Field(
+        default=10,
+        ge=1,
+        description="Upper bound on concurrent connections held by the shared pool.",
+    )
+    db_pool_max_inactive_connection_lifetime: float = Field(
+        default=300.0,
+        ge=0,
+        description="Seconds an idle pooled connection is kept before being closed (0 disables).",
+    )
+    db_statement_cache_size: int = Field(
+        default=100,
+        ge=0,
+        description=(
+            "Prepared statements cached per connection. Set to 0 when running behind "
+            "a transaction-mode pooler such as PgBouncer."
+        ),
+    )
+    db_pool_close_timeout: float = Field(
+        default=10.0,
+        gt=0,
+        description=(
+            "Seconds to wait on shutdown for in-flight queries to release their "
+            "connections before the pool is terminated."
+        ),
+    )
+
+    export_prefetch_rows: int = Field(
+        default=500,
+        ge=1,
+        description="Rows fetched per round trip by the server-side cursor behind /entries/export.",
+    )
+    bulk_max_items: int = Field(
+        default=50_000,
+        ge=1,
+        description="Maximum number of entries accepted by a single POST /entries/bulk request.",
+    )
+
+    entry_cache_max_size: int = Field(
+        default=10_000,
+        ge=0,
+        description="Entries kept in the in-process read-through cache (0 disables it).",
+    )
+    entry_cache_ttl_seconds: float = Field(
+        default=60.0,
+        gt=0,
+        description=(
+            "Seconds a cached entry stays valid. Bounds staleness when several "
+            "API processes each hold their own cache."
+        ),
+    )
+
+    analysis_cache_max_size: int = Field(
+        default=1_000,
+        ge=0,
+        description=(
+            "LLM analyses kept in memory in front of the analysis_cache table "
+            "(0 disables the in-memory tier)."
+        ),
+    )
+    analysis_cache_ttl_seconds: float = Field(
+        default=3600.0,
+        gt=0,
+        description="Seconds an analysis stays in the in-memory tier.",
+    )
+
+    analysis_batch_max_items: int = Field(
+        default=1_000,
+        ge=1,
+        description="Maximum number of entries a single POST /entries/analyze-batch may analyze.",
+    )
+    analysis_batch_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="LLM calls a single analyze-batch request keeps in flight at once.",
+    )
+    analysis_item_timeout_seconds: float = Field(
+        default=60.0,
+        gt=0,
+        description="Seconds one entry's analysis may take in a batch before it is reported as failed.",
+    )
+
+    analysis_pack_token_budget: int = Field(
+        default=4_000,
+        ge=0,
+        description=(
+            "Estimated input tokens per LLM call when analyze-batch packs several "
+            "entries into one prompt (0 sends one entry per call)."
+        ),
+    )
+    analysis_pack_max_entries: int = Field(
+        default=10,
+        ge=1,
+        description="Most entries packed into a single LLM call by analyze-batch.",
+    )
+
+    job_workers: int = Field(
+        default=2,
+        ge=0,
+        description=(
+            "Background tasks per API process running analyses queued with ?async=true "
+            "(0 leaves the queue to other processes)."
+        ),
+    )
+    job_poll_interval_seconds: float = Field(
+        default=1.0,
+        gt=0,
+        description="Seconds an idle worker waits before checking the job table again.",
+    )
+    job_stale_after_seconds: float = Field(
+        default=600.0,
+        gt=0,
+        description=(
+            "Seconds after which a running job is assumed orphaned by a stopped "
+            "process and queued again on startup."
+        ),
+    )
+    job_max_attempts: int = Field(
+        default=3,
+        ge=1,
+        description="Times an orphaned job is retried before it is marked failed.",
+    )
+
+    analytics_refresh_interval_seconds: float = Field(
+        default=300.0,
+        ge=0,
+        description=(
+            "Seconds between refreshes of the /analytics rollups, which are at most "
+            "this stale (0 leaves refreshing to other processes or cron)."
+        ),
+    )
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
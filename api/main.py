@@ -1,6 +1,19 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from api.config import get_settings
+from api.repositories.postgres_repository import close_pool, create_pool
+from api.routers.analytics_router import router as analytics_router
+from api.routers.jobs_router import router as jobs_router
 from api.routers.journal_router import router as journal_router
+from api.routers.metrics_router import router as metrics_router
+from api.services.analytics_service import AnalyticsRefresher
+from api.services.cache import LRUCache
+from api.services.job_service import JobWorker
+from api.services.llm_service import create_client
+from api.services.resilience import create_guard
 
 # TODO (Task 1): Configure logging here.
 # Reference: https://docs.python.org/3/howto/logging.html
@@ -9,8 +22,60 @@ from api.routers.journal_router import router as journal_router
 #   2. Call ``logging.basicConfig(level=logging.INFO, format="...")``.
 #   3. Log an INFO message on startup (e.g. "Journal API starting up").
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Open shared resources on startup and release them on shutdown.
+
+    The asyncpg pool is stored on ``app.state.db_pool`` and borrowed by
+    ``get_entry_service`` for every request, together with the entry cache
+    on ``app.state.entry_cache``. ``app.state.analysis_cache`` is the
+    in-memory tier in front of the persistent LLM analysis cache, and
+    ``app.state.openai_client`` the LLM client shared by every analysis,
+    with ``app.state.llm_guard`` applying rate limits, retries and the
+    circuit breaker.
+    ``app.state.job_worker`` runs analyses queued with ``?async=true`` and
+    ``app.state.analytics_refresher`` keeps the ``/analytics`` rollups fresh.
+    """
+    settings = get_settings()
+    app.state.entry_cache = (
+        LRUCache(settings.entry_cache_max_size, settings.entry_cache_ttl_seconds)
+        if settings.entry_cache_max_size
+        else None
+    )
+    app.state.analysis_cache = (
+        LRUCache(settings.analysis_cache_max_size, settings.analysis_cache_ttl_seconds)
+        if settings.analysis_cache_max_size
+        else None
+    )
+    app.state.openai_client = create_client(settings)
+    app.state.llm_guard = create_guard(settings)
+    app.state.db_pool = await create_pool(settings)
+    app.state.job_worker = JobWorker(
+        app.state.db_pool,
+        settings,
+        client=app.state.openai_client,
+        guard=app.state.llm_guard,
+        cache=app.state.analysis_cache,
+    )
+    await app.state.job_worker.start()
+    app.state.analytics_refresher = AnalyticsRefresher(app.state.db_pool, settings)
+    await app.state.analytics_refresher.start()
+    try:
+        yield
+    finally:
+        await app.state.analytics_refresher.stop()
+        await app.state.job_worker.stop()
+        await close_pool(app.state.db_pool, settings.db_pool_close_timeout)
+        await app.state.openai_client.close()
+
+
 app = FastAPI(
     title="Journal API",
     description="A simple journal API for tracking daily work, struggles, and intentions",
+    lifespan=lifespan,
 )
 app.include_router(journal_router)
+app.include_router(jobs_router)
+app.include_router(analytics_router)
+app.include_router(metrics_router)
@@ -1,7 +1,8 @@
 from datetime import UTC, datetime
+from typing import Self
 from uuid import uuid4
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class AnalysisResponse(BaseModel):
@@ -57,6 +58,46 @@ class EntryCreate(BaseModel):
 # and use it as the type of the PATCH endpoint's request body.
 
 
+class EntryIdsRequest(BaseModel):
+    """Request body for endpoints that act on several entries at once."""
+
+    ids: list[str] = Field(
+        min_length=1,
+        max_length=1000,
+        description="IDs of the entries to act on (duplicates are ignored).",
+    )
+
+
+class AnalyzeBatchRequest(BaseModel):
+    """Request body for POST /entries/analyze-batch.
+
+    Entries are selected either by ``ids`` or by a ``created_after`` /
+    ``created_before`` range, but not both.
+    """
+
+    ids: list[str] | None = Field(
+        default=None,
+        min_length=1,
+        description=(
+            "IDs of the entries to analyze (duplicates are ignored); at most "
+            "ANALYSIS_BATCH_MAX_ITEMS."
+        ),
+    )
+    created_after: datetime | None = Field(
+        default=None, description="Analyze entries created at or after this time."
+    )
+    created_before: datetime | None = Field(
+        default=None, description="Analyze entries created before this time."
+    )
+
+    @model_validator(mode="after")
+    def check_one_selector(self) -> Self:
+        has_range = self.created_after is not None or self.created_before is not None
+        if (self.ids is not None) == has_range:
+            raise ValueError("Provide either ids or a created_after/created_before range")
+        return self
+
+
 class Entry(BaseModel):
     id: str = Field(
         default_factory=lambda: str(uuid4()), description="Unique identifier for the entry (UUID)."
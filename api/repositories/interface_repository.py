@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Collection
+from datetime import date, datetime
 from typing import Any
 
 
@@ -11,26 +13,298 @@ class DatabaseInterface(ABC):
         pass
 
     @abstractmethod
-    async def get_all_entries(self) -> list[dict[str, Any]]:
-        """Retrieve all journal entries."""
+    async def create_entries(self, entries: list[dict[str, Any]]) -> int:
+        """Create many journal entries atomically and return how many were written.
+
+        Each entry must already carry its ``id``, ``created_at`` and
+        ``updated_at``. Either every entry is written or none are.
+        """
+        pass
+
+    @abstractmethod
+    async def get_all_entries(
+        self,
+        include_analysis: bool = False,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        updated_since: datetime | None = None,
+        descending: bool = False,
+        fields: Collection[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Retrieve all journal entries ordered by ``(created_at, id)``.
+
+        With ``include_analysis`` each entry carries its stored analysis (or
+        ``None``) under ``"analysis"``, fetched in the same query. The
+        optional filters keep entries created in ``[created_after,
+        created_before)`` and updated at or after ``updated_since``;
+        ``descending`` lists the newest first. ``fields`` limits which entry
+        fields are selected; ``id``, ``created_at`` and ``updated_at`` are
+        always included. Unknown fields raise ``ValueError``.
+        """
+        pass
+
+    @abstractmethod
+    def iter_entries(self, prefetch: int = 500) -> AsyncIterator[dict[str, Any]]:
+        """Stream every journal entry ordered by ``created_at``.
+
+        Implementations should fetch rows incrementally (at most ``prefetch``
+        at a time) so memory use does not grow with the table.
+        """
+        pass
+
+    @abstractmethod
+    async def get_entries_page(
+        self,
+        limit: int,
+        after: tuple[datetime, str] | None = None,
+        before: tuple[datetime, str] | None = None,
+        include_analysis: bool = False,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        updated_since: datetime | None = None,
+        descending: bool = False,
+        fields: Collection[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Retrieve up to ``limit`` entries ordered by ``(created_at, id)``.
+
+        ``after`` and ``before`` are ``(created_at, id)`` keys; only entries
+        strictly after (or before) the key in listing order are returned. The
+        result is always in listing order: ascending, or newest first with
+        ``descending``. The other arguments are as for ``get_all_entries``.
+        """
+        pass
+
+    @abstractmethod
+    async def count_entries(self) -> int:
+        """Return the total number of journal entries."""
+        pass
+
+    @abstractmethod
+    async def get_entry(
+        self,
+        entry_id: str,
+        include_analysis: bool = False,
+        fields: Collection[str] | None = None,
+    ) -> dict[str, Any] | None:
+        """Retrieve a specific journal entry by ID, optionally with its stored analysis.
+
+        ``fields`` is as for ``get_all_entries``.
+        """
+        pass
+
+    @abstractmethod
+    async def get_entry_updated_at(self, entry_id: str) -> datetime | None:
+        """Return an entry's ``updated_at`` without loading it, or ``None`` if missing."""
+        pass
+
+    @abstractmethod
+    async def get_entries_summary(
+        self,
+        include_analysis: bool = False,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        updated_since: datetime | None = None,
+    ) -> dict[str, Any]:
+        """Return ``{"count": int, "last_updated": datetime | None}`` for the entries
+        matching the filters of ``get_all_entries``.
+
+        With ``include_analysis`` the latest analysis time is added as
+        ``"last_analyzed"``.
+        """
+        pass
+
+    @abstractmethod
+    async def get_entries(self, entry_ids: list[str]) -> list[dict[str, Any]]:
+        """Retrieve every existing entry in ``entry_ids`` at once, in no particular order."""
+        pass
+
+    @abstractmethod
+    async def search_entries(
+        self,
+        query: str,
+        limit: int,
+        after: tuple[float, str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Full-text search entries, best match first.
+
+        ``query`` uses web search syntax (``"quoted phrases"``, ``or``,
+        ``-excluded``). Each result is an entry plus its ``rank`` and
+        ``highlights``, a dict of the matched fields, HTML-escaped, with
+        matches wrapped in ``<mark>`` tags. Results are ordered by ``(rank DESC, id)``; ``after``
+        is the ``(rank, id)`` key of the last result already seen.
+        """
+        pass
+
+    @abstractmethod
+    async def get_entries_created_between(
+        self,
+        created_after: datetime | None,
+        created_before: datetime | None,
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        """Retrieve up to ``limit`` entries created in ``[created_after, created_before)``.
+
+        Either bound may be ``None`` to leave that side open. Entries are
+        returned oldest first.
+        """
         pass
 
     @abstractmethod
-    async def get_entry(self, entry_id: str) -> dict[str, Any] | None:
-        """Retrieve a specific journal entry by ID."""
+    async def update_entry(
+        self,
+        entry_id: str,
+        updated_data: dict[str, Any],
+        expected_updated_at: datetime | None = None,
+    ) -> dict[str, Any] | None:
+        """Partially update a journal entry in one atomic operation.
+
+        Only the fields present in ``updated_data`` change (``updated_at`` is
+        required). When ``expected_updated_at`` is given the update only
+        applies if the entry still has that version. Returns the updated
+        entry, or ``None`` if nothing matched.
+        """
         pass
 
     @abstractmethod
-    async def update_entry(self, entry_id: str, updated_data: dict[str, Any]) -> None:
-        """Update an existing journal entry."""
+    async def delete_entry(
+        self, entry_id: str, expected_updated_at: datetime | None = None
+    ) -> bool:
+        """Delete a specific journal entry and report whether a row was deleted.
+
+        When ``expected_updated_at`` is given the entry is only deleted if it
+        still has that version.
+        """
         pass
 
     @abstractmethod
-    async def delete_entry(self, entry_id: str) -> None:
-        """Delete a specific journal entry."""
+    async def delete_entries(self, entry_ids: list[str]) -> list[str]:
+        """Delete every entry in ``entry_ids`` at once and return the IDs that existed."""
         pass
 
     @abstractmethod
     async def delete_all_entries(self) -> None:
         """Delete all journal entries."""
         pass
+
+    @abstractmethod
+    async def get_entry_stats(
+        self, since: date | None = None, until: date | None = None
+    ) -> dict[str, Any]:
+        """Return aggregate statistics about entries, bucketed by UTC day.
+
+        The result has ``total_entries``, ``first_entry_at``,
+        ``last_entry_at``, ``current_streak`` (consecutive days with entries
+        up to today or yesterday), ``longest_streak`` and ``days``, a list of
+        ``{"day": date, "count": int}`` for days with entries in ``[since,
+        until]``, oldest first.
+        """
+        pass
+
+    @abstractmethod
+    async def rebuild_entry_stats(self) -> int:
+        """Recompute the statistics ``get_entry_stats`` reads; return the number of days."""
+        pass
+
+    @abstractmethod
+    async def get_cached_analysis(self, cache_key: str) -> dict[str, Any] | None:
+        """Retrieve a stored LLM analysis by its content address."""
+        pass
+
+    @abstractmethod
+    async def get_cached_analyses(self, cache_keys: list[str]) -> dict[str, dict[str, Any]]:
+        """Retrieve every stored LLM analysis in ``cache_keys`` at once, keyed by cache key."""
+        pass
+
+    @abstractmethod
+    async def save_cached_analysis(
+        self, cache_key: str, model: str, prompt_version: str, result: dict[str, Any]
+    ) -> None:
+        """Store an LLM analysis under its content address, keeping any existing result."""
+        pass
+
+    @abstractmethod
+    async def delete_all_cached_analyses(self) -> None:
+        """Delete every stored LLM analysis."""
+        pass
+
+    @abstractmethod
+    async def create_job(self, job_data: dict[str, Any]) -> dict[str, Any]:
+        """Queue an analysis job for ``job_data["entry_id"]``."""
+        pass
+
+    @abstractmethod
+    async def get_job(self, job_id: str) -> dict[str, Any] | None:
+        """Retrieve an analysis job by ID."""
+        pass
+
+    @abstractmethod
+    async def claim_job(self) -> dict[str, Any] | None:
+        """Mark the oldest queued job as running and return it, or ``None`` if none is queued.
+
+        Safe to call from many workers at once: each job is handed out once.
+        """
+        pass
+
+    @abstractmethod
+    async def finish_job(
+        self,
+        job_id: str,
+        status: str,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Record the outcome of a claimed job (or put it back with ``status="queued"``)."""
+        pass
+
+    @abstractmethod
+    async def requeue_stale_jobs(self, stale_after_seconds: float, max_attempts: int) -> int:
+        """Requeue running jobs whose worker stopped updating them.
+
+        Jobs that have already been attempted ``max_attempts`` times are
+        failed instead. Returns the number of jobs changed.
+        """
+        pass
+
+    @abstractmethod
+    async def save_entry_analysis(self, analysis: dict[str, Any]) -> None:
+        """Store ``analysis`` as the latest analysis of ``analysis["entry_id"]``.
+
+        Does nothing if the entry no longer exists.
+        """
+        pass
+
+    @abstractmethod
+    async def get_entry_analysis(self, entry_id: str) -> dict[str, Any] | None:
+        """Retrieve the latest stored analysis of an entry."""
+        pass
+
+    @abstractmethod
+    async def get_sentiment_trend(
+        self, period: str = "day", since: date | None = None, until: date | None = None
+    ) -> list[dict[str, Any]]:
+        """Return ``{"start": date, "sentiment": str, "count": int}`` rows of stored
+        analyses per ``day`` or ISO ``week`` of entry creation (UTC), oldest first.
+
+        Read from a periodically refreshed rollup (see ``refresh_analytics``).
+        """
+        pass
+
+    @abstractmethod
+    async def get_top_topics(
+        self, limit: int, since: date | None = None, until: date | None = None
+    ) -> list[dict[str, Any]]:
+        """Return the ``limit`` most frequent ``{"topic": str, "count": int}`` of stored
+        analyses for entries created in ``[since, until]``, most frequent first.
+
+        Read from a periodically refreshed rollup (see ``refresh_analytics``).
+        """
+        pass
+
+    @abstractmethod
+    async def refresh_analytics(self) -> bool:
+        """Recompute the analytics rollups without blocking readers.
+
+        Returns ``False`` without doing anything if another process is
+        already refreshing them.
+        """
+        pass
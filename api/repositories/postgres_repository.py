@@ -1,16 +1,237 @@
+import asyncio
+import html
 import json
+import logging
 import uuid
-from datetime import datetime
+from collections.abc import AsyncIterator, Collection
+from datetime import date, datetime
 from typing import Any
 
 import asyncpg
 
+from api.config import Settings
 from api.repositories.interface_repository import DatabaseInterface
 
+try:
+    import orjson
+except ImportError:  # optional speedup, see the ``fast`` extra
+    orjson = None
+
+logger = logging.getLogger("journal")
+
+# Select expression of each entry field, in response order. Rows written
+# before the typed columns existed only carry their text inside ``data``, so
+# fall back to it until the backfill in database_setup.sql has run everywhere.
+ENTRY_FIELDS = {
+    "id": "id",
+    "work": "COALESCE(work, data->>'work') AS work",
+    "struggle": "COALESCE(struggle, data->>'struggle') AS struggle",
+    "intention": "COALESCE(intention, data->>'intention') AS intention",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+
+# Fields every projection keeps: they are small and needed for cursors,
+# validators and cache keys.
+KEY_FIELDS = ("id", "created_at", "updated_at")
+
+# Select list shared by every full entry read.
+ENTRY_COLUMNS = ",\n    ".join(ENTRY_FIELDS.values())
+
+# ts_headline marks matches with these private-use characters instead of
+# HTML, so the entry text around them can be escaped before they become
+# ``<mark>`` tags.
+_HIGHLIGHT_START = "\ue000"
+_HIGHLIGHT_STOP = "\ue001"
+_HIGHLIGHT_OPTIONS = f"StartSel={_HIGHLIGHT_START}, StopSel={_HIGHLIGHT_STOP}"
+
+# Below this many rows a pipelined executemany beats the fixed setup cost of COPY.
+COPY_MIN_ROWS = 100
+
+# Fields of a stored analysis embedded in entries as ``entry["analysis"]``.
+ANALYSIS_FIELDS = ("sentiment", "summary", "topics", "created_at")
+
+JOB_COLUMNS = "id, entry_id, status, result, error, attempts, created_at, updated_at"
+
+# Bucket expressions over a rollup's ``day`` column.
+ANALYTICS_BUCKETS = {"day": "day", "week": "date_trunc('week', day)::date"}
+
+# Advisory lock key that lets one API process at a time refresh the rollups.
+ANALYTICS_REFRESH_LOCK = 0x6A6F75726E616C  # "journal"
+
+
+# Version byte that prefixes the jsonb binary wire format.
+_JSONB_FORMAT_VERSION = b"\x01"
+
+
+def _entry_columns(fields: Collection[str] | None) -> str:
+    """Select list for ``fields`` (plus ``KEY_FIELDS``), or every field for ``None``.
+
+    Raises:
+        ValueError: If a field is unknown.
+    """
+    if fields is None:
+        return ENTRY_COLUMNS
+    unknown = set(fields) - ENTRY_FIELDS.keys()
+    if unknown:
+        raise ValueError(f"Unknown entry fields: {', '.join(sorted(unknown))}")
+    return ", ".join(
+        column for field, column in ENTRY_FIELDS.items() if field in KEY_FIELDS or field in fields
+    )
+
+
+def _entries_source(include_analysis: bool, fields: Collection[str] | None = None) -> str:
+    """Select list and FROM clause for entry queries.
+
+    ``fields`` projects the entry columns (see ``_entry_columns``). With
+    ``include_analysis`` the stored analysis is LEFT JOINed in the same
+    query, as ``analysis_*`` columns that ``_row_to_entry`` nests.
+    """
+    columns = _entry_columns(fields)
+    if not include_analysis:
+        return f"{columns} FROM entries"
+    return f"""{columns},
+        a.sentiment AS analysis_sentiment,
+        a.summary AS analysis_summary,
+        a.topics AS analysis_topics,
+        a.analyzed_at AS analysis_created_at
+    FROM entries LEFT JOIN entry_analyses a ON a.entry_id = entries.id"""
+
+
+def _entry_conditions(
+    args: list[Any],
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    updated_since: datetime | None = None,
+) -> list[str]:
+    """SQL conditions for the listing filters that are set, appending their values to ``args``.
+
+    Filters that are not set are left out of the statement instead of being
+    written as ``$n IS NULL OR ...``, so every combination gets a plan that
+    can use idx_entries_created_at / idx_entries_updated_at.
+    """
+    conditions = []
+    for condition, value in (
+        ("created_at >= ${}", created_after),
+        ("created_at < ${}", created_before),
+        ("updated_at >= ${}", updated_since),
+    ):
+        if value is not None:
+            args.append(value)
+            conditions.append(condition.format(len(args)))
+    return conditions
+
+
+def _where(conditions: list[str]) -> str:
+    return f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+
+def _day_conditions(args: list[Any], since: date | None, until: date | None) -> list[str]:
+    conditions = []
+    if since is not None:
+        args.append(since)
+        conditions.append(f"day >= ${len(args)}")
+    if until is not None:
+        args.append(until)
+        conditions.append(f"day <= ${len(args)}")
+    return conditions
+
+
+def _highlight(headline: str | None) -> str | None:
+    """HTML-escape a ``ts_headline`` result, then turn its sentinels into ``<mark>`` tags."""
+    if headline is None:
+        return None
+    return (
+        html.escape(headline, quote=False)
+        .replace(_HIGHLIGHT_START, "<mark>")
+        .replace(_HIGHLIGHT_STOP, "</mark>")
+    )
+
+
+def _json_dumps(value: Any) -> str:
+    return json.dumps(value, default=PostgresDB.datetime_serialize)
+
+
+def _jsonb_encode(value: Any) -> bytes:
+    return _JSONB_FORMAT_VERSION + orjson.dumps(value)
+
+
+def _jsonb_decode(data: bytes) -> Any:
+    return orjson.loads(data[1:])
+
+
+async def init_connection(conn: asyncpg.Connection) -> None:
+    """Per-connection setup run by the pool for every new connection.
+
+    Registers codecs so ``json``/``jsonb`` values are exchanged as Python
+    objects: rows arrive already decoded and parameters can be passed as
+    dicts/lists instead of pre-serialized strings. With ``orjson`` installed
+    (the ``fast`` extra) the codecs use binary format, which also keeps
+    ``copy_records_to_table`` working for JSONB columns. Without it they use
+    text format and the standard library, which costs the same as parsing
+    the text by hand; a binary stdlib codec would be slower on reads.
+    """
+    if orjson is None:
+        for type_name in ("json", "jsonb"):
+            await conn.set_type_codec(
+                type_name, encoder=_json_dumps, decoder=json.loads, schema="pg_catalog"
+            )
+        return
+    await conn.set_type_codec(
+        "json", encoder=orjson.dumps, decoder=orjson.loads, schema="pg_catalog", format="binary"
+    )
+    await conn.set_type_codec(
+        "jsonb", encoder=_jsonb_encode, decoder=_jsonb_decode, schema="pg_catalog", format="binary"
+    )
+
+
+async def create_pool(settings: Settings) -> asyncpg.Pool:
+    """Create the application-wide connection pool described by ``settings``.
+
+    The pool is opened once in the FastAPI lifespan and shared by every
+    request, so connection setup and authentication are paid at startup
+    rather than on each HTTP call.
+    """
+    pool = await asyncpg.create_pool(
+        settings.database_url,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        max_inactive_connection_lifetime=settings.db_pool_max_inactive_connection_lifetime,
+        statement_cache_size=settings.db_statement_cache_size,
+        init=init_connection,
+    )
+    logger.info(
+        "Database pool ready (min_size=%d, max_size=%d)",
+        settings.db_pool_min_size,
+        settings.db_pool_max_size,
+    )
+    return pool
+
+
+async def close_pool(pool: asyncpg.Pool, grace_period: float) -> None:
+    """Drain ``pool`` gracefully, terminating it if connections are not released in time."""
+    try:
+        async with asyncio.timeout(grace_period):
+            await pool.close()
+    except TimeoutError:
+        logger.warning("Database pool did not drain within %.1fs; terminating", grace_period)
+        pool.terminate()
+    else:
+        logger.info("Database pool closed")
+
 
 class PostgresDB(DatabaseInterface):
-    def __init__(self, database_url: str) -> None:
+    def __init__(self, database_url: str, pool: asyncpg.Pool | None = None) -> None:
+        """Create a repository bound to ``database_url``.
+
+        When ``pool`` is given the repository borrows it and leaves its
+        lifecycle to the owner; otherwise a private pool is opened on
+        ``__aenter__`` and closed on ``__aexit__``.
+        """
         self._database_url = database_url
+        self._owns_pool = pool is None
+        if pool is not None:
+            self.pool = pool
 
     @staticmethod
     def datetime_serialize(obj):
@@ -19,95 +240,598 @@ class PostgresDB(DatabaseInterface):
             return obj.isoformat()
         raise TypeError(f"Type {type(obj)} not serializable")
 
+    @staticmethod
+    def _row_to_entry(row: asyncpg.Record) -> dict[str, Any]:
+        """Convert a row selected with ``ENTRY_COLUMNS`` into the API's entry dict."""
+        entry = dict(row)
+        if "analysis_created_at" in entry:
+            analysis = {field: entry.pop(f"analysis_{field}") for field in ANALYSIS_FIELDS}
+            entry["analysis"] = analysis if analysis["created_at"] is not None else None
+        return entry
+
     async def __aenter__(self):
-        self.pool = await asyncpg.create_pool(self._database_url)
+        if self._owns_pool:
+            self.pool = await asyncpg.create_pool(self._database_url, init=init_connection)
         return self
 
     async def __aexit__(self, exc_type, exc_value, traceback):
-        await self.pool.close()
+        if self._owns_pool:
+            await self.pool.close()
 
     async def create_entry(self, entry_data: dict[str, Any]) -> dict[str, Any]:
         async with self.pool.acquire() as conn:
-            query = """
-            INSERT INTO entries (id, data, created_at, updated_at)
-            VALUES ($1, $2, $3, $4)
-            RETURNING *
+            query = f"""
+            INSERT INTO entries (id, work, struggle, intention, created_at, updated_at)
+            VALUES ($1, $2, $3, $4, $5, $6)
+            RETURNING {ENTRY_COLUMNS}
             """
             entry_id = entry_data.get("id") or str(uuid.uuid4())
-            data_json = json.dumps(entry_data, default=PostgresDB.datetime_serialize)
 
             row = await conn.fetchrow(
-                query, entry_id, data_json, entry_data["created_at"], entry_data["updated_at"]
+                query,
+                entry_id,
+                entry_data["work"],
+                entry_data["struggle"],
+                entry_data["intention"],
+                entry_data["created_at"],
+                entry_data["updated_at"],
             )
 
-            # Return a clean entry format without duplication
             if row:
-                data = json.loads(row["data"])
-                return {
-                    "id": row["id"],
-                    "work": data["work"],
-                    "struggle": data["struggle"],
-                    "intention": data["intention"],
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                }
+                return self._row_to_entry(row)
             return {}
 
-    async def get_all_entries(self) -> list[dict[str, Any]]:
-        async with self.pool.acquire() as conn:
-            query = "SELECT * FROM entries"
-            rows = await conn.fetch(query)
-            entries = []
-            for row in rows:
-                data = json.loads(row["data"])
-                entries.append(
-                    {
-                        "id": row["id"],
-                        "work": data["work"],
-                        "struggle": data["struggle"],
-                        "intention": data["intention"],
-                        "created_at": row["created_at"],
-                        "updated_at": row["updated_at"],
-                    }
+    async def create_entries(self, entries: list[dict[str, Any]]) -> int:
+        records = [
+            (
+                entry["id"],
+                entry["work"],
+                entry["struggle"],
+                entry["intention"],
+                entry["created_at"],
+                entry["updated_at"],
+            )
+            for entry in entries
+        ]
+        if not records:
+            return 0
+
+        async with self.pool.acquire() as conn, conn.transaction():
+            if len(records) >= COPY_MIN_ROWS:
+                await conn.copy_records_to_table(
+                    "entries",
+                    records=records,
+                    columns=["id", "work", "struggle", "intention", "created_at", "updated_at"],
+                )
+            else:
+                await conn.executemany(
+                    """
+                    INSERT INTO entries (id, work, struggle, intention, created_at, updated_at)
+                    VALUES ($1, $2, $3, $4, $5, $6)
+                    """,
+                    records,
                 )
-            return entries
+        return len(records)
 
-    async def get_entry(self, entry_id: str) -> dict[str, Any] | None:
+    async def get_all_entries(
+        self,
+        include_analysis: bool = False,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        updated_since: datetime | None = None,
+        descending: bool = False,
+        fields: Collection[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        args: list[Any] = []
+        conditions = _entry_conditions(args, created_after, created_before, updated_since)
+        direction = "DESC" if descending else "ASC"
+        query = f"""
+        SELECT {_entries_source(include_analysis, fields)}
+        {_where(conditions)}
+        ORDER BY created_at {direction}, id {direction}
+        """
         async with self.pool.acquire() as conn:
-            query = "SELECT * FROM entries WHERE id = $1"
+            rows = await conn.fetch(query, *args)
+            return [self._row_to_entry(row) for row in rows]
+
+    async def iter_entries(self, prefetch: int = 500) -> AsyncIterator[dict[str, Any]]:
+        # A server-side cursor keeps at most ``prefetch`` rows in memory; the
+        # read-only REPEATABLE READ transaction gives the whole export one
+        # consistent snapshot.
+        async with (
+            self.pool.acquire() as conn,
+            conn.transaction(isolation="repeatable_read", readonly=True),
+        ):
+            query = f"SELECT {ENTRY_COLUMNS} FROM entries ORDER BY created_at, id"
+            async for row in conn.cursor(query, prefetch=prefetch):
+                yield self._row_to_entry(row)
+
+    async def get_entries_page(
+        self,
+        limit: int,
+        after: tuple[datetime, str] | None = None,
+        before: tuple[datetime, str] | None = None,
+        include_analysis: bool = False,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        updated_since: datetime | None = None,
+        descending: bool = False,
+        fields: Collection[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        args: list[Any] = []
+        conditions = _entry_conditions(args, created_after, created_before, updated_since)
+        # Keyset pagination on (created_at, id): the row comparison is served by
+        # idx_entries_created_at, so cost depends on page size, not on offset.
+        # Paging backwards reads the listing in reverse and flips the page.
+        reverse = descending != (before is not None)
+        key = before if before is not None else after
+        if key is not None:
+            args.extend(key)
+            operator = "<" if reverse else ">"
+            conditions.append(f"(created_at, id) {operator} (${len(args) - 1}, ${len(args)})")
+        args.append(limit)
+        direction = "DESC" if reverse else "ASC"
+        query = f"""
+        SELECT {_entries_source(include_analysis, fields)}
+        {_where(conditions)}
+        ORDER BY created_at {direction}, id {direction}
+        LIMIT ${len(args)}
+        """
+
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, *args)
+        entries = [self._row_to_entry(row) for row in rows]
+        if before is not None:
+            entries.reverse()
+        return entries
+
+    async def count_entries(self) -> int:
+        async with self.pool.acquire() as conn:
+            return await conn.fetchval("SELECT count(*) FROM entries")
+
+    async def search_entries(
+        self,
+        query: str,
+        limit: int,
+        after: tuple[float, str] | None = None,
+    ) -> list[dict[str, Any]]:
+        # idx_entries_search finds the matches; ranking needs every match, so
+        # the keyset only saves sorting and fetching rows of earlier pages.
+        # ts_headline re-parses the text, so it runs on the final page only.
+        query_sql = f"""
+        WITH q AS (SELECT websearch_to_tsquery('english', $1) AS query),
+        matches AS (
+            SELECT entries.id, ts_rank_cd(search_vector, q.query) AS rank
+            FROM entries, q
+            WHERE search_vector @@ q.query
+        )
+        SELECT {ENTRY_COLUMNS}, page.rank,
+            ts_headline('english', COALESCE(work, data->>'work'), q.query, $5)
+                AS highlight_work,
+            ts_headline('english', COALESCE(struggle, data->>'struggle'), q.query, $5)
+                AS highlight_struggle,
+            ts_headline('english', COALESCE(intention, data->>'intention'), q.query, $5)
+                AS highlight_intention
+        FROM (
+            SELECT * FROM matches
+            WHERE $2::real IS NULL OR rank < $2 OR (rank = $2 AND id > $3)
+            ORDER BY rank DESC, id
+            LIMIT $4
+        ) page
+        JOIN entries USING (id), q
+        ORDER BY page.rank DESC, page.id
+        """
+        rank, entry_id = after if after is not None else (None, None)
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query_sql, query, rank, entry_id, limit, _HIGHLIGHT_OPTIONS)
+
+        results = []
+        for row in rows:
+            entry = self._row_to_entry(row)
+            entry["highlights"] = {
+                field: _highlight(entry.pop(f"highlight_{field}"))
+                for field in ("work", "struggle", "intention")
+            }
+            results.append(entry)
+        return results
+
+    async def get_entry(
+        self,
+        entry_id: str,
+        include_analysis: bool = False,
+        fields: Collection[str] | None = None,
+    ) -> dict[str, Any] | None:
+        async with self.pool.acquire() as conn:
+            query = f"SELECT {_entries_source(include_analysis, fields)} WHERE id = $1"
             row = await conn.fetchrow(query, entry_id)
 
             if row:
-                data = json.loads(row["data"])
-                return {
-                    "id": row["id"],
-                    "work": data["work"],
-                    "struggle": data["struggle"],
-                    "intention": data["intention"],
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                }
+                return self._row_to_entry(row)
             return None
 
-    async def update_entry(self, entry_id: str, updated_data: dict[str, Any]) -> None:
-        updated_data["id"] = entry_id
+    async def get_entry_updated_at(self, entry_id: str) -> datetime | None:
+        async with self.pool.acquire() as conn:
+            query = "SELECT updated_at FROM entries WHERE id = $1"
+            return await conn.fetchval(query, entry_id)
+
+    async def get_entries_summary(
+        self,
+        include_analysis: bool = False,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        updated_since: datetime | None = None,
+    ) -> dict[str, Any]:
+        args: list[Any] = []
+        where = _where(_entry_conditions(args, created_after, created_before, updated_since))
+        async with self.pool.acquire() as conn:
+            if include_analysis and not args:
+                # Every analysis belongs to an entry, so without filters the
+                # latest one overall is answered from idx_entry_analyses_analyzed_at.
+                query = """
+                SELECT count(*) AS count, max(updated_at) AS last_updated,
+                       (SELECT max(analyzed_at) FROM entry_analyses) AS last_analyzed
+                FROM entries
+                """
+            elif include_analysis:
+                # Only analyses of the matching entries count, as they do when
+                # the listing itself computes its ETag.
+                query = f"""
+                SELECT count(*) AS count, max(e.updated_at) AS last_updated,
+                       max(a.analyzed_at) AS last_analyzed
+                FROM (SELECT id, updated_at FROM entries {where}) e
+                LEFT JOIN entry_analyses a ON a.entry_id = e.id
+                """
+            else:
+                query = f"""
+                SELECT count(*) AS count, max(updated_at) AS last_updated
+                FROM entries {where}
+                """
+            row = await conn.fetchrow(query, *args)
+            return dict(row)
 
-        data_json = json.dumps(updated_data, default=PostgresDB.datetime_serialize)
+    async def get_entries(self, entry_ids: list[str]) -> list[dict[str, Any]]:
+        async with self.pool.acquire() as conn:
+            query = f"SELECT {ENTRY_COLUMNS} FROM entries WHERE id = ANY($1::varchar[])"
+            rows = await conn.fetch(query, entry_ids)
+            return [self._row_to_entry(row) for row in rows]
 
+    async def get_entries_created_between(
+        self,
+        created_after: datetime | None,
+        created_before: datetime | None,
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        async with self.pool.acquire() as conn:
+            query = f"""
+            SELECT {ENTRY_COLUMNS} FROM entries
+            WHERE ($1::timestamptz IS NULL OR created_at >= $1)
+              AND ($2::timestamptz IS NULL OR created_at < $2)
+            ORDER BY created_at, id
+            LIMIT $3
+            """
+            rows = await conn.fetch(query, created_after, created_before, limit)
+            return [self._row_to_entry(row) for row in rows]
+
+    async def update_entry(
+        self,
+        entry_id: str,
+        updated_data: dict[str, Any],
+        expected_updated_at: datetime | None = None,
+    ) -> dict[str, Any] | None:
+        # Merge in SQL so the read-modify-write happens atomically in a single
+        # round trip. Fields left out of ``updated_data`` keep their value; the
+        # ``data`` fallback also migrates legacy JSON-only rows on first write.
+        # A stored analysis describes the old text, so it is dropped in the
+        # same statement when the text changes.
+        async with self.pool.acquire() as conn:
+            query = f"""
+            WITH previous AS (
+                SELECT id,
+                    COALESCE(work, data->>'work') AS work,
+                    COALESCE(struggle, data->>'struggle') AS struggle,
+                    COALESCE(intention, data->>'intention') AS intention
+                FROM entries
+                WHERE id = $1 AND ($6::timestamptz IS NULL OR updated_at = $6)
+                FOR UPDATE
+            ),
+            updated AS (
+                UPDATE entries
+                SET work = COALESCE($2, previous.work),
+                    struggle = COALESCE($3, previous.struggle),
+                    intention = COALESCE($4, previous.intention),
+                    updated_at = $5
+                FROM previous
+                WHERE entries.id = previous.id
+                RETURNING entries.*,
+                    (entries.work, entries.struggle, entries.intention)
+                        IS DISTINCT FROM (previous.work, previous.struggle, previous.intention)
+                        AS text_changed
+            ),
+            stale_analysis AS (
+                DELETE FROM entry_analyses
+                WHERE entry_id IN (SELECT id FROM updated WHERE text_changed)
+            )
+            SELECT {ENTRY_COLUMNS} FROM updated
+            """
+            row = await conn.fetchrow(
+                query,
+                entry_id,
+                updated_data.get("work"),
+                updated_data.get("struggle"),
+                updated_data.get("intention"),
+                updated_data["updated_at"],
+                expected_updated_at,
+            )
+            if row:
+                return self._row_to_entry(row)
+            return None
+
+    async def delete_entry(
+        self, entry_id: str, expected_updated_at: datetime | None = None
+    ) -> bool:
         async with self.pool.acquire() as conn:
             query = """
-            UPDATE entries
-            SET data = $2, updated_at = $3
-            WHERE id = $1
+            DELETE FROM entries
+            WHERE id = $1 AND ($2::timestamptz IS NULL OR updated_at = $2)
+            RETURNING id
             """
-            await conn.execute(query, entry_id, data_json, updated_data["updated_at"])
+            return await conn.fetchval(query, entry_id, expected_updated_at) is not None
 
-    async def delete_entry(self, entry_id: str) -> None:
+    async def delete_entries(self, entry_ids: list[str]) -> list[str]:
         async with self.pool.acquire() as conn:
-            query = "DELETE FROM entries WHERE id = $1"
-            await conn.execute(query, entry_id)
+            query = "DELETE FROM entries WHERE id = ANY($1::varchar[]) RETURNING id"
+            rows = await conn.fetch(query, entry_ids)
+            return [row["id"] for row in rows]
 
     async def delete_all_entries(self) -> None:
         async with self.pool.acquire() as conn:
             query = "DELETE FROM entries"
             await conn.execute(query)
+
+    async def get_entry_stats(
+        self, since: date | None = None, until: date | None = None
+    ) -> dict[str, Any]:
+        # Everything but first/last (two index probes) comes from
+        # entry_daily_stats, so the cost grows with days, not entries.
+        # Consecutive days share ``day - row_number()``, which numbers the
+        # streaks ("islands").
+        summary_query = """
+        WITH streaks AS (
+            SELECT max(day) AS last_day, count(*) AS length
+            FROM (
+                SELECT day, day - (row_number() OVER (ORDER BY day))::int AS streak
+                FROM entry_daily_stats
+            ) days
+            GROUP BY streak
+        )
+        SELECT
+            (SELECT COALESCE(sum(entry_count), 0) FROM entry_daily_stats) AS total_entries,
+            (SELECT min(created_at) FROM entries) AS first_entry_at,
+            (SELECT max(created_at) FROM entries) AS last_entry_at,
+            COALESCE(
+                (SELECT length FROM streaks
+                 WHERE last_day >= (now() AT TIME ZONE 'UTC')::date - 1
+                 ORDER BY last_day DESC LIMIT 1),
+                0
+            ) AS current_streak,
+            COALESCE((SELECT max(length) FROM streaks), 0) AS longest_streak
+        """
+        args: list[Any] = []
+        conditions = _day_conditions(args, since, until)
+        days_query = f"""
+        SELECT day, entry_count AS count FROM entry_daily_stats
+        {_where(conditions)}
+        ORDER BY day
+        """
+        async with (
+            self.pool.acquire() as conn,
+            conn.transaction(isolation="repeatable_read", readonly=True),
+        ):
+            summary = await conn.fetchrow(summary_query)
+            days = await conn.fetch(days_query, *args)
+        return {**dict(summary), "days": [dict(row) for row in days]}
+
+    async def rebuild_entry_stats(self) -> int:
+        async with self.pool.acquire() as conn, conn.transaction():
+            # SHARE mode lets reads continue but holds off writers, whose
+            # triggers would otherwise race with the recount.
+            await conn.execute("LOCK TABLE entries IN SHARE MODE")
+            await conn.execute("DELETE FROM entry_daily_stats")
+            return await conn.fetchval(
+                """
+                WITH inserted AS (
+                    INSERT INTO entry_daily_stats (day, entry_count)
+                    SELECT (created_at AT TIME ZONE 'UTC')::date, count(*)
+                    FROM entries
+                    GROUP BY 1
+                    RETURNING 1
+                )
+                SELECT count(*) FROM inserted
+                """
+            )
+
+    async def get_cached_analysis(self, cache_key: str) -> dict[str, Any] | None:
+        async with self.pool.acquire() as conn:
+            query = "SELECT result FROM analysis_cache WHERE cache_key = $1"
+            return await conn.fetchval(query, cache_key)
+
+    async def get_cached_analyses(self, cache_keys: list[str]) -> dict[str, dict[str, Any]]:
+        async with self.pool.acquire() as conn:
+            query = (
+                "SELECT cache_key, result FROM analysis_cache WHERE cache_key = ANY($1::bpchar[])"
+            )
+            rows = await conn.fetch(query, cache_keys)
+            return {row["cache_key"]: row["result"] for row in rows}
+
+    async def save_cached_analysis(
+        self, cache_key: str, model: str, prompt_version: str, result: dict[str, Any]
+    ) -> None:
+        # Concurrent misses on the same text race to store identical results,
+        # so the first writer wins and the rest are no-ops.
+        async with self.pool.acquire() as conn:
+            query = """
+            INSERT INTO analysis_cache (cache_key, model, prompt_version, result, created_at)
+            VALUES ($1, $2, $3, $4, now())
+            ON CONFLICT (cache_key) DO NOTHING
+            """
+            await conn.execute(query, cache_key, model, prompt_version, result)
+
+    async def delete_all_cached_analyses(self) -> None:
+        async with self.pool.acquire() as conn:
+            query = "DELETE FROM analysis_cache"
+            await conn.execute(query)
+
+    async def create_job(self, job_data: dict[str, Any]) -> dict[str, Any]:
+        async with self.pool.acquire() as conn:
+            query = f"""
+            INSERT INTO analysis_jobs (id, entry_id, status, created_at, updated_at)
+            VALUES ($1, $2, 'queued', $3, $3)
+            RETURNING {JOB_COLUMNS}
+            """
+            row = await conn.fetchrow(
+                query, job_data["id"], job_data["entry_id"], job_data["created_at"]
+            )
+            return dict(row)
+
+    async def get_job(self, job_id: str) -> dict[str, Any] | None:
+        async with self.pool.acquire() as conn:
+            query = f"SELECT {JOB_COLUMNS} FROM analysis_jobs WHERE id = $1"
+            row = await conn.fetchrow(query, job_id)
+            return dict(row) if row else None
+
+    async def claim_job(self) -> dict[str, Any] | None:
+        # SKIP LOCKED lets concurrent workers pass over a row another worker is
+        # claiming instead of queueing behind its lock.
+        async with self.pool.acquire() as conn:
+            query = f"""
+            UPDATE analysis_jobs
+            SET status = 'running', attempts = attempts + 1, updated_at = now()
+            WHERE id = (
+                SELECT id FROM analysis_jobs
+                WHERE status = 'queued'
+                ORDER BY created_at
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING {JOB_COLUMNS}
+            """
+            row = await conn.fetchrow(query)
+            return dict(row) if row else None
+
+    async def finish_job(
+        self,
+        job_id: str,
+        status: str,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        async with self.pool.acquire() as conn:
+            query = """
+            UPDATE analysis_jobs
+            SET status = $2, result = $3, error = $4, updated_at = now()
+            WHERE id = $1
+            """
+            await conn.execute(query, job_id, status, result, error)
+
+    async def requeue_stale_jobs(self, stale_after_seconds: float, max_attempts: int) -> int:
+        async with self.pool.acquire() as conn:
+            query = """
+            UPDATE analysis_jobs
+            SET status = CASE WHEN attempts >= $2 THEN 'failed' ELSE 'queued' END,
+                error = CASE WHEN attempts >= $2 THEN 'Worker stopped while running the job' END,
+                updated_at = now()
+            WHERE status = 'running' AND updated_at < now() - make_interval(secs => $1)
+            """
+            result = await conn.execute(query, stale_after_seconds, max_attempts)
+            return int(result.split()[-1])
+
+    async def save_entry_analysis(self, analysis: dict[str, Any]) -> None:
+        # The EXISTS guard skips entries deleted while they were being analyzed,
+        # and the WHERE on conflict skips the write when the stored analysis
+        # already came from the same cache entry.
+        async with self.pool.acquire() as conn:
+            query = """
+            INSERT INTO entry_analyses (
+                entry_id, sentiment, summary, topics, model, prompt_version, cache_key, analyzed_at
+            )
+            SELECT $1::varchar, $2, $3, $4::text[], $5, $6, $7, $8::timestamptz
+            WHERE EXISTS (SELECT 1 FROM entries WHERE id = $1)
+            ON CONFLICT (entry_id) DO UPDATE
+            SET sentiment = EXCLUDED.sentiment,
+                summary = EXCLUDED.summary,
+                topics = EXCLUDED.topics,
+                model = EXCLUDED.model,
+                prompt_version = EXCLUDED.prompt_version,
+                cache_key = EXCLUDED.cache_key,
+                analyzed_at = EXCLUDED.analyzed_at
+            WHERE entry_analyses.cache_key IS DISTINCT FROM EXCLUDED.cache_key
+            """
+            await conn.execute(
+                query,
+                analysis["entry_id"],
+                analysis["sentiment"],
+                analysis["summary"],
+                analysis["topics"],
+                analysis["model"],
+                analysis["prompt_version"],
+                analysis["cache_key"],
+                analysis["created_at"],
+            )
+
+    async def get_sentiment_trend(
+        self, period: str = "day", since: date | None = None, until: date | None = None
+    ) -> list[dict[str, Any]]:
+        args: list[Any] = []
+        query = f"""
+        SELECT {ANALYTICS_BUCKETS[period]} AS start, sentiment, sum(entry_count)::int AS count
+        FROM analysis_sentiment_daily
+        {_where(_day_conditions(args, since, until))}
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, *args)
+            return [dict(row) for row in rows]
+
+    async def get_top_topics(
+        self, limit: int, since: date | None = None, until: date | None = None
+    ) -> list[dict[str, Any]]:
+        args: list[Any] = []
+        conditions = _day_conditions(args, since, until)
+        args.append(limit)
+        query = f"""
+        SELECT topic, sum(entry_count)::int AS count
+        FROM analysis_topics_daily
+        {_where(conditions)}
+        GROUP BY topic
+        ORDER BY count DESC, topic
+        LIMIT ${len(args)}
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, *args)
+            return [dict(row) for row in rows]
+
+    async def refresh_analytics(self) -> bool:
+        async with self.pool.acquire() as conn:
+            # Another process refreshing right now makes this run redundant.
+            if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", ANALYTICS_REFRESH_LOCK):
+                return False
+            try:
+                await conn.execute(
+                    "REFRESH MATERIALIZED VIEW CONCURRENTLY analysis_sentiment_daily"
+                )
+                await conn.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY analysis_topics_daily")
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock($1)", ANALYTICS_REFRESH_LOCK)
+            return True
+
+    async def get_entry_analysis(self, entry_id: str) -> dict[str, Any] | None:
+        async with self.pool.acquire() as conn:
+            query = """
+            SELECT entry_id, sentiment, summary, topics, model, prompt_version,
+                   analyzed_at AS created_at
+            FROM entry_analyses
+            WHERE entry_id = $1
+            """
+            row = await conn.fetchrow(query, entry_id)
+            return dict(row) if row else None
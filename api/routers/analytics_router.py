@@ -0,0 +1,54 @@
+from collections.abc import AsyncGenerator
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Request
+
+from api.config import Settings, get_settings
+from api.repositories.postgres_repository import PostgresDB
+from api.services.analytics_service import AnalyticsService
+
+router = APIRouter()
+
+
+async def get_analytics_service(
+    request: Request,
+    settings: Settings = Depends(get_settings),
+) -> AsyncGenerator[AnalyticsService]:
+    pool = getattr(request.app.state, "db_pool", None)
+    async with PostgresDB(settings.database_url, pool=pool) as db:
+        yield AnalyticsService(db)
+
+
+@router.get("/analytics/sentiment")
+async def get_sentiment_trend(
+    period: Literal["day", "week"] = Query("day", description="Bucket size."),
+    since: date | None = Query(None, description="First day (UTC) of entries to include."),
+    until: date | None = Query(None, description="Last day (UTC) of entries to include."),
+    analytics_service: AnalyticsService = Depends(get_analytics_service),
+):
+    """Sentiment of stored analyses over time, by the day (or ISO week) entries were written.
+
+    Each bucket has ``counts`` per sentiment and their ``total``. Served from
+    a rollup refreshed every ``ANALYTICS_REFRESH_INTERVAL_SECONDS``, so new
+    analyses show up after the next refresh; no LLM calls are made.
+    """
+    trend = await analytics_service.sentiment_trend(period, since=since, until=until)
+    return {"period": period, "buckets": trend}
+
+
+@router.get("/analytics/topics")
+async def get_top_topics(
+    limit: int = Query(10, ge=1, le=100, description="Number of topics to return."),
+    since: date | None = Query(None, description="First day (UTC) of entries to include."),
+    until: date | None = Query(None, description="Last day (UTC) of entries to include."),
+    analytics_service: AnalyticsService = Depends(get_analytics_service),
+):
+    """Most frequent topics of stored analyses, most frequent first.
+
+    Topics are compared case-insensitively and reported in lower case.
+    Served from the same periodically refreshed rollups as
+    ``/analytics/sentiment``.
+    """
+    topics = await analytics_service.top_topics(limit, since=since, until=until)
+    return {"topics": topics}
@@ -0,0 +1,85 @@
+"""Helpers for HTTP conditional requests (ETag / Last-Modified validators).
+
+Validators are derived from ``updated_at`` so they can be computed from a
+metadata query without loading or serializing the entry payload.
+"""
+
+import hashlib
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from starlette.datastructures import Headers
+
+
+def make_etag(*parts: object) -> str:
+    """Build a strong ETag from the values that identify a representation."""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def entry_etag(entry_id: str, updated_at: datetime) -> str:
+    return make_etag(entry_id, updated_at.isoformat())
+
+
+def variant_etag(etag: str, *parts: object) -> str:
+    """ETag of another representation (projection, embedded analysis) of ``etag``'s entry.
+
+    The entry's ETag is kept as a prefix, so ``if_match_satisfied`` can
+    still tell which version of the entry the client saw.
+    """
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'{etag[:-1]}-{digest[:16]}"'
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.astimezone(UTC), usegmt=True)
+
+
+def validator_headers(etag: str, last_modified: datetime | None) -> dict[str, str]:
+    """Headers that let clients revalidate the response on their next request."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def _etags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def if_match_satisfied(header: str, etag: str) -> bool:
+    """Evaluate ``If-Match`` using the strong comparison RFC 9110 requires.
+
+    ETags of other representations of the same entry version (see
+    ``variant_etag``) match too.
+    """
+    variant_prefix = f"{etag[:-1]}-"
+    return any(tag in ("*", etag) or tag.startswith(variant_prefix) for tag in _etags(header))
+
+
+def is_not_modified(headers: Headers, etag: str, last_modified: datetime | None) -> bool:
+    """Whether a GET should be answered with ``304 Not Modified``.
+
+    ``If-None-Match`` takes precedence; ``If-Modified-Since`` is only
+    consulted when it is absent, as RFC 9110 specifies.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.removeprefix("W/") for tag in _etags(if_none_match)]
+        return "*" in tags or etag in tags
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except ValueError:
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    # HTTP dates have one-second resolution.
+    return last_modified.replace(microsecond=0) <= since
+
+
+def has_conditional_headers(headers: Headers) -> bool:
+    return "if-none-match" in headers or "if-modified-since" in headers
@@ -0,0 +1,32 @@
+from collections.abc import AsyncGenerator
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from api.config import Settings, get_settings
+from api.repositories.postgres_repository import PostgresDB
+from api.services.job_service import JobService
+
+router = APIRouter()
+
+
+async def get_job_service(
+    request: Request,
+    settings: Settings = Depends(get_settings),
+) -> AsyncGenerator[JobService]:
+    pool = getattr(request.app.state, "db_pool", None)
+    async with PostgresDB(settings.database_url, pool=pool) as db:
+        yield JobService(db)
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, job_service: JobService = Depends(get_job_service)):
+    """Get the status of a background analysis job.
+
+    ``status`` moves from ``queued`` to ``running`` and then to either
+    ``succeeded`` (with the analysis in ``result``) or ``failed`` (with an
+    ``error`` message).
+    """
+    job = await job_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
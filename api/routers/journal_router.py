@@ -1,21 +1,113 @@
-from collections.abc import AsyncGenerator
-
-from fastapi import APIRouter, Depends, HTTPException
+import csv
+import io
+import json
+from collections.abc import AsyncGenerator, AsyncIterator
+from datetime import date, datetime
+from functools import partial
+from typing import Any, Literal
+
+import openai
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from openai import AsyncOpenAI
+from pydantic import ValidationError
 
 from api.config import Settings, get_settings
-from api.models.entry import AnalysisResponse, Entry, EntryCreate
-from api.repositories.postgres_repository import PostgresDB
+from api.models.entry import (
+    AnalysisResponse,
+    AnalyzeBatchRequest,
+    Entry,
+    EntryCreate,
+    EntryIdsRequest,
+)
+from api.repositories.postgres_repository import ENTRY_FIELDS, PostgresDB
+from api.routers.conditional import (
+    entry_etag,
+    has_conditional_headers,
+    if_match_satisfied,
+    is_not_modified,
+    make_etag,
+    validator_headers,
+    variant_etag,
+)
+from api.routers.jobs_router import get_job_service
+from api.services.analysis_service import AnalysisService, entry_text
 from api.services.entry_service import EntryService
-from api.services.llm_service import analyze_journal_entry
+from api.services.job_service import JobService
+from api.services.llm_service import (
+    analysis_tokens,
+    analyze_journal_entries,
+    analyze_journal_entry,
+    batch_analysis_tokens,
+    stream_journal_entry_analysis,
+)
+from api.services.rate_limit import RateLimitedError
+from api.services.resilience import CircuitOpenError, ProviderGuard, retry_after_seconds
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 50
+EXPORT_FIELDS: tuple[str, ...] = ("id", "work", "struggle", "intention", "created_at", "updated_at")
+# Rows buffered into each streamed chunk; small enough that the first bytes
+# go out immediately, large enough to avoid one ASGI message per row.
+EXPORT_FLUSH_ROWS = 200
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
 
 async def get_entry_service(
+    request: Request,
     settings: Settings = Depends(get_settings),
 ) -> AsyncGenerator[EntryService]:
-    async with PostgresDB(settings.database_url) as db:
-        yield EntryService(db)
+    # Borrow the lifespan-managed pool; fall back to a per-request pool when
+    # the app is served without running its lifespan.
+    pool = getattr(request.app.state, "db_pool", None)
+    cache = getattr(request.app.state, "entry_cache", None)
+    async with PostgresDB(settings.database_url, pool=pool) as db:
+        yield EntryService(db, cache=cache)
+
+
+def get_openai_client(request: Request) -> AsyncOpenAI | None:
+    """The LLM client shared for the app's lifetime.
+
+    ``None`` when the app is served without running its lifespan, in which
+    case ``analyze_journal_entry`` builds its own. Override this dependency
+    to inject a mock client in tests.
+    """
+    return getattr(request.app.state, "openai_client", None)
+
+
+async def get_analysis_service(
+    request: Request,
+    settings: Settings = Depends(get_settings),
+    client: AsyncOpenAI | None = Depends(get_openai_client),
+) -> AsyncGenerator[AnalysisService]:
+    pool = getattr(request.app.state, "db_pool", None)
+    cache = getattr(request.app.state, "analysis_cache", None)
+    guard: ProviderGuard | None = getattr(request.app.state, "llm_guard", None)
+    # Resolve the LLM functions per request so they can be patched in tests.
+    analyzer = partial(analyze_journal_entry, client=client)
+    streamer = partial(stream_journal_entry_analysis, client=client)
+    batch_analyzer = partial(analyze_journal_entries, client=client)
+    async with PostgresDB(settings.database_url, pool=pool) as db:
+        if guard is None:
+            yield AnalysisService(
+                db,
+                settings.openai_model,
+                cache=cache,
+                analyzer=analyzer,
+                streamer=streamer,
+                batch_analyzer=batch_analyzer,
+            )
+        else:
+            yield AnalysisService(
+                db,
+                settings.openai_model,
+                cache=cache,
+                analyzer=guard.wrap(analyzer, cost=analysis_tokens),
+                streamer=guard.wrap_stream(streamer, cost=analysis_tokens),
+                batch_analyzer=guard.wrap(batch_analyzer, cost=batch_analysis_tokens),
+            )
 
 
 @router.post("/entries", status_code=201)
@@ -35,78 +127,578 @@ async def create_entry(
     return {"detail": "Entry created successfully", "entry": created_entry}
 
 
+async def _bulk_items(request: Request) -> AsyncIterator[Any]:
+    """Yield raw bulk items from a JSON array body or an NDJSON stream.
+
+    NDJSON lines are yielded as ``bytes`` while the body is still arriving;
+    JSON array elements are yielded as already-decoded Python objects.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in NDJSON_MEDIA_TYPES:
+        pending = b""
+        async for chunk in request.stream():
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if pending.strip():
+            yield pending
+        return
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array") from e
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array")
+    for item in items:
+        yield item
+
+
+def _validate_bulk_item(item: Any) -> EntryCreate | list[Any]:
+    """Validate one bulk item, returning the model or its validation errors."""
+    try:
+        if isinstance(item, bytes):
+            return EntryCreate.model_validate_json(item)
+        return EntryCreate.model_validate(item)
+    except ValidationError as e:
+        return e.errors(include_url=False, include_context=False, include_input=False)
+
+
+@router.post(
+    "/entries/bulk",
+    status_code=201,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": EntryCreate.model_json_schema()}
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def create_entries_bulk(
+    request: Request,
+    entry_service: EntryService = Depends(get_entry_service),
+    settings: Settings = Depends(get_settings),
+):
+    """Create many journal entries from a JSON array or an NDJSON stream.
+
+    Items are validated as they are read; valid ones are written together in
+    a single transaction and invalid ones are reported by their position.
+    """
+    results: list[dict[str, Any]] = []
+    entries: list[dict[str, Any]] = []
+    async for item in _bulk_items(request):
+        if len(results) >= settings.bulk_max_items:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Bulk requests are limited to {settings.bulk_max_items} entries",
+            )
+        validated = _validate_bulk_item(item)
+        if isinstance(validated, EntryCreate):
+            entry = Entry(**validated.model_dump())
+            entries.append(entry.model_dump())
+            results.append({"index": len(results), "id": entry.id})
+        else:
+            results.append({"index": len(results), "errors": validated})
+
+    await entry_service.create_entries(entries)
+    return {
+        "detail": "Bulk import completed",
+        "created": len(entries),
+        "failed": len(results) - len(entries),
+        "results": results,
+    }
+
+
+def _not_modified(etag: str, last_modified: datetime | None) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+
+def _collection_etag(summary: dict[str, Any], request: Request) -> str:
+    # The query string is part of the representation (page, cursor, ...).
+    last_updated = summary["last_updated"]
+    last_analyzed = summary.get("last_analyzed")
+    return make_etag(
+        summary["count"],
+        last_updated.isoformat() if last_updated else "",
+        last_analyzed.isoformat() if last_analyzed else "",
+        request.url.query,
+    )
+
+
+def _page_validators(page: dict[str, Any], request: Request) -> tuple[str, datetime | None]:
+    """ETag and Last-Modified for one page, computed from its own rows.
+
+    Costs nothing beyond the page query, so keyset pages stay bounded by
+    their size; the query string (cursor, filters, fields) and the total,
+    when requested, are part of the representation.
+    """
+    validators = [_entry_validators(entry) for entry in page["entries"]]
+    etag = make_etag(*(tag for tag, _ in validators), page.get("total", ""), request.url.query)
+    return etag, _last_modified(*(modified for _, modified in validators))
+
+
+def _last_modified(*timestamps: datetime | None) -> datetime | None:
+    return max((ts for ts in timestamps if ts is not None), default=None)
+
+
+def _parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    """Parse a comma-separated ``fields`` parameter into entry fields, in response order."""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",")} - {""}
+    unknown = requested - ENTRY_FIELDS.keys()
+    if not requested or unknown:
+        detail = f"fields must be a comma-separated list of: {', '.join(ENTRY_FIELDS)}"
+        raise HTTPException(status_code=400, detail=detail)
+    return tuple(name for name in ENTRY_FIELDS if name in requested)
+
+
+def _check_update_types(entry_update: dict[str, Any]) -> None:
+    """Reject non-string text fields, which the typed UPDATE could not bind."""
+    invalid = [
+        name
+        for name in ("work", "struggle", "intention")
+        if entry_update.get(name) is not None and not isinstance(entry_update[name], str)
+    ]
+    if invalid:
+        raise HTTPException(status_code=422, detail=f"Must be strings: {', '.join(invalid)}")
+
+
+def _project(entry: dict[str, Any], fields: tuple[str, ...] | None) -> dict[str, Any]:
+    if fields is None:
+        return entry
+    return {key: value for key, value in entry.items() if key in fields or key == "analysis"}
+
+
+def _projected_etag(etag: str, fields: tuple[str, ...] | None) -> str:
+    # Each projection is a different representation, so it needs its own ETag.
+    return etag if fields is None else variant_etag(etag, *fields)
+
+
+def _entry_validators(entry: dict[str, Any]) -> tuple[str, datetime]:
+    """ETag and Last-Modified for an entry, covering its embedded analysis if present."""
+    if "analysis" not in entry:
+        return entry_etag(entry["id"], entry["updated_at"]), entry["updated_at"]
+    analyzed_at = entry["analysis"]["created_at"] if entry["analysis"] else None
+    etag = variant_etag(
+        entry_etag(entry["id"], entry["updated_at"]),
+        "analysis",
+        analyzed_at.isoformat() if analyzed_at else "",
+    )
+    return etag, max(entry["updated_at"], analyzed_at or entry["updated_at"])
+
+
 # Implements GET /entries endpoint to list all journal entries
 # Example response: [{"id": "123", "work": "...", "struggle": "...", "intention": "..."}]
 @router.get("/entries")
-async def get_all_entries(entry_service: EntryService = Depends(get_entry_service)):
-    """Get all journal entries."""
-    result = await entry_service.get_all_entries()
-    return {"entries": result, "count": len(result)}
+async def get_all_entries(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(
+        None, ge=1, le=500, description="Page size; enables cursor pagination."
+    ),
+    after: str | None = Query(None, description="Return entries after this cursor."),
+    before: str | None = Query(None, description="Return entries before this cursor."),
+    include_total: bool = Query(True, description="Include the total entry count."),
+    include: Literal["analysis"] | None = Query(
+        None, description="Set to 'analysis' to embed each entry's stored analysis."
+    ),
+    created_after: datetime | None = Query(
+        None, description="Only entries created at or after this time."
+    ),
+    created_before: datetime | None = Query(
+        None, description="Only entries created before this time."
+    ),
+    updated_since: datetime | None = Query(
+        None, description="Only entries updated at or after this time."
+    ),
+    order: Literal["asc", "desc"] = Query("asc", description="Sort order of created_at."),
+    fields: str | None = Query(
+        None, description="Comma-separated fields to return, e.g. 'id,created_at,work'."
+    ),
+    entry_service: EntryService = Depends(get_entry_service),
+):
+    """Get journal entries.
+
+    Without ``limit``/``after``/``before`` every matching entry is returned.
+    Passing any of them switches to keyset pagination in ``created_at`` order;
+    follow ``next_cursor``/``prev_cursor`` from the response to move between
+    pages.
+
+    ``created_after``/``created_before`` select a creation date range and
+    ``updated_since`` only returns entries changed since a previous sync;
+    both are filtered in the database. ``order=desc`` lists the newest first.
+    ``fields`` returns only the named fields, and only those columns are read.
+
+    ``include=analysis`` joins each entry's stored analysis (or ``null``) into
+    the same query as ``entry["analysis"]``.
+
+    The response carries an ``ETag``; sending it back in ``If-None-Match``
+    returns ``304``. For a full listing it is derived from the entry count
+    and latest ``updated_at``, so revalidating costs a single aggregate query
+    without loading any entries. For a page it is derived from the page's own
+    rows, so revalidating costs no more than the page itself and
+    ``include_total=false`` skips the count.
+    """
+    include_analysis = include == "analysis"
+    filters = {
+        "created_after": created_after,
+        "created_before": created_before,
+        "updated_since": updated_since,
+    }
+    descending = order == "desc"
+    selected = _parse_fields(fields)
+    if limit is None and after is None and before is None:
+        if has_conditional_headers(request.headers):
+            summary = await entry_service.get_entries_summary(include_analysis, **filters)
+            etag = _collection_etag(summary, request)
+            last_modified = _last_modified(summary["last_updated"], summary.get("last_analyzed"))
+            if is_not_modified(request.headers, etag, last_modified):
+                return _not_modified(etag, last_modified)
+
+        result = await entry_service.get_all_entries(
+            include_analysis=include_analysis, descending=descending, fields=selected, **filters
+        )
+        summary = {
+            "count": len(result),
+            "last_updated": max((entry["updated_at"] for entry in result), default=None),
+        }
+        if include_analysis:
+            summary["last_analyzed"] = max(
+                (entry["analysis"]["created_at"] for entry in result if entry["analysis"]),
+                default=None,
+            )
+        last_modified = _last_modified(summary["last_updated"], summary.get("last_analyzed"))
+        response.headers.update(
+            validator_headers(_collection_etag(summary, request), last_modified)
+        )
+        return {"entries": [_project(entry, selected) for entry in result], "count": len(result)}
 
+    try:
+        page = await entry_service.get_entries_page(
+            limit or DEFAULT_PAGE_SIZE,
+            after=after,
+            before=before,
+            include_total=include_total,
+            include_analysis=include_analysis,
+            descending=descending,
+            fields=selected,
+            **filters,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    etag, last_modified = _page_validators(page, request)
+    if is_not_modified(request.headers, etag, last_modified):
+        return _not_modified(etag, last_modified)
+    page["entries"] = [_project(entry, selected) for entry in page["entries"]]
+    response.headers.update(validator_headers(etag, last_modified))
+    return page
+
+
+@router.get("/entries/search")
+async def search_entries(
+    q: str = Query(..., min_length=1, max_length=256, description="Search terms."),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500, description="Page size."),
+    after: str | None = Query(None, description="Return results after this cursor."),
+    entry_service: EntryService = Depends(get_entry_service),
+):
+    """Full-text search over work, struggle and intention.
 
-@router.get("/entries/{entry_id}")
-async def get_entry(entry_id: str, entry_service: EntryService = Depends(get_entry_service)):
-    """
-    TODO: Implement this endpoint to return a single journal entry by ID
-
-    Steps to implement:
-    1. Use entry_service.get_entry(entry_id) to fetch the entry
-    2. If entry is None, raise HTTPException with status_code=404
-    3. Return the entry directly (not wrapped in a dict)
-
-    Example response (status 200):
-    {
-        "id": "uuid-string",
-        "work": "...",
-        "struggle": "...",
-        "intention": "...",
-        "created_at": "...",
-        "updated_at": "..."
+    ``q`` accepts web search syntax: ``"quoted phrases"``, ``or`` and
+    ``-excluded`` words. Results are ranked best match first (matches in
+    ``work`` weigh most) and carry a ``rank`` and ``highlights``, the entry's
+    fields HTML-escaped with matching words wrapped in ``<mark>`` tags, so
+    they can be rendered as HTML. Follow ``next_cursor`` for the next page.
+    """
+    try:
+        return await entry_service.search_entries(q, limit, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/entries/stats")
+async def get_entry_stats(
+    period: Literal["day", "week"] = Query("day", description="Bucket size of the counts."),
+    since: date | None = Query(None, description="First day (UTC) to count."),
+    until: date | None = Query(None, description="Last day (UTC) to count."),
+    entry_service: EntryService = Depends(get_entry_service),
+):
+    """Entry statistics: totals, first/last entry, streaks and counts over time.
+
+    Served from a per-day summary table that triggers keep current, so the
+    cost grows with the number of days, not entries. ``counts`` lists the
+    days (or ISO weeks, starting Monday) with entries between ``since`` and
+    ``until``; ``current_streak`` counts consecutive days with entries up to
+    today or yesterday.
+    """
+    return await entry_service.get_stats(period, since=since, until=until)
+
+
+def _export_row(entry: dict[str, Any]) -> dict[str, Any]:
+    return {
+        **entry,
+        "created_at": entry["created_at"].isoformat(),
+        "updated_at": entry["updated_at"].isoformat(),
     }
 
-    Hint: Check the update_entry endpoint for similar patterns
+
+async def _ndjson_chunks(entries: AsyncIterator[dict[str, Any]]) -> AsyncIterator[str]:
+    lines: list[str] = []
+    async for entry in entries:
+        lines.append(json.dumps(_export_row(entry)) + "\n")
+        if len(lines) >= EXPORT_FLUSH_ROWS:
+            yield "".join(lines)
+            lines.clear()
+    if lines:
+        yield "".join(lines)
+
+
+async def _csv_chunks(entries: AsyncIterator[dict[str, Any]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    rows = 0
+    async for entry in entries:
+        writer.writerow(_export_row(entry))
+        rows += 1
+        if rows % EXPORT_FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+@router.get("/entries/export")
+async def export_entries(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="Output format."),
+    entry_service: EntryService = Depends(get_entry_service),
+    settings: Settings = Depends(get_settings),
+):
+    """Stream every journal entry as NDJSON (default) or CSV.
+
+    Rows are read through a server-side cursor and written out as they
+    arrive, so memory stays flat regardless of how large the journal is.
     """
-    raise HTTPException(status_code=501, detail="Not implemented - complete this endpoint!")
+    entries = entry_service.export_entries(prefetch=settings.export_prefetch_rows)
+    if fmt == "csv":
+        return StreamingResponse(
+            _csv_chunks(entries),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="entries.csv"'},
+        )
+    return StreamingResponse(
+        _ndjson_chunks(entries),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="entries.ndjson"'},
+    )
+
+
+@router.post("/entries/batch-get")
+async def get_entries(
+    request: EntryIdsRequest, entry_service: EntryService = Depends(get_entry_service)
+):
+    """Fetch many journal entries with a single query.
+
+    Entries are returned in the order their IDs were requested; IDs that do
+    not exist are listed under ``missing``.
+    """
+    return await entry_service.get_entries(request.ids)
+
+
+async def _analysis_lines(
+    results: AsyncIterator[dict[str, Any]], missing: list[str]
+) -> AsyncIterator[str]:
+    for entry_id in missing:
+        yield json.dumps({"entry_id": entry_id, "status": "not_found"}) + "\n"
+    # One line per result, flushed immediately: the point of streaming here
+    # is that fast analyses are not held back by the slowest one.
+    async for result in results:
+        yield json.dumps(jsonable_encoder(result)) + "\n"
+
+
+@router.post("/entries/analyze-batch")
+async def analyze_entries(
+    batch: AnalyzeBatchRequest,
+    entry_service: EntryService = Depends(get_entry_service),
+    analysis_service: AnalysisService = Depends(get_analysis_service),
+    settings: Settings = Depends(get_settings),
+):
+    """Analyze many entries, streaming one NDJSON result per entry as it completes.
+
+    Entries are loaded in one query, packed several to a prompt (within
+    ``ANALYSIS_PACK_TOKEN_BUDGET``) and analyzed concurrently up to
+    ``ANALYSIS_BATCH_CONCURRENCY`` calls at a time. Each line has the ``entry_id``
+    and a ``status`` of ``ok`` (with the ``analysis``), ``error`` (with an
+    ``error`` message) or ``not_found``.
+    """
+    limit = settings.analysis_batch_max_items
+    if batch.ids is not None:
+        if len(batch.ids) > limit:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch analysis is limited to {limit} entries",
+            )
+        found = await entry_service.get_entries(batch.ids)
+        entries, missing = found["entries"], found["missing"]
+    else:
+        entries = await entry_service.get_entries_created_between(
+            batch.created_after, batch.created_before, limit + 1
+        )
+        missing = []
+        if len(entries) > limit:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Batch analysis is limited to {limit} entries; narrow the date range",
+            )
+
+    results = analysis_service.analyze_many(
+        entries,
+        concurrency=settings.analysis_batch_concurrency,
+        item_timeout=settings.analysis_item_timeout_seconds,
+        token_budget=settings.analysis_pack_token_budget,
+        max_entries_per_call=settings.analysis_pack_max_entries,
+    )
+    return StreamingResponse(_analysis_lines(results, missing), media_type="application/x-ndjson")
+
+
+@router.get("/entries/{entry_id}")
+async def get_entry(
+    entry_id: str,
+    request: Request,
+    response: Response,
+    include: Literal["analysis"] | None = Query(
+        None, description="Set to 'analysis' to embed the entry's stored analysis."
+    ),
+    fields: str | None = Query(
+        None, description="Comma-separated fields to return, e.g. 'id,work'."
+    ),
+    entry_service: EntryService = Depends(get_entry_service),
+):
+    """Get a single journal entry by ID.
+
+    Honors ``If-None-Match``/``If-Modified-Since``: when the client's copy is
+    current, a ``304`` is returned after looking up only ``updated_at``.
+    ``fields`` returns only the named fields, and only those columns are read.
+    """
+    include_analysis = include == "analysis"
+    selected = _parse_fields(fields)
+    # Looking up updated_at alone cannot see a new analysis, so the shortcut
+    # only applies to the plain representation.
+    if has_conditional_headers(request.headers) and not include_analysis:
+        updated_at = await entry_service.get_entry_updated_at(entry_id)
+        if updated_at is None:
+            raise HTTPException(status_code=404, detail="Entry not found")
+        etag = _projected_etag(entry_etag(entry_id, updated_at), selected)
+        if is_not_modified(request.headers, etag, updated_at):
+            return _not_modified(etag, updated_at)
+
+    entry = await entry_service.get_entry(
+        entry_id, include_analysis=include_analysis, fields=selected
+    )
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Entry not found")
+    etag, last_modified = _entry_validators(entry)
+    etag = _projected_etag(etag, selected)
+    if include_analysis and is_not_modified(request.headers, etag, last_modified):
+        return _not_modified(etag, last_modified)
+    response.headers.update(validator_headers(etag, last_modified))
+    return _project(entry, selected)
+
+
+async def _check_if_match(
+    request: Request, entry_id: str, entry_service: EntryService
+) -> datetime | None:
+    """Evaluate ``If-Match`` and return the version the write must apply to.
+
+    Returns ``None`` when the request is unconditional.
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return None
+    updated_at = await entry_service.get_entry_updated_at(entry_id)
+    if updated_at is None:
+        raise HTTPException(status_code=404, detail="Entry not found")
+    if not if_match_satisfied(if_match, entry_etag(entry_id, updated_at)):
+        raise HTTPException(status_code=412, detail="Entry has been modified")
+    return updated_at
 
 
 @router.patch("/entries/{entry_id}")
 async def update_entry(
-    entry_id: str, entry_update: dict, entry_service: EntryService = Depends(get_entry_service)
+    entry_id: str,
+    entry_update: dict,
+    request: Request,
+    response: Response,
+    entry_service: EntryService = Depends(get_entry_service),
 ):
     """Update a journal entry.
 
+    Send the entry's ``ETag`` in ``If-Match`` to update only if nobody else
+    changed it since it was read; a mismatch returns ``412``. The ``ETag`` of
+    any representation (``fields``, ``include=analysis``) is accepted.
+
     TODO (Task 3): Replace ``entry_update: dict`` with ``entry_update: EntryUpdate``
     (import it from ``api.models.entry``) so PATCH requests are validated the
     same way POST requests are. Without this, PATCH happily accepts
     empty strings and 300-character bodies — see ``TestUpdateEntry`` in
     tests/test_api.py.
     """
-    result = await entry_service.update_entry(entry_id, entry_update)
+    _check_update_types(entry_update)
+    expected_updated_at = await _check_if_match(request, entry_id, entry_service)
+    result = await entry_service.update_entry(
+        entry_id, entry_update, expected_updated_at=expected_updated_at
+    )
     if not result:
+        if expected_updated_at is not None:
+            # The version check passed a moment ago, so the entry changed in between.
+            raise HTTPException(status_code=412, detail="Entry has been modified")
         raise HTTPException(status_code=404, detail="Entry not found")
 
+    response.headers.update(
+        validator_headers(entry_etag(entry_id, result["updated_at"]), result["updated_at"])
+    )
     return result
 
 
-# TODO: Implement DELETE /entries/{entry_id} endpoint to remove a specific entry
-# Return 404 if entry not found
 @router.delete("/entries/{entry_id}")
-async def delete_entry(entry_id: str, entry_service: EntryService = Depends(get_entry_service)):
+async def delete_entry(
+    entry_id: str, request: Request, entry_service: EntryService = Depends(get_entry_service)
+):
+    """Delete a specific journal entry.
+
+    Existence is reported by the delete itself, so a missing entry costs one
+    statement and there is no gap between checking and deleting. ``If-Match``
+    is honored the same way as on PATCH.
     """
-    TODO: Implement this endpoint to delete a specific journal entry
+    expected_updated_at = await _check_if_match(request, entry_id, entry_service)
+    if not await entry_service.delete_entry(entry_id, expected_updated_at=expected_updated_at):
+        if expected_updated_at is not None:
+            raise HTTPException(status_code=412, detail="Entry has been modified")
+        raise HTTPException(status_code=404, detail="Entry not found")
+    return {"detail": "Entry deleted successfully"}
 
-    Steps to implement:
-    1. Use entry_service.get_entry(entry_id) to check if entry exists
-    2. If entry is None, raise HTTPException with status_code=404
-    3. Use entry_service.delete_entry(entry_id) to delete the entry
-    4. Return a success response (status 200)
 
-    Example response (status 200):
-    {"detail": "Entry deleted successfully"}
+@router.post("/entries/batch-delete")
+async def delete_entries(
+    request: EntryIdsRequest, entry_service: EntryService = Depends(get_entry_service)
+):
+    """Delete many journal entries with a single query.
 
-    Hint: Look at how the update_entry endpoint checks for existence
+    Returns the IDs that were deleted and those that did not exist.
     """
-    raise HTTPException(status_code=501, detail="Not implemented - complete this endpoint!")
+    result = await entry_service.delete_entries(request.ids)
+    return {"detail": "Entries deleted", **result}
 
 
 @router.delete("/entries")
@@ -116,27 +708,156 @@ async def delete_all_entries(entry_service: EntryService = Depends(get_entry_ser
     return {"detail": "All entries deleted"}
 
 
-@router.post("/entries/{entry_id}/analyze", response_model=AnalysisResponse)
-async def analyze_entry(entry_id: str, entry_service: EntryService = Depends(get_entry_service)):
+@router.get("/entries/{entry_id}/analysis", response_model=AnalysisResponse)
+async def get_entry_analysis(
+    entry_id: str, analysis_service: AnalysisService = Depends(get_analysis_service)
+):
+    """Get the latest stored analysis of an entry without calling the LLM.
+
+    Analyses are recorded whenever ``POST /entries/{entry_id}/analyze`` (in
+    either mode) or ``/entries/analyze-batch`` completes.
+    """
+    analysis = await analysis_service.get_stored_analysis(entry_id)
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return analysis
+
+
+@router.post(
+    "/entries/{entry_id}/analyze",
+    response_model=AnalysisResponse,
+    responses={202: {"description": "Analysis queued; poll the job at the Location URL."}},
+)
+async def analyze_entry(
+    entry_id: str,
+    request: Request,
+    run_async: bool = Query(
+        False, alias="async", description="Queue the analysis and return 202 with a job ID."
+    ),
+    entry_service: EntryService = Depends(get_entry_service),
+    analysis_service: AnalysisService = Depends(get_analysis_service),
+    job_service: JobService = Depends(get_job_service),
+):
     """
     Analyze a journal entry using AI.
 
     Returns sentiment, summary, key topics, entry_id, and created_at timestamp.
     The LLM call itself lives in api/services/llm_service.py - implementing
-    analyze_journal_entry there is part of the capstone.
+    analyze_journal_entry there is part of the capstone. Results are cached by
+    entry text, so re-analyzing an unchanged entry skips the LLM call.
+
+    With ``?async=true`` the analysis is queued for a background worker
+    instead, and ``GET /jobs/{job_id}`` reports its progress and result.
     """
     entry = await entry_service.get_entry(entry_id)
     if entry is None:
         raise HTTPException(status_code=404, detail="Entry not found")
 
-    entry_text = f"{entry['work']} {entry['struggle']} {entry['intention']}"
+    if run_async:
+        job = await job_service.enqueue_analysis(entry_id)
+        worker = getattr(request.app.state, "job_worker", None)
+        if worker is not None:
+            worker.notify()
+        return JSONResponse(
+            status_code=202,
+            content={"job_id": job["id"], "status": job["status"]},
+            headers={"Location": f"/jobs/{job['id']}"},
+        )
 
     try:
-        return await analyze_journal_entry(entry_id, entry_text)
+        return await analysis_service.analyze(entry_id, entry_text(entry))
     except NotImplementedError as e:
         raise HTTPException(
             status_code=501,
             detail="LLM analysis not yet implemented - see api/services/llm_service.py",
         ) from e
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {e!s}") from e
+        raise _analysis_error(e) from e
+
+
+def _analysis_error(error: Exception) -> HTTPException:
+    """Map a failed analysis to a response that tells clients whether to retry."""
+    detail = f"Analysis failed: {error!s}"
+    if isinstance(error, CircuitOpenError):
+        return HTTPException(
+            status_code=503,
+            detail=str(error),
+            headers={"Retry-After": str(max(1, round(error.retry_after)))},
+        )
+    if isinstance(error, RateLimitedError):
+        # Rejected locally: the call was never sent to the provider.
+        return HTTPException(
+            status_code=429,
+            detail=str(error),
+            headers={"Retry-After": str(max(1, round(error.retry_after)))},
+        )
+    if isinstance(error, openai.RateLimitError):
+        retry_after = retry_after_seconds(error)
+        headers = {"Retry-After": str(max(1, round(retry_after)))} if retry_after else None
+        return HTTPException(status_code=429, detail=detail, headers=headers)
+    if isinstance(error, TimeoutError | openai.APITimeoutError):
+        return HTTPException(status_code=504, detail=detail)
+    if isinstance(error, openai.APIConnectionError) or (
+        isinstance(error, openai.APIStatusError) and error.status_code >= 500
+    ):
+        return HTTPException(status_code=502, detail=detail)
+    return HTTPException(status_code=500, detail=detail)
+
+
+def _sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _analysis_events(
+    first: tuple[str, dict[str, Any]] | Exception | None,
+    events: AsyncIterator[tuple[str, dict[str, Any]]],
+) -> AsyncIterator[str]:
+    try:
+        if isinstance(first, Exception):
+            raise first
+        if first is not None:
+            yield _sse(*first)
+        async for event, data in events:
+            yield _sse(event, data)
+    except Exception as e:
+        # Headers are already sent, so failures are reported in-band.
+        yield _sse("error", {"detail": f"Analysis failed: {e!s}"})
+
+
+@router.post("/entries/{entry_id}/analyze/stream")
+async def stream_entry_analysis(
+    entry_id: str,
+    entry_service: EntryService = Depends(get_entry_service),
+    analysis_service: AnalysisService = Depends(get_analysis_service),
+):
+    """Analyze a journal entry, streaming progress as Server-Sent Events.
+
+    ``summary`` events carry ``{"delta": str}`` pieces of the summary as the
+    model writes them. The last event is either ``analysis`` with the full
+    ``AnalysisResponse`` or ``error`` with a ``detail`` message. Cached
+    results are sent as a single ``analysis`` event. Calls rejected by the
+    rate limiter or circuit breaker fail with 429/503 before streaming starts.
+    """
+    entry = await entry_service.get_entry(entry_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Entry not found")
+
+    events = analysis_service.analyze_stream(entry_id, entry_text(entry))
+    # Pull the first event before sending headers: the guard acquires the
+    # rate limiter and checks the circuit breaker ahead of it, so rejected
+    # calls still get a 429/503 with Retry-After instead of an in-band error.
+    first: tuple[str, dict[str, Any]] | Exception | None
+    try:
+        first = await anext(events)
+    except (CircuitOpenError, RateLimitedError) as e:
+        raise _analysis_error(e) from e
+    except StopAsyncIteration:
+        first = None
+    except Exception as e:
+        first = e
+    return StreamingResponse(
+        _analysis_events(first, events),
+        media_type="text/event-stream",
+        # Disable proxy buffering (nginx) so each event is delivered at once.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
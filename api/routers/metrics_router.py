@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Request
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics(request: Request):
+    """Operational counters for the caches and other shared components.
+
+    A component reports ``null`` when it is disabled.
+    """
+    entry_cache = getattr(request.app.state, "entry_cache", None)
+    analysis_cache = getattr(request.app.state, "analysis_cache", None)
+    llm_guard = getattr(request.app.state, "llm_guard", None)
+    analytics_refresher = getattr(request.app.state, "analytics_refresher", None)
+    return {
+        "entry_cache": entry_cache.stats() if entry_cache is not None else None,
+        "analysis_cache": analysis_cache.stats() if analysis_cache is not None else None,
+        "llm": llm_guard.stats() if llm_guard is not None else None,
+        "analytics": analytics_refresher.stats() if analytics_refresher is not None else None,
+    }
@@ -0,0 +1,286 @@
+import asyncio
+import hashlib
+import json
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from api.repositories.postgres_repository import PostgresDB
+from api.services.cache import CacheBackend
+from api.services.llm_service import (
+    PROMPT_VERSION,
+    analyze_journal_entry,
+    pack_entries,
+    stream_journal_entry_analysis,
+)
+
+logger = logging.getLogger("journal")
+
+Analyzer = Callable[[str, str], Awaitable[dict[str, Any]]]
+BatchAnalyzer = Callable[[list[tuple[str, str]]], Awaitable[dict[str, dict[str, Any]]]]
+Streamer = Callable[[str, str], AsyncIterator[tuple[str, dict[str, Any]]]]
+
+# Fields of an analysis that depend only on the entry text, not on which
+# entry it came from; these are what the cache stores.
+CACHED_FIELDS = ("sentiment", "summary", "topics", "created_at")
+
+
+def entry_text(entry: dict[str, Any]) -> str:
+    """Combine an entry's fields into the text sent to the LLM."""
+    return f"{entry['work']} {entry['struggle']} {entry['intention']}"
+
+
+def analysis_cache_key(text: str, model: str, prompt_version: str = PROMPT_VERSION) -> str:
+    """Content address of an analysis: identical inputs always share a key."""
+    payload = json.dumps([prompt_version, model, text])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _failed(entry_id: str, error: str) -> dict[str, Any]:
+    return {"entry_id": entry_id, "status": "error", "error": error}
+
+
+class AnalysisService:
+    """Runs LLM analyses behind a two-tier, content-addressed cache.
+
+    Results are keyed by the entry text, model and prompt version, so editing
+    an entry's text (or bumping ``PROMPT_VERSION``) naturally misses the cache
+    while re-analyzing unchanged text is served from memory or Postgres. The
+    latest result for each entry is also recorded in ``entry_analyses``.
+    """
+
+    def __init__(
+        self,
+        db: PostgresDB,
+        model: str,
+        cache: CacheBackend | None = None,
+        analyzer: Analyzer = analyze_journal_entry,
+        streamer: Streamer = stream_journal_entry_analysis,
+        batch_analyzer: BatchAnalyzer | None = None,
+    ):
+        self.db = db
+        self.model = model
+        self.cache = cache
+        self.analyzer = analyzer
+        self.streamer = streamer
+        self.batch_analyzer = batch_analyzer
+        logger.debug("AnalysisService initialized for model %s", model)
+
+    async def _save_for_entry(self, entry_id: str, key: str, analysis: dict[str, Any]) -> None:
+        created_at = analysis["created_at"]
+        await self.db.save_entry_analysis(
+            {
+                **analysis,
+                "entry_id": entry_id,
+                "model": self.model,
+                "prompt_version": PROMPT_VERSION,
+                "cache_key": key,
+                "created_at": (
+                    datetime.fromisoformat(created_at)
+                    if isinstance(created_at, str)
+                    else created_at
+                ),
+            }
+        )
+
+    async def get_stored_analysis(self, entry_id: str) -> dict[str, Any] | None:
+        """Gets the latest analysis recorded for ``entry_id`` without calling the LLM."""
+        return await self.db.get_entry_analysis(entry_id)
+
+    async def _cached(self, entry_id: str, key: str) -> dict[str, Any] | None:
+        cached = await self.cache.get(key) if self.cache is not None else None
+        if cached is None:
+            cached = await self.db.get_cached_analysis(key)
+            if cached is not None and self.cache is not None:
+                await self.cache.set(key, cached)
+        if cached is None:
+            return None
+        logger.info("Analysis for entry %s served from cache", entry_id)
+        await self._save_for_entry(entry_id, key, cached)
+        return {**cached, "entry_id": entry_id}
+
+    async def _store(self, entry_id: str, key: str, result: dict[str, Any]) -> dict[str, Any]:
+        stored = {field: result.get(field) for field in CACHED_FIELDS}
+        stored["created_at"] = stored["created_at"] or datetime.now(UTC).isoformat()
+        await self.db.save_cached_analysis(key, self.model, PROMPT_VERSION, stored)
+        if self.cache is not None:
+            await self.cache.set(key, stored)
+        await self._save_for_entry(entry_id, key, stored)
+        logger.debug("Analysis for entry %s cached under %s", entry_id, key)
+        return {**stored, "entry_id": entry_id}
+
+    async def analyze(self, entry_id: str, text: str) -> dict[str, Any]:
+        """Analyzes ``text`` for ``entry_id``, reusing a cached result when possible."""
+        key = analysis_cache_key(text, self.model)
+        cached = await self._cached(entry_id, key)
+        if cached is not None:
+            return cached
+
+        logger.info("Analyzing entry %s", entry_id)
+        result = await self.analyzer(entry_id, text)
+        return await self._store(entry_id, key, result)
+
+    async def analyze_stream(
+        self, entry_id: str, text: str
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """Like ``analyze``, but yields ``("summary", {"delta": ...})`` events as the
+        model writes the summary, followed by a final ``("analysis", result)``.
+
+        A cached result is yielded straight away as the only event.
+        """
+        key = analysis_cache_key(text, self.model)
+        cached = await self._cached(entry_id, key)
+        if cached is not None:
+            yield "analysis", cached
+            return
+
+        logger.info("Streaming analysis of entry %s", entry_id)
+        async for event, data in self.streamer(entry_id, text):
+            if event == "analysis":
+                yield event, await self._store(entry_id, key, data)
+            else:
+                yield event, data
+
+    async def _analyze_item(
+        self, entry: dict[str, Any], key: str, item_timeout: float
+    ) -> dict[str, Any]:
+        entry_id = entry["id"]
+        try:
+            async with asyncio.timeout(item_timeout):
+                result = await self.analyzer(entry_id, entry_text(entry))
+                analysis = await self._store(entry_id, key, result)
+        except TimeoutError:
+            logger.warning("Analysis for entry %s timed out after %.1fs", entry_id, item_timeout)
+            return _failed(entry_id, "Analysis timed out")
+        except Exception as e:
+            logger.warning("Analysis for entry %s failed: %s", entry_id, e)
+            return _failed(entry_id, f"Analysis failed: {e!s}")
+        return {"entry_id": entry_id, "status": "ok", "analysis": analysis}
+
+    async def _analyze_packed(
+        self,
+        batch_analyzer: BatchAnalyzer,
+        pack: list[dict[str, Any]],
+        keys: dict[str, str],
+        item_timeout: float,
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        """Analyzes ``pack`` in one LLM call; returns the results and the entries left over."""
+        try:
+            async with asyncio.timeout(item_timeout):
+                analyses = await batch_analyzer(
+                    [(entry["id"], entry_text(entry)) for entry in pack]
+                )
+        except TimeoutError:
+            logger.warning("Packed analysis of %d entries timed out", len(pack))
+            return [_failed(entry["id"], "Analysis timed out") for entry in pack], []
+        except Exception as e:
+            logger.warning("Packed analysis of %d entries failed: %s", len(pack), e)
+            return [_failed(entry["id"], f"Analysis failed: {e!s}") for entry in pack], []
+
+        results = []
+        for entry in pack:
+            if entry["id"] in analyses:
+                analysis = await self._store(entry["id"], keys[entry["id"]], analyses[entry["id"]])
+                results.append({"entry_id": entry["id"], "status": "ok", "analysis": analysis})
+        remaining = [entry for entry in pack if entry["id"] not in analyses]
+        if remaining:
+            logger.warning(
+                "Packed analysis parsed %d of %d entries; retrying the rest one by one",
+                len(pack) - len(remaining),
+                len(pack),
+            )
+        return results, remaining
+
+    async def _analyze_pack(
+        self,
+        pack: list[dict[str, Any]],
+        keys: dict[str, str],
+        semaphore: asyncio.Semaphore,
+        item_timeout: float,
+    ) -> list[dict[str, Any]]:
+        async with semaphore:
+            # The timeout starts once a slot is free, so queueing behind the
+            # concurrency cap never counts against an entry.
+            results: list[dict[str, Any]] = []
+            remaining = pack
+            if len(pack) > 1 and self.batch_analyzer is not None:
+                results, remaining = await self._analyze_packed(
+                    self.batch_analyzer, pack, keys, item_timeout
+                )
+            for entry in remaining:
+                results.append(await self._analyze_item(entry, keys[entry["id"]], item_timeout))
+        return results
+
+    async def _cached_many(self, keys: dict[str, str]) -> dict[str, dict[str, Any]]:
+        """Looks up many entries' analyses with at most one database query."""
+        found: dict[str, dict[str, Any]] = {}
+        if self.cache is not None:
+            for entry_id, key in keys.items():
+                cached = await self.cache.get(key)
+                if cached is not None:
+                    found[entry_id] = cached
+        uncached = [key for entry_id, key in keys.items() if entry_id not in found]
+        if uncached:
+            stored = await self.db.get_cached_analyses(uncached)
+            for entry_id, key in keys.items():
+                if entry_id not in found and key in stored:
+                    found[entry_id] = stored[key]
+                    if self.cache is not None:
+                        await self.cache.set(key, stored[key])
+        for entry_id, analysis in found.items():
+            await self._save_for_entry(entry_id, keys[entry_id], analysis)
+        return {
+            entry_id: {**analysis, "entry_id": entry_id} for entry_id, analysis in found.items()
+        }
+
+    async def analyze_many(
+        self,
+        entries: list[dict[str, Any]],
+        concurrency: int,
+        item_timeout: float,
+        token_budget: int = 0,
+        max_entries_per_call: int = 1,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Analyzes ``entries`` concurrently, yielding each result as it completes.
+
+        Cached analyses are yielded first. When a ``batch_analyzer`` is set,
+        the rest are packed into LLM calls of up to ``max_entries_per_call``
+        entries within ``token_budget`` estimated tokens (see
+        ``pack_entries``); entries the packed output does not cover are
+        retried one at a time. At most ``concurrency`` LLM calls run at once
+        and each is given ``item_timeout`` seconds. Failures are yielded as
+        ``status: "error"`` results instead of aborting the batch. Closing the
+        iterator early cancels the analyses still in flight.
+        """
+        logger.info("Analyzing %d entries (concurrency %d)", len(entries), concurrency)
+        keys = {entry["id"]: analysis_cache_key(entry_text(entry), self.model) for entry in entries}
+        cached = await self._cached_many(keys)
+        for entry_id, analysis in cached.items():
+            yield {"entry_id": entry_id, "status": "ok", "analysis": analysis}
+
+        uncached = {entry["id"]: entry for entry in entries if entry["id"] not in cached}
+        if self.batch_analyzer is not None and token_budget and max_entries_per_call > 1:
+            packed = pack_entries(
+                [(entry_id, entry_text(entry)) for entry_id, entry in uncached.items()],
+                token_budget,
+                max_entries_per_call,
+            )
+            packs = [[uncached[entry_id] for entry_id, _ in pack] for pack in packed]
+        else:
+            packs = [[entry] for entry in uncached.values()]
+        logger.debug("Sending %d entries in %d LLM calls", len(uncached), len(packs))
+
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = [
+            asyncio.create_task(self._analyze_pack(pack, keys, semaphore, item_timeout))
+            for pack in packs
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for result in await next_done:
+                    yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from datetime import UTC, date, datetime
+from typing import Any
+
+import asyncpg
+
+from api.config import Settings
+from api.repositories.postgres_repository import PostgresDB
+
+logger = logging.getLogger("journal")
+
+
+class AnalyticsService:
+    """Reads sentiment and topic rollups of stored analyses; never calls the LLM."""
+
+    def __init__(self, db: PostgresDB):
+        self.db = db
+        logger.debug("AnalyticsService initialized with PostgresDB client.")
+
+    async def sentiment_trend(
+        self, period: str = "day", since: date | None = None, until: date | None = None
+    ) -> list[dict[str, Any]]:
+        """Gets the number of analyses per sentiment for each ``day`` or ``week``."""
+        logger.info("Fetching sentiment trend per %s", period)
+        buckets: dict[date, dict[str, Any]] = {}
+        for row in await self.db.get_sentiment_trend(period, since=since, until=until):
+            bucket = buckets.setdefault(
+                row["start"], {"start": row["start"], "counts": {}, "total": 0}
+            )
+            bucket["counts"][row["sentiment"]] = row["count"]
+            bucket["total"] += row["count"]
+        return list(buckets.values())
+
+    async def top_topics(
+        self, limit: int, since: date | None = None, until: date | None = None
+    ) -> list[dict[str, Any]]:
+        """Gets the most frequent analysis topics, most frequent first."""
+        logger.info("Fetching top %d topics", limit)
+        return await self.db.get_top_topics(limit, since=since, until=until)
+
+
+class AnalyticsRefresher:
+    """Refreshes the analytics rollups on a background task inside the API process.
+
+    Each process runs one, but an advisory lock in ``refresh_analytics``
+    means only one of them does the work at a time.
+    """
+
+    def __init__(self, pool: asyncpg.Pool, settings: Settings):
+        self.pool = pool
+        self.settings = settings
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refreshed_at: datetime | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        if self.settings.analytics_refresh_interval_seconds:
+            self._task = asyncio.create_task(self._run(), name="analytics-refresher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def refresh(self) -> bool:
+        """Refreshes the rollups now; ``False`` if another process already is."""
+        async with PostgresDB(self.settings.database_url, pool=self.pool) as db:
+            refreshed = await db.refresh_analytics()
+        if refreshed:
+            self.refreshes += 1
+            self.last_refreshed_at = datetime.now(UTC)
+            logger.debug("Analytics rollups refreshed")
+        return refreshed
+
+    async def _run(self) -> None:
+        # The views are populated when created, so the first refresh can wait
+        # a full interval.
+        while True:
+            await asyncio.sleep(self.settings.analytics_refresh_interval_seconds)
+            try:
+                await self.refresh()
+            except Exception:
+                self.failures += 1
+                logger.exception("Refreshing analytics rollups failed; retrying next interval")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_refreshed_at": self.last_refreshed_at,
+        }
@@ -0,0 +1,111 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+
+class CacheBackend(ABC):
+    """Abstract interface for the read-through caches used by the services.
+
+    Methods are async so a shared backend (e.g. Redis or memcached) can be
+    dropped in without changing callers.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Any | None:
+        """Return the cached value for ``key``, or ``None`` on a miss."""
+        pass
+
+    @abstractmethod
+    async def peek(self, key: str) -> Any | None:
+        """Like ``get``, but without counting a hit or miss or refreshing recency."""
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: Any) -> None:
+        """Store ``value`` under ``key``."""
+        pass
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Remove ``keys`` from the cache if present."""
+        pass
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove every key from the cache."""
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss/eviction counters for monitoring."""
+        pass
+
+
+class LRUCache(CacheBackend):
+    """In-process cache bounded by entry count and per-entry time to live.
+
+    Each process keeps its own copy, so when the API runs several workers a
+    write in one worker is only seen by the others once their copy expires.
+    Keep the TTL short or plug in a shared ``CacheBackend`` in that setup.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Any | None:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at <= self._clock():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def peek(self, key: str) -> Any | None:
+        item = self._data.get(key)
+        if item is None or item[0] <= self._clock():
+            return None
+        return item[1]
+
+    async def set(self, key: str, value: Any) -> None:
+        self._data[key] = (self._clock() + self._ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "size": len(self._data),
+        }
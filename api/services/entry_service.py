@@ -1,70 +1,396 @@
+import base64
+import binascii
+import json
 import logging
-from datetime import UTC, datetime
+from collections.abc import AsyncIterator, Collection
+from datetime import UTC, date, datetime, timedelta
 from typing import Any
 
 from api.repositories.postgres_repository import PostgresDB
+from api.services.cache import CacheBackend
 
 logger = logging.getLogger("journal")
 
 
+def _cache_key(entry_id: str) -> str:
+    return f"entry:{entry_id}"
+
+
+def _cached_version(value: dict[str, Any]) -> datetime:
+    # Deleted entries leave a tombstone holding the time of the delete.
+    return value.get("deleted_at", value.get("updated_at"))
+
+
+def encode_cursor(entry: dict[str, Any]) -> str:
+    """Encode an entry's ``(created_at, id)`` keyset position as an opaque token."""
+    payload = json.dumps([entry["created_at"].isoformat(), entry["id"]])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a token produced by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, entry_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(entry_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def encode_search_cursor(result: dict[str, Any]) -> str:
+    """Encode a search result's ``(rank, id)`` position as an opaque token."""
+    payload = json.dumps([result["rank"], result["id"]])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, str]:
+    """Decode a token produced by ``encode_search_cursor``.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, entry_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(rank), str(entry_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
 class EntryService:
-    def __init__(self, db: PostgresDB):
+    def __init__(self, db: PostgresDB, cache: CacheBackend | None = None):
         self.db = db
+        self.cache = cache
         logger.debug("EntryService initialized with PostgresDB client.")
 
+    async def _cache_entries(self, entries: list[dict[str, Any]]) -> None:
+        if self.cache is None:
+            return
+        for entry in entries:
+            key = _cache_key(entry["id"])
+            # A reader whose SELECT ran before a concurrent update or delete
+            # must not replace the newer version or tombstone it cached.
+            current = await self.cache.peek(key)
+            if current is not None and _cached_version(current) >= entry["updated_at"]:
+                continue
+            # Analyses change independently of their entry, so only the entry
+            # itself is cached.
+            cached = {name: value for name, value in entry.items() if name != "analysis"}
+            await self.cache.set(key, cached)
+
+    async def _cached_entry(self, entry_id: str) -> dict[str, Any] | None:
+        if self.cache is None:
+            return None
+        cached = await self.cache.get(_cache_key(entry_id))
+        if cached is None or "deleted_at" in cached:
+            return None
+        # Hand out copies so callers cannot mutate the cached value.
+        return dict(cached)
+
+    async def _forget_entries(self, entry_ids: list[str], deleted: Collection[str]) -> None:
+        if self.cache is None:
+            return
+        now = datetime.now(UTC)
+        for entry_id in entry_ids:
+            key = _cache_key(entry_id)
+            if entry_id in deleted:
+                await self.cache.set(key, {"deleted_at": now})
+            else:
+                await self.cache.delete(key)
+
     async def create_entry(self, entry_data: dict[str, Any]) -> dict[str, Any]:
         """Creates a new entry."""
         logger.info("Creating entry")
         now = datetime.now(UTC)
         entry = {**entry_data, "created_at": now, "updated_at": now}
         logger.debug("Entry created: %s", entry)
-        return await self.db.create_entry(entry)
+        created_entry = await self.db.create_entry(entry)
+        if created_entry:
+            await self._cache_entries([created_entry])
+        return created_entry
+
+    async def create_entries(self, entries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Creates many entries in a single transaction."""
+        logger.info("Creating %d entries in bulk", len(entries))
+        now = datetime.now(UTC)
+        stamped = [{**entry, "created_at": now, "updated_at": now} for entry in entries]
+        await self.db.create_entries(stamped)
+        logger.debug("Bulk created %d entries", len(stamped))
+        return stamped
 
-    async def get_all_entries(self) -> list[dict[str, Any]]:
-        """Gets all entries."""
+    async def get_all_entries(
+        self,
+        include_analysis: bool = False,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        updated_since: datetime | None = None,
+        descending: bool = False,
+        fields: Collection[str] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Gets all entries matching the filters, optionally with their stored analyses."""
         logger.info("Fetching all entries")
-        entries = await self.db.get_all_entries()
+        entries = await self.db.get_all_entries(
+            include_analysis=include_analysis,
+            created_after=created_after,
+            created_before=created_before,
+            updated_since=updated_since,
+            descending=descending,
+            fields=fields,
+        )
         logger.debug("Fetched %d entries", len(entries))
         return entries
 
-    async def get_entry(self, entry_id: str) -> dict[str, Any] | None:
-        """Gets a specific entry."""
+    async def export_entries(self, prefetch: int = 500) -> AsyncIterator[dict[str, Any]]:
+        """Streams every entry without loading the whole journal into memory."""
+        logger.info("Exporting entries")
+        exported = 0
+        async for entry in self.db.iter_entries(prefetch=prefetch):
+            exported += 1
+            yield entry
+        logger.debug("Exported %d entries", exported)
+
+    async def get_entries_page(
+        self,
+        limit: int,
+        after: str | None = None,
+        before: str | None = None,
+        include_total: bool = True,
+        include_analysis: bool = False,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        updated_since: datetime | None = None,
+        descending: bool = False,
+        fields: Collection[str] | None = None,
+    ) -> dict[str, Any]:
+        """Gets one page of entries matching the filters using opaque keyset cursors.
+
+        Raises:
+            ValueError: If a cursor is malformed, both ``after`` and
+                ``before`` are given, or a field is unknown.
+        """
+        if after is not None and before is not None:
+            raise ValueError("Use either 'after' or 'before', not both")
+        logger.info("Fetching entries page (limit=%d)", limit)
+        after_key = decode_cursor(after) if after is not None else None
+        before_key = decode_cursor(before) if before is not None else None
+
+        # Fetch one extra row to learn whether another page exists without
+        # a separate query.
+        entries = await self.db.get_entries_page(
+            limit + 1,
+            after=after_key,
+            before=before_key,
+            include_analysis=include_analysis,
+            created_after=created_after,
+            created_before=created_before,
+            updated_since=updated_since,
+            descending=descending,
+            fields=fields,
+        )
+        has_more = len(entries) > limit
+        if before_key is not None:
+            entries = entries[-limit:] if has_more else entries
+            has_prev, has_next = has_more, True
+        else:
+            entries = entries[:limit]
+            has_prev, has_next = after_key is not None, has_more
+
+        page: dict[str, Any] = {
+            "entries": entries,
+            "count": len(entries),
+            "next_cursor": encode_cursor(entries[-1]) if entries and has_next else None,
+            "prev_cursor": encode_cursor(entries[0]) if entries and has_prev else None,
+        }
+        if fields is None:
+            await self._cache_entries(entries)
+        if include_total:
+            summary = await self.db.get_entries_summary(
+                created_after=created_after,
+                created_before=created_before,
+                updated_since=updated_since,
+            )
+            page["total"] = summary["count"]
+        logger.debug("Fetched page of %d entries", len(entries))
+        return page
+
+    async def search_entries(
+        self, query: str, limit: int, after: str | None = None
+    ) -> dict[str, Any]:
+        """Gets one page of full-text search results, best match first.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        logger.info("Searching entries (limit=%d)", limit)
+        after_key = decode_search_cursor(after) if after is not None else None
+        # One extra row tells whether another page exists.
+        results = await self.db.search_entries(query, limit + 1, after=after_key)
+        has_more = len(results) > limit
+        results = results[:limit]
+        logger.debug("Search returned %d entries", len(results))
+        return {
+            "entries": results,
+            "count": len(results),
+            "next_cursor": encode_search_cursor(results[-1]) if has_more else None,
+        }
+
+    async def get_entry(
+        self,
+        entry_id: str,
+        include_analysis: bool = False,
+        fields: Collection[str] | None = None,
+    ) -> dict[str, Any] | None:
+        """Gets a specific entry, optionally with its stored analysis.
+
+        ``fields`` only limits what is read from the database: a cached entry
+        is returned whole.
+        """
         logger.info("Fetching entry %s", entry_id)
-        entry = await self.db.get_entry(entry_id)
+        if not include_analysis:
+            cached = await self._cached_entry(entry_id)
+            if cached is not None:
+                logger.debug("Entry %s served from cache", entry_id)
+                return cached
+
+        entry = await self.db.get_entry(entry_id, include_analysis=include_analysis, fields=fields)
         if entry:
             logger.debug("Entry %s found", entry_id)
+            # Partial entries must not be served to readers wanting all fields.
+            if fields is None:
+                await self._cache_entries([entry])
         else:
             logger.warning("Entry %s not found", entry_id)
         return entry
 
+    async def get_entry_updated_at(self, entry_id: str) -> datetime | None:
+        """Gets an entry's current version straight from the database."""
+        return await self.db.get_entry_updated_at(entry_id)
+
+    async def get_entries_summary(
+        self,
+        include_analysis: bool = False,
+        created_after: datetime | None = None,
+        created_before: datetime | None = None,
+        updated_since: datetime | None = None,
+    ) -> dict[str, Any]:
+        """Gets the count and latest ``updated_at`` (and ``analyzed_at``) of the matching entries."""
+        return await self.db.get_entries_summary(
+            include_analysis=include_analysis,
+            created_after=created_after,
+            created_before=created_before,
+            updated_since=updated_since,
+        )
+
+    async def get_entries(self, entry_ids: list[str]) -> dict[str, Any]:
+        """Gets several entries in one query, preserving the requested order."""
+        logger.info("Fetching %d entries", len(entry_ids))
+        unique_ids = list(dict.fromkeys(entry_ids))
+        found: dict[str, dict[str, Any]] = {}
+        for entry_id in unique_ids:
+            cached = await self._cached_entry(entry_id)
+            if cached is not None:
+                found[entry_id] = cached
+
+        uncached = [entry_id for entry_id in unique_ids if entry_id not in found]
+        if uncached:
+            fetched = await self.db.get_entries(uncached)
+            await self._cache_entries(fetched)
+            found.update((entry["id"], entry) for entry in fetched)
+
+        missing = [entry_id for entry_id in unique_ids if entry_id not in found]
+        if missing:
+            logger.warning("%d of %d entries not found", len(missing), len(unique_ids))
+        return {
+            "entries": [found[entry_id] for entry_id in unique_ids if entry_id in found],
+            "missing": missing,
+        }
+
+    async def get_stats(
+        self,
+        period: str = "day",
+        since: date | None = None,
+        until: date | None = None,
+    ) -> dict[str, Any]:
+        """Gets entry totals, streaks and counts per ``day`` or ISO ``week`` (UTC)."""
+        logger.info("Fetching entry stats per %s", period)
+        stats = await self.db.get_entry_stats(since=since, until=until)
+        days = stats.pop("days")
+        if period == "week":
+            weeks: dict[date, int] = {}
+            for row in days:
+                monday = row["day"] - timedelta(days=row["day"].weekday())
+                weeks[monday] = weeks.get(monday, 0) + row["count"]
+            counts = [{"start": start, "count": count} for start, count in weeks.items()]
+        else:
+            counts = [{"start": row["day"], "count": row["count"]} for row in days]
+        return {**stats, "period": period, "counts": counts}
+
+    async def get_entries_created_between(
+        self,
+        created_after: datetime | None,
+        created_before: datetime | None,
+        limit: int,
+    ) -> list[dict[str, Any]]:
+        """Gets up to ``limit`` entries created in a date range, oldest first."""
+        logger.info("Fetching entries created between %s and %s", created_after, created_before)
+        entries = await self.db.get_entries_created_between(created_after, created_before, limit)
+        await self._cache_entries(entries)
+        return entries
+
     async def update_entry(
-        self, entry_id: str, updated_data: dict[str, Any]
+        self,
+        entry_id: str,
+        updated_data: dict[str, Any],
+        expected_updated_at: datetime | None = None,
     ) -> dict[str, Any] | None:
-        """Updates an existing entry."""
+        """Updates an existing entry, optionally only if it is still at ``expected_updated_at``."""
         logger.info("Updating entry %s", entry_id)
-        existing_entry = await self.db.get_entry(entry_id)
-        if not existing_entry:
-            logger.warning("Entry %s not found. Update aborted.", entry_id)
+        updated_entry = await self.db.update_entry(
+            entry_id,
+            {**updated_data, "updated_at": datetime.now(UTC)},
+            expected_updated_at=expected_updated_at,
+        )
+        if not updated_entry:
+            logger.warning("Entry %s not found or changed. Update aborted.", entry_id)
             return None
 
-        updated_data = {
-            **existing_entry,
-            **updated_data,
-            "id": entry_id,
-            "updated_at": datetime.now(UTC),
-        }
-        await self.db.update_entry(entry_id, updated_data)
+        await self._cache_entries([updated_entry])
         logger.debug("Entry %s updated", entry_id)
-        return updated_data
+        return updated_entry
 
-    async def delete_entry(self, entry_id: str) -> None:
-        """Deletes a specific entry."""
+    async def delete_entry(
+        self, entry_id: str, expected_updated_at: datetime | None = None
+    ) -> bool:
+        """Deletes a specific entry, returning False if nothing was deleted."""
         logger.info("Deleting entry %s", entry_id)
-        await self.db.delete_entry(entry_id)
-        logger.debug("Entry %s deleted", entry_id)
+        deleted = await self.db.delete_entry(entry_id, expected_updated_at=expected_updated_at)
+        await self._forget_entries([entry_id], [entry_id] if deleted else [])
+        if deleted:
+            logger.debug("Entry %s deleted", entry_id)
+        else:
+            logger.warning("Entry %s not found or changed. Delete aborted.", entry_id)
+        return deleted
+
+    async def delete_entries(self, entry_ids: list[str]) -> dict[str, list[str]]:
+        """Deletes several entries in one statement."""
+        logger.info("Deleting %d entries", len(entry_ids))
+        unique_ids = list(dict.fromkeys(entry_ids))
+        deleted = set(await self.db.delete_entries(unique_ids))
+        await self._forget_entries(unique_ids, deleted)
+        logger.debug("Deleted %d entries", len(deleted))
+        return {
+            "deleted": [entry_id for entry_id in unique_ids if entry_id in deleted],
+            "missing": [entry_id for entry_id in unique_ids if entry_id not in deleted],
+        }
 
     async def delete_all_entries(self) -> None:
         """Deletes all entries."""
         logger.info("Deleting all entries")
         await self.db.delete_all_entries()
+        if self.cache is not None:
+            await self.cache.clear()
         logger.debug("All entries deleted")
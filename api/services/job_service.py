@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from datetime import UTC, datetime
+from functools import partial
+from typing import Any
+from uuid import uuid4
+
+import asyncpg
+from fastapi.encoders import jsonable_encoder
+from openai import AsyncOpenAI
+
+from api.config import Settings
+from api.repositories.postgres_repository import PostgresDB
+from api.services.analysis_service import AnalysisService, entry_text
+from api.services.cache import CacheBackend
+from api.services.llm_service import analysis_tokens, analyze_journal_entry
+from api.services.rate_limit import RateLimitedError
+from api.services.resilience import ProviderGuard
+
+logger = logging.getLogger("journal")
+
+
+class JobService:
+    def __init__(self, db: PostgresDB):
+        self.db = db
+        logger.debug("JobService initialized with PostgresDB client.")
+
+    async def enqueue_analysis(self, entry_id: str) -> dict[str, Any]:
+        """Queues an analysis of ``entry_id`` for the background workers."""
+        job = await self.db.create_job(
+            {"id": str(uuid4()), "entry_id": entry_id, "created_at": datetime.now(UTC)}
+        )
+        logger.info("Queued analysis job %s for entry %s", job["id"], entry_id)
+        return job
+
+    async def get_job(self, job_id: str) -> dict[str, Any] | None:
+        """Gets an analysis job by ID."""
+        return await self.db.get_job(job_id)
+
+
+class JobWorker:
+    """Runs queued analysis jobs on background tasks inside the API process.
+
+    Workers poll the ``analysis_jobs`` table, so jobs queued by any API
+    process are picked up; ``notify`` wakes this process's workers right
+    away for jobs it queued itself.
+    """
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        settings: Settings,
+        client: AsyncOpenAI | None = None,
+        guard: ProviderGuard | None = None,
+        cache: CacheBackend | None = None,
+    ):
+        self.pool = pool
+        self.settings = settings
+        self.client = client
+        self.guard = guard
+        self.cache = cache
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task[None]] = []
+
+    async def start(self) -> None:
+        """Recovers jobs orphaned by a stopped process, then starts the workers."""
+        async with PostgresDB(self.settings.database_url, pool=self.pool) as db:
+            requeued = await db.requeue_stale_jobs(
+                self.settings.job_stale_after_seconds, self.settings.job_max_attempts
+            )
+        if requeued:
+            logger.warning("Recovered %d stale analysis jobs", requeued)
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"analysis-worker-{i}")
+            for i in range(self.settings.job_workers)
+        ]
+        logger.info("Started %d analysis workers", len(self._tasks))
+
+    async def stop(self) -> None:
+        """Cancels the workers; jobs they were running are put back in the queue."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wakes idle workers because a job was just queued."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                async with PostgresDB(self.settings.database_url, pool=self.pool) as db:
+                    job = await db.claim_job()
+                    if job is not None:
+                        await self._process(db, job)
+                        continue
+            except Exception:
+                logger.exception("Analysis worker iteration failed; retrying")
+            try:
+                async with asyncio.timeout(self.settings.job_poll_interval_seconds):
+                    await self._wakeup.wait()
+            except TimeoutError:
+                pass
+
+    async def _process(self, db: PostgresDB, job: dict[str, Any]) -> None:
+        job_id = job["id"]
+        entry = await db.get_entry(job["entry_id"])
+        if entry is None:
+            await db.finish_job(job_id, "failed", error="Entry not found")
+            return
+
+        analyzer = partial(analyze_journal_entry, client=self.client)
+        service = AnalysisService(
+            db,
+            self.settings.openai_model,
+            cache=self.cache,
+            analyzer=(
+                self.guard.wrap(analyzer, cost=analysis_tokens)
+                if self.guard is not None
+                else analyzer
+            ),
+        )
+        try:
+            async with asyncio.timeout(self.settings.analysis_item_timeout_seconds):
+                result = await service.analyze(entry["id"], entry_text(entry))
+        except asyncio.CancelledError:
+            # Shutting down: hand the job to the next worker to come up.
+            await db.finish_job(job_id, "queued")
+            raise
+        except RateLimitedError as e:
+            # The job is not at fault: put it back and let the quota refill
+            # before this worker claims anything else.
+            logger.info("Analysis job %s deferred by the LLM rate limit", job_id)
+            await db.finish_job(job_id, "queued")
+            await asyncio.sleep(e.retry_after)
+        except TimeoutError:
+            logger.warning("Analysis job %s timed out", job_id)
+            await db.finish_job(job_id, "failed", error="Analysis timed out")
+        except Exception as e:
+            logger.warning("Analysis job %s failed: %s", job_id, e)
+            await db.finish_job(job_id, "failed", error=f"Analysis failed: {e!s}")
+        else:
+            logger.info("Analysis job %s succeeded", job_id)
+            await db.finish_job(job_id, "succeeded", result=jsonable_encoder(result))
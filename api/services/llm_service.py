@@ -1,4 +1,4 @@
-"""Task 4: Implement analyze_journal_entry using the OpenAI Responses API.
+"""Task 4: analyze journal entries using the OpenAI Responses API.
 
 This project mandates the OpenAI Python SDK and a provider that supports the
 Responses API, such as:
@@ -9,24 +9,233 @@ Set OPENAI_API_KEY, OPENAI_BASE_URL, and OPENAI_MODEL in your .env file.
 Settings are loaded by ``api.config.Settings``.
 """
 
-from openai import AsyncOpenAI
+import json
+import logging
+import re
+from collections.abc import AsyncIterator
+from typing import Any
 
-from api.config import get_settings
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 
+from api.config import Settings, get_settings
+from api.models.entry import AnalysisResponse
 
-def _default_client() -> AsyncOpenAI:
-    """Construct the real OpenAI client from application settings.
+logger = logging.getLogger("journal")
 
-    Called lazily from ``analyze_journal_entry`` so tests can inject a
-    ``MockAsyncOpenAI`` without ever triggering this code path.
+# Bump whenever the prompt or response parsing changes so cached analyses
+# produced by the old prompt are no longer reused.
+PROMPT_VERSION = "1"
+
+INSTRUCTIONS = """\
+You analyze entries from a learner's daily journal. Each entry describes what
+they worked on, what they struggled with and what they intend to do next.
+
+Reply with only a JSON object, with the keys in this order:
+{"summary": "<two sentence summary>", "sentiment": "positive" | "negative" | "neutral",
+ "topics": ["<2 to 4 key topics>"]}
+"""
+
+
+def create_client(settings: Settings) -> AsyncOpenAI:
+    """Build an OpenAI client with the connection limits, timeouts and retries from ``settings``.
+
+    The API creates one of these in its lifespan and shares it across
+    requests, so HTTP keep-alive connections and TLS sessions are reused.
+    Call ``await client.close()`` when done with it.
     """
-    settings = get_settings()
     return AsyncOpenAI(
         api_key=settings.openai_api_key,
         base_url=settings.openai_base_url,
+        max_retries=settings.openai_max_retries,
+        timeout=httpx.Timeout(
+            settings.openai_timeout_seconds, connect=settings.openai_connect_timeout_seconds
+        ),
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=settings.openai_max_connections,
+                max_keepalive_connections=settings.openai_max_keepalive_connections,
+                keepalive_expiry=settings.openai_keepalive_expiry_seconds,
+            )
+        ),
     )
 
 
+def _default_client() -> AsyncOpenAI:
+    """Construct the real OpenAI client from application settings.
+
+    Called lazily from ``analyze_journal_entry`` so tests can inject a
+    ``MockAsyncOpenAI`` without ever triggering this code path. The router
+    passes the app's shared client instead, so this is only reached when
+    ``analyze_journal_entry`` is used outside the API (e.g. from a script).
+    """
+    return create_client(get_settings())
+
+
+class _SummaryExtractor:
+    """Incrementally pull the ``summary`` string out of a streamed JSON object.
+
+    The prompt asks for ``summary`` as the first key, so its text can be
+    forwarded while the rest of the object is still being generated.
+    """
+
+    _KEY = re.compile(r'"summary"\s*:\s*"')
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._start: int | None = None
+        self._pos = 0
+        self._done = False
+
+    def feed(self, delta: str) -> str:
+        """Add ``delta`` and return any summary text completed by it."""
+        self._buffer += delta
+        if self._done:
+            return ""
+        if self._start is None:
+            match = self._KEY.search(self._buffer)
+            if match is None:
+                return ""
+            self._start = self._pos = match.end()
+
+        end = self._pos
+        while end < len(self._buffer):
+            char = self._buffer[end]
+            if char == '"':
+                self._done = True
+                break
+            if char == "\\":
+                # Stop before an escape sequence that has not fully arrived;
+                # a high surrogate also needs its low half.
+                length = 6 if self._buffer[end + 1 : end + 2] == "u" else 2
+                if (
+                    length == 6
+                    and self._buffer[end + 2 : end + 3].lower() == "d"
+                    and (self._buffer[end + 3 : end + 4].lower() in "89ab")
+                ):
+                    length = 12
+                if end + length > len(self._buffer):
+                    break
+                end += length
+                continue
+            end += 1
+
+        raw = self._buffer[self._pos : end]
+        self._pos = end
+        return json.loads(f'"{raw}"') if raw else ""
+
+
+BATCH_INSTRUCTIONS = """\
+You analyze entries from a learner's daily journal. Each entry describes what
+they worked on, what they struggled with and what they intend to do next.
+
+The input is a JSON array of {"entry_id", "text"} objects. Return one analysis
+per entry, echoing its entry_id, with a two sentence summary, the sentiment
+and 2 to 4 key topics.
+"""
+
+BATCH_OUTPUT_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "analyses": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "entry_id": {"type": "string"},
+                    "summary": {"type": "string"},
+                    "sentiment": {"type": "string", "enum": ["positive", "negative", "neutral"]},
+                    "topics": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["entry_id", "summary", "sentiment", "topics"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["analyses"],
+    "additionalProperties": False,
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-bound-ish token estimate (about four characters per token).
+
+    Good enough for budgeting prompts without pulling in a model-specific
+    tokenizer; keep budgets well under the model's context window.
+    """
+    return len(text) // 4 + 1
+
+
+def _batch_item(entry_id: str, entry_text: str) -> dict[str, str]:
+    return {"entry_id": entry_id, "text": entry_text}
+
+
+# Allowance for the JSON one analysis produces, used when budgeting calls
+# against a tokens-per-minute quota.
+ANALYSIS_OUTPUT_TOKENS = 200
+
+
+def analysis_tokens(entry_id: str, entry_text: str) -> int:
+    """Estimated tokens (prompt and output) of one ``analyze_journal_entry`` call."""
+    return estimate_tokens(INSTRUCTIONS) + estimate_tokens(entry_text) + ANALYSIS_OUTPUT_TOKENS
+
+
+def batch_analysis_tokens(entries: list[tuple[str, str]]) -> int:
+    """Estimated tokens (prompt and output) of one ``analyze_journal_entries`` call."""
+    return estimate_tokens(BATCH_INSTRUCTIONS) + sum(
+        estimate_tokens(json.dumps(_batch_item(entry_id, entry_text))) + ANALYSIS_OUTPUT_TOKENS
+        for entry_id, entry_text in entries
+    )
+
+
+def pack_entries(
+    entries: list[tuple[str, str]], token_budget: int, max_entries: int
+) -> list[list[tuple[str, str]]]:
+    """Group ``(entry_id, entry_text)`` pairs into prompts for ``analyze_journal_entries``.
+
+    Entries are packed greedily, in order, while the estimated input
+    (instructions included) stays within ``token_budget`` and a pack holds at
+    most ``max_entries``. An entry too large to share a prompt gets its own.
+    """
+    available = token_budget - estimate_tokens(BATCH_INSTRUCTIONS)
+    packs: list[list[tuple[str, str]]] = []
+    current: list[tuple[str, str]] = []
+    used = 0
+    for entry_id, entry_text in entries:
+        cost = estimate_tokens(json.dumps(_batch_item(entry_id, entry_text)))
+        if current and (used + cost > available or len(current) >= max_entries):
+            packs.append(current)
+            current, used = [], 0
+        current.append((entry_id, entry_text))
+        used += cost
+    if current:
+        packs.append(current)
+    return packs
+
+
+def _request_args(entry_text: str) -> dict[str, Any]:
+    return {
+        "model": get_settings().openai_model,
+        "instructions": INSTRUCTIONS,
+        "input": entry_text,
+    }
+
+
+def _parse_analysis(entry_id: str, data: Any) -> dict[str, Any]:
+    """Validate the model's JSON for one entry.
+
+    Raises:
+        ValueError: If ``data`` is not a complete analysis.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    analysis = AnalysisResponse.model_validate(
+        {field: data.get(field) for field in ("sentiment", "summary", "topics")}
+        | {"entry_id": entry_id}
+    )
+    return analysis.model_dump(mode="json")
+
+
 async def analyze_journal_entry(
     entry_id: str,
     entry_text: str,
@@ -38,8 +247,8 @@ async def analyze_journal_entry(
         entry_id: ID of the entry being analyzed (pass through to the result).
         entry_text: Combined work + struggle + intention text.
         client: OpenAI client. If None, a default one is constructed from
-            application settings. Tests pass in a MockAsyncOpenAI here; production code
-            in the router calls this with no ``client`` argument.
+            application settings. Tests pass in a MockAsyncOpenAI here; the router
+            passes the shared client created in the app's lifespan.
 
     Returns:
         A dict matching AnalysisResponse:
@@ -48,18 +257,96 @@ async def analyze_journal_entry(
                 "sentiment": str,   # "positive" | "negative" | "neutral"
                 "summary":   str,
                 "topics":    list[str],
+                "created_at": str,  # ISO 8601
             }
+    """
+    if client is None:
+        client = _default_client()
+    response = await client.responses.create(**_request_args(entry_text))
+    return _parse_analysis(entry_id, json.loads(response.output_text))
 
-    TODO (Task 4):
-      1. If ``client is None``, call ``_default_client()`` to construct one.
-      2. Build an input that includes ``entry_text`` somewhere
-         (the unit tests check that the entry text reaches the LLM).
-      3. Call ``client.responses.create(...)`` with a model name
-         (use ``get_settings().openai_model``).
-      4. Parse ``response.output_text`` with ``json.loads()``.
-      5. Return a dict with ``entry_id``, ``sentiment``, ``summary``, ``topics``.
+
+def _parse_batch(entry_ids: set[str], output_text: str) -> dict[str, dict[str, Any]]:
+    try:
+        data = json.loads(output_text)
+    except ValueError:
+        data = None
+    items = data.get("analyses") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        logger.warning("Could not parse batched analysis output")
+        return {}
+
+    analyses: dict[str, dict[str, Any]] = {}
+    for item in items:
+        entry_id = item.get("entry_id") if isinstance(item, dict) else None
+        if not isinstance(entry_id, str) or entry_id not in entry_ids or entry_id in analyses:
+            continue
+        try:
+            analyses[entry_id] = _parse_analysis(entry_id, item)
+        except ValueError:
+            continue
+    return analyses
+
+
+async def analyze_journal_entries(
+    entries: list[tuple[str, str]],
+    client: AsyncOpenAI | None = None,
+) -> dict[str, dict[str, Any]]:
+    """Analyze several journal entries with a single Responses API call.
+
+    Args:
+        entries: ``(entry_id, entry_text)`` pairs, typically one pack from
+            ``pack_entries``.
+        client: OpenAI client, as for ``analyze_journal_entry``.
+
+    Returns:
+        Analyses keyed by entry ID, each shaped like ``analyze_journal_entry``'s
+        result. Entries whose analysis is missing or malformed in the model's
+        output are left out, so callers can retry them individually.
     """
-    raise NotImplementedError(
-        "Task 4: implement analyze_journal_entry using the openai SDK. "
-        "See tests/test_llm_service.py for the test contract."
+    if client is None:
+        client = _default_client()
+    response = await client.responses.create(
+        model=get_settings().openai_model,
+        instructions=BATCH_INSTRUCTIONS,
+        input=json.dumps([_batch_item(entry_id, text) for entry_id, text in entries]),
+        text={
+            "format": {
+                "type": "json_schema",
+                "name": "entry_analyses",
+                "schema": BATCH_OUTPUT_SCHEMA,
+                "strict": True,
+            }
+        },
     )
+    return _parse_batch({entry_id for entry_id, _ in entries}, response.output_text)
+
+
+async def stream_journal_entry_analysis(
+    entry_id: str,
+    entry_text: str,
+    client: AsyncOpenAI | None = None,
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """Analyze a journal entry, yielding the summary as the model writes it.
+
+    Uses the Responses API streaming mode. Yields ``("summary", {"delta": str})``
+    events as summary text arrives, then one ``("analysis", dict)`` event with
+    the complete result in the same shape ``analyze_journal_entry`` returns.
+
+    Raises:
+        RuntimeError: If the provider reports the response failed.
+    """
+    if client is None:
+        client = _default_client()
+    stream = await client.responses.create(**_request_args(entry_text), stream=True)
+    extractor = _SummaryExtractor()
+    output: list[str] = []
+    async for event in stream:
+        if event.type == "response.output_text.delta":
+            output.append(event.delta)
+            summary = extractor.feed(event.delta)
+            if summary:
+                yield "summary", {"delta": summary}
+        elif event.type in ("response.failed", "response.incomplete", "error"):
+            raise RuntimeError(f"LLM response did not complete ({event.type})")
+    yield "analysis", _parse_analysis(entry_id, json.loads("".join(output)))
@@ -0,0 +1,123 @@
+"""Client-side pacing of LLM calls to stay within provider quotas.
+
+Providers enforce requests-per-minute and tokens-per-minute limits; going
+over them only earns 429s (and retries that make the overload worse). The
+``RateLimiter`` here spends from one token bucket per quota before each
+call, queueing callers in arrival order and turning them away when the
+queue is already longer than they are allowed to wait.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable
+from typing import Any
+
+
+class RateLimitedError(Exception):
+    """Raised when a call would have to wait longer than the limiter allows."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("LLM rate limit reached; try again later")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Refills at ``per_minute / 60`` units per second up to ``per_minute`` units.
+
+    The balance may go negative: reserving units a caller will only get
+    later is what keeps waiting callers in arrival order.
+    """
+
+    def __init__(self, per_minute: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.capacity = per_minute
+        self._rate = per_minute / 60
+        self._clock = clock
+        self._balance = float(per_minute)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._balance = min(self.capacity, self._balance + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def wait_time(self, amount: int) -> float:
+        """Seconds until ``amount`` units are available to a caller arriving now."""
+        self._refill()
+        return max(0.0, (amount - self._balance) / self._rate)
+
+    def take(self, amount: int) -> None:
+        self._balance -= amount
+
+    def give_back(self, amount: int) -> None:
+        self._balance = min(self.capacity, self._balance + amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits shared by all LLM calls.
+
+    A limit of 0 disables that quota. Callers that would wait longer than
+    ``max_wait`` seconds are rejected with ``RateLimitedError`` right away.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_wait: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._requests = TokenBucket(requests_per_minute, clock) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, clock) if tokens_per_minute else None
+        self._max_wait = max_wait
+        self.acquired = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def _reservation(self, tokens: int) -> list[tuple[TokenBucket, int]]:
+        reservation = []
+        if self._requests is not None:
+            reservation.append((self._requests, 1))
+        if self._tokens is not None:
+            # A single call larger than the whole quota would never fit, so it
+            # waits for a full bucket instead.
+            reservation.append((self._tokens, min(tokens, self._tokens.capacity)))
+        return reservation
+
+    def try_acquire(self, tokens: int) -> bool:
+        """Take capacity for one call only if it is available without waiting."""
+        reservation = self._reservation(tokens)
+        if any(bucket.wait_time(amount) for bucket, amount in reservation):
+            return False
+        for bucket, amount in reservation:
+            bucket.take(amount)
+        self.acquired += 1
+        return True
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one call of about ``tokens`` tokens fits within the quotas.
+
+        Raises:
+            RateLimitedError: If the wait would exceed ``max_wait``.
+        """
+        reservation = self._reservation(tokens)
+        wait = max((bucket.wait_time(amount) for bucket, amount in reservation), default=0.0)
+        if wait > self._max_wait:
+            self.rejected += 1
+            raise RateLimitedError(wait)
+        for bucket, amount in reservation:
+            bucket.take(amount)
+        self.acquired += 1
+        if not wait:
+            return
+        self.waiting += 1
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            for bucket, amount in reservation:
+                bucket.give_back(amount)
+            raise
+        finally:
+            self.waiting -= 1
+
+    def stats(self) -> dict[str, Any]:
+        return {"acquired": self.acquired, "waiting": self.waiting, "rejected": self.rejected}
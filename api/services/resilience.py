@@ -0,0 +1,357 @@
+"""Resilience layer for calls to the LLM provider.
+
+``ProviderGuard`` wraps the functions in ``llm_service`` with a circuit
+breaker, client-side rate limiting (see ``rate_limit``), retries with
+jittered exponential backoff that honor ``Retry-After``, and optional
+hedged requests. The API keeps one guard per
+provider client, so a degraded provider fails fast instead of tying up every
+request until it times out.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from email.utils import parsedate_to_datetime
+from functools import wraps
+from typing import Any
+
+import openai
+
+from api.config import Settings
+from api.services.rate_limit import RateLimiter
+
+logger = logging.getLogger("journal")
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the circuit is open."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("LLM provider is unavailable; circuit breaker is open")
+        self.retry_after = retry_after
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """Whether ``error`` means the provider is unhealthy (and the call may be retried).
+
+    Connection problems, timeouts, rate limiting and 5xx responses count;
+    other errors (bad requests, unparseable output) mean the provider
+    answered and are raised to the caller as-is.
+    """
+    if isinstance(error, TimeoutError | openai.APIConnectionError):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def retry_after_seconds(error: BaseException) -> float | None:
+    """Read the delay a provider asked for via ``Retry-After`` / ``retry-after-ms``."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        if value.strip().isdigit():
+            return float(value)
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except ValueError:
+        return None
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Opens after ``failure_threshold`` provider failures in a row, rejects
+    calls for ``reset_timeout`` seconds, then lets a single trial call through
+    (half-open): its success closes the circuit, its failure reopens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.opened = 0
+        self.rejected = 0
+
+    def _retry_after(self) -> float:
+        return max(0.0, self._opened_at + self._reset_timeout - self._clock())
+
+    def before_call(self) -> None:
+        """Reserve permission to call the provider.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (or a half-open trial is
+                already running).
+        """
+        if self.state == "open" and self._retry_after() == 0:
+            self.state = "half_open"
+        if self.state == "open" or (self.state == "half_open" and self._trial_in_flight):
+            self.rejected += 1
+            raise CircuitOpenError(self._retry_after())
+        if self.state == "half_open":
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self._failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == "half_open" or self._failures >= self._failure_threshold:
+            if self.state != "open":
+                logger.warning("LLM circuit breaker opened after %d failures", self._failures)
+                self.opened += 1
+            self.state = "open"
+            self._opened_at = self._clock()
+        self._trial_in_flight = False
+
+    def release(self) -> None:
+        """Give up a reserved call without an outcome (e.g. it was cancelled)."""
+        self._trial_in_flight = False
+
+
+class ProviderGuard:
+    """Circuit breaker, retries and hedging around one LLM provider."""
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        max_retries: int,
+        base_delay: float,
+        max_delay: float,
+        hedge_percentile: float = 0,
+        hedge_min_samples: int = 20,
+        latency_window: int = 200,
+        limiter: RateLimiter | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.breaker = breaker
+        self.limiter = limiter
+        self._max_retries = max_retries
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._hedge_percentile = hedge_percentile
+        self._hedge_min_samples = hedge_min_samples
+        self._latencies: deque[float] = deque(maxlen=latency_window)
+        self._clock = clock
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def _backoff(self, attempt: int, error: BaseException) -> float | None:
+        """Seconds to wait before retry number ``attempt + 1``, or ``None`` to give up."""
+        if attempt >= self._max_retries:
+            return None
+        requested = retry_after_seconds(error)
+        if requested is not None:
+            # Never retry sooner than asked; give up if asked to wait too long.
+            return requested if requested <= self._max_delay else None
+        # "Full jitter": spreads retries from many callers over the window.
+        return random.uniform(0, min(self._max_delay, self._base_delay * 2**attempt))  # noqa: S311
+
+    def hedge_delay(self) -> float | None:
+        """Latency after which a duplicate request is sent, or ``None`` if hedging is off."""
+        if not self._hedge_percentile or len(self._latencies) < self._hedge_min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self._hedge_percentile / 100))
+        return ordered[index]
+
+    async def _hedged(self, call: Callable[[], Awaitable[Any]], tokens: int) -> Any:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await call()
+
+        primary = asyncio.ensure_future(call())
+        hedge: asyncio.Future[Any] | None = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+            if self.limiter is not None and not self.limiter.try_acquire(tokens):
+                # Near the quota a duplicate request would only delay other calls.
+                return await primary
+
+            self.hedges += 1
+            hedge = asyncio.ensure_future(call())
+            pending = {primary, hedge}
+            errors: list[BaseException] = []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    errors.append(error)
+            # Both attempts failed; report the first failure.
+            raise errors[0]
+        finally:
+            # asyncio.wait does not cancel its tasks when the caller is
+            # cancelled (e.g. by a timeout), so stop any request still running.
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _acquire(self, tokens: int) -> None:
+        self.breaker.before_call()
+        if self.limiter is None:
+            return
+        try:
+            await self.limiter.acquire(tokens)
+        except BaseException:
+            self.breaker.release()
+            raise
+
+    async def call(
+        self, fn: Callable[..., Awaitable[Any]], *args: Any, tokens: int = 0, **kwargs: Any
+    ) -> Any:
+        """Call ``fn(*args, **kwargs)`` through the breaker, retrying provider failures.
+
+        ``tokens`` is the call's estimated size, charged to the rate limiter
+        for every attempt.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+            RateLimitedError: If the rate limiter's queue is too long.
+        """
+        self.calls += 1
+        attempt = 0
+        while True:
+            await self._acquire(tokens)
+            started = self._clock()
+            try:
+                result = await self._hedged(lambda: fn(*args, **kwargs), tokens)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not is_provider_failure(e):
+                    # The provider answered; the problem is with the request
+                    # or its output, which retrying will not fix.
+                    self.breaker.record_success()
+                    raise
+                self.failures += 1
+                self.breaker.record_failure()
+                delay = self._backoff(attempt, e)
+                if delay is None:
+                    raise
+                logger.warning("LLM call failed (%s); retrying in %.2fs", e, delay)
+                self.retries += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            self.successes += 1
+            self._latencies.append(self._clock() - started)
+            return result
+
+    def wrap(
+        self,
+        fn: Callable[..., Awaitable[Any]],
+        cost: Callable[..., int] | None = None,
+    ) -> Callable[..., Awaitable[Any]]:
+        """Return ``fn`` with every call routed through ``call``.
+
+        ``cost`` estimates a call's tokens from its arguments.
+        """
+
+        @wraps(fn)
+        async def guarded(*args: Any, **kwargs: Any) -> Any:
+            tokens = cost(*args, **kwargs) if cost is not None else 0
+            return await self.call(fn, *args, tokens=tokens, **kwargs)
+
+        return guarded
+
+    def wrap_stream(
+        self,
+        fn: Callable[..., AsyncIterator[Any]],
+        cost: Callable[..., int] | None = None,
+    ) -> Callable[..., AsyncIterator[Any]]:
+        """Guard a streaming call with the circuit breaker and rate limiter.
+
+        Streams are not retried or hedged, since part of the output may
+        already have reached the client.
+        """
+
+        @wraps(fn)
+        async def guarded(*args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+            self.calls += 1
+            await self._acquire(cost(*args, **kwargs) if cost is not None else 0)
+            try:
+                async for item in fn(*args, **kwargs):
+                    yield item
+            except Exception as e:
+                if is_provider_failure(e):
+                    self.failures += 1
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                raise
+            except BaseException:
+                self.breaker.release()
+                raise
+            self.breaker.record_success()
+            self.successes += 1
+
+        return guarded
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "circuit_state": self.breaker.state,
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "retries": self.retries,
+            "rejected": self.breaker.rejected,
+            "circuit_opened": self.breaker.opened,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "rate_limiter": self.limiter.stats() if self.limiter is not None else None,
+        }
+
+
+def create_guard(settings: Settings) -> ProviderGuard:
+    """Build the ``ProviderGuard`` shared by every call to the LLM provider."""
+    return ProviderGuard(
+        CircuitBreaker(settings.llm_breaker_failure_threshold, settings.llm_breaker_reset_seconds),
+        max_retries=settings.llm_retry_attempts,
+        base_delay=settings.llm_retry_base_delay_seconds,
+        max_delay=settings.llm_retry_max_delay_seconds,
+        hedge_percentile=settings.llm_hedge_percentile,
+        hedge_min_samples=settings.llm_hedge_min_samples,
+        limiter=(
+            RateLimiter(
+                settings.llm_requests_per_minute,
+                settings.llm_tokens_per_minute,
+                settings.llm_rate_limit_max_wait_seconds,
+            )
+            if settings.llm_requests_per_minute or settings.llm_tokens_per_minute
+            else None
+        ),
+    )
@@ -6,27 +6,239 @@
 --        - ../database_setup.sql:/docker-entrypoint-initdb.d/database_setup.sql
 
 -- Creates the entries table
+-- ``data`` only holds rows written before work/struggle/intention became
+-- real columns; new rows leave it NULL.
 CREATE TABLE IF NOT EXISTS entries (
     id VARCHAR PRIMARY KEY,
-    data JSONB NOT NULL,
+    work TEXT,
+    struggle TEXT,
+    intention TEXT,
+    data JSONB,
     created_at TIMESTAMP WITH TIME ZONE NOT NULL,
     updated_at TIMESTAMP WITH TIME ZONE NOT NULL
 );
 
+-- Migration: promote work/struggle/intention out of the JSONB column.
+-- Safe to re-run against an existing database (e.g. with ``psql -f``).
+-- The API reads COALESCE(work, data->>'work') etc., so legacy rows keep
+-- working while this backfill runs.
+ALTER TABLE entries ADD COLUMN IF NOT EXISTS work TEXT;
+ALTER TABLE entries ADD COLUMN IF NOT EXISTS struggle TEXT;
+ALTER TABLE entries ADD COLUMN IF NOT EXISTS intention TEXT;
+ALTER TABLE entries ALTER COLUMN data DROP NOT NULL;
+
+UPDATE entries
+SET work = data->>'work',
+    struggle = data->>'struggle',
+    intention = data->>'intention'
+WHERE work IS NULL AND data IS NOT NULL;
+
+-- Once every API instance runs the column-based code, reclaim the space
+-- held by the old JSON copies:
+-- UPDATE entries SET data = NULL WHERE data IS NOT NULL;
+
 -- Creates an index on created_at for faster queries
 CREATE INDEX IF NOT EXISTS idx_entries_created_at ON entries(created_at);
 
+-- Creates an index on updated_at so max(updated_at), used for collection
+-- ETags, is a single index probe; it also serves ``updated_since`` sync queries
+CREATE INDEX IF NOT EXISTS idx_entries_updated_at ON entries(updated_at);
+
 -- Creates an index on the JSON data for faster searches
 CREATE INDEX IF NOT EXISTS idx_entries_data_gin ON entries USING GIN (data);
 
+-- Full-text search document for GET /entries/search, kept in sync by
+-- Postgres itself. Work is weighted above struggle above intention for
+-- ranking; legacy rows are covered through the same fallback to ``data``.
+-- Adding a stored generated column rewrites the table once.
+ALTER TABLE entries ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(work, data->>'work', '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(struggle, data->>'struggle', '')), 'B') ||
+        setweight(to_tsvector('english', COALESCE(intention, data->>'intention', '')), 'C')
+    ) STORED;
+
+-- Creates a GIN index so search matches are found without a table scan
+CREATE INDEX IF NOT EXISTS idx_entries_search ON entries USING GIN (search_vector);
+
+-- Entries created per (UTC) day, so GET /entries/stats reads one row per
+-- day instead of every entry. Kept current by the statement-level triggers
+-- below, which see each INSERT/COPY/DELETE's rows as a transition table and
+-- apply them as one grouped upsert. Entries never change ``created_at``, so
+-- updates need no trigger. ``python -m scripts.rebuild_entry_stats``
+-- recomputes the table from scratch.
+CREATE TABLE IF NOT EXISTS entry_daily_stats (
+    day DATE PRIMARY KEY,
+    entry_count INTEGER NOT NULL CHECK (entry_count >= 0)
+);
+
+CREATE OR REPLACE FUNCTION entry_daily_stats_add() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- Days are upserted in order so concurrent bulk inserts lock them in
+    -- the same order and cannot deadlock.
+    INSERT INTO entry_daily_stats (day, entry_count)
+    SELECT (created_at AT TIME ZONE 'UTC')::date, count(*)
+    FROM new_entries
+    GROUP BY 1
+    ORDER BY 1
+    ON CONFLICT (day)
+        DO UPDATE SET entry_count = entry_daily_stats.entry_count + EXCLUDED.entry_count;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION entry_daily_stats_remove() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    WITH removed AS (
+        SELECT (created_at AT TIME ZONE 'UTC')::date AS day, count(*) AS n
+        FROM old_entries
+        GROUP BY 1
+    )
+    UPDATE entry_daily_stats s
+    SET entry_count = s.entry_count - removed.n
+    FROM removed
+    WHERE s.day = removed.day;
+
+    DELETE FROM entry_daily_stats
+    WHERE entry_count = 0
+      AND day IN (SELECT (created_at AT TIME ZONE 'UTC')::date FROM old_entries);
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE TRIGGER entries_daily_stats_insert
+    AFTER INSERT ON entries
+    REFERENCING NEW TABLE AS new_entries
+    FOR EACH STATEMENT EXECUTE FUNCTION entry_daily_stats_add();
+
+CREATE OR REPLACE TRIGGER entries_daily_stats_delete
+    AFTER DELETE ON entries
+    REFERENCING OLD TABLE AS old_entries
+    FOR EACH STATEMENT EXECUTE FUNCTION entry_daily_stats_remove();
+
+-- Backfill the days of entries that existed before the triggers did.
+INSERT INTO entry_daily_stats (day, entry_count)
+SELECT (created_at AT TIME ZONE 'UTC')::date, count(*)
+FROM entries
+GROUP BY 1
+ON CONFLICT (day) DO NOTHING;
+
+-- Caches LLM analyses by content address: a hash of the entry text, model
+-- and prompt version. Editing an entry changes its hash, so stale results are
+-- never served; rows only go unused and can be pruned by created_at.
+CREATE TABLE IF NOT EXISTS analysis_cache (
+    cache_key CHAR(64) PRIMARY KEY,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    result JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Latest analysis of each entry, so clients can read sentiment and topics
+-- without another LLM call. ``cache_key`` is the analysis_cache key the
+-- result came from, i.e. it identifies the entry text that was analyzed.
+CREATE TABLE IF NOT EXISTS entry_analyses (
+    entry_id VARCHAR PRIMARY KEY REFERENCES entries(id) ON DELETE CASCADE,
+    sentiment TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    topics TEXT[] NOT NULL,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    cache_key CHAR(64) NOT NULL,
+    analyzed_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Serves max(analyzed_at), used in ETags for ?include=analysis listings
+CREATE INDEX IF NOT EXISTS idx_entry_analyses_analyzed_at ON entry_analyses(analyzed_at);
+
+-- Topics of each stored analysis, one row per (entry, topic), so topic
+-- rollups GROUP BY an indexed column instead of unnesting every array.
+-- Topics are lower-cased so "FastAPI" and "fastapi" count together. The
+-- trigger below keeps this table in step with entry_analyses.topics.
+CREATE TABLE IF NOT EXISTS entry_analysis_topics (
+    entry_id VARCHAR NOT NULL REFERENCES entry_analyses(entry_id) ON DELETE CASCADE,
+    topic TEXT NOT NULL,
+    PRIMARY KEY (entry_id, topic)
+);
+
+CREATE INDEX IF NOT EXISTS idx_entry_analysis_topics_topic ON entry_analysis_topics(topic);
+
+CREATE OR REPLACE FUNCTION entry_analysis_topics_sync() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    DELETE FROM entry_analysis_topics WHERE entry_id = NEW.entry_id;
+    INSERT INTO entry_analysis_topics (entry_id, topic)
+    SELECT DISTINCT NEW.entry_id, lower(btrim(topic))
+    FROM unnest(NEW.topics) AS topic
+    WHERE btrim(topic) <> '';
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE TRIGGER entry_analyses_topics_sync
+    AFTER INSERT OR UPDATE OF topics ON entry_analyses
+    FOR EACH ROW EXECUTE FUNCTION entry_analysis_topics_sync();
+
+-- Backfill topics of analyses stored before the trigger existed.
+INSERT INTO entry_analysis_topics (entry_id, topic)
+SELECT DISTINCT a.entry_id, lower(btrim(topic))
+FROM entry_analyses a, unnest(a.topics) AS topic
+WHERE btrim(topic) <> ''
+ON CONFLICT DO NOTHING;
+
+-- Daily rollups behind /analytics/*, bucketed by the UTC day each entry was
+-- written. Dashboards read these instead of joining entries to analyses;
+-- the API refreshes them CONCURRENTLY (which needs the unique indexes) every
+-- ANALYTICS_REFRESH_INTERVAL_SECONDS, so readers are never blocked.
+CREATE MATERIALIZED VIEW IF NOT EXISTS analysis_sentiment_daily AS
+SELECT (e.created_at AT TIME ZONE 'UTC')::date AS day, a.sentiment, count(*) AS entry_count
+FROM entry_analyses a
+JOIN entries e ON e.id = a.entry_id
+GROUP BY 1, 2;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analysis_sentiment_daily
+    ON analysis_sentiment_daily(day, sentiment);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS analysis_topics_daily AS
+SELECT (e.created_at AT TIME ZONE 'UTC')::date AS day, t.topic, count(*) AS entry_count
+FROM entry_analysis_topics t
+JOIN entries e ON e.id = t.entry_id
+GROUP BY 1, 2;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analysis_topics_daily
+    ON analysis_topics_daily(day, topic);
+
+-- Queue of analyses requested with ``?async=true``. Workers claim the oldest
+-- queued job with SELECT ... FOR UPDATE SKIP LOCKED, so any number of API
+-- processes can share the queue without handing the same job out twice.
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    id VARCHAR PRIMARY KEY,
+    entry_id VARCHAR NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+    status TEXT NOT NULL CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+    result JSONB,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- Keeps claiming the next job an index probe however many finished jobs
+-- accumulate
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_queued
+    ON analysis_jobs(created_at) WHERE status = 'queued';
+
 -- Verify the table was created
 \d entries;
 
 -- Test with a sample entry (optional)
--- INSERT INTO entries (id, data, created_at, updated_at) 
+-- INSERT INTO entries (id, work, struggle, intention, created_at, updated_at)
 -- VALUES (
 --     'test-123',
---     '{"work": "Learning SQL", "struggle": "Understanding JSON types", "intention": "Practice more queries"}',
+--     'Learning SQL',
+--     'Understanding JSON types',
+--     'Practice more queries',
 --     NOW(),
 --     NOW()
 -- );
@@ -0,0 +1,109 @@
+"""Micro-benchmark for the asyncpg ``jsonb`` codec registered by the repository.
+
+Compares two ways of moving JSONB between Postgres and Python:
+
+  * ``text + json``:   no codec; values arrive as ``str`` and are parsed
+    with ``json.loads`` (writes pass ``json.dumps`` output), which is what
+    the repository did before ``init_connection`` existed.
+  * ``codec/<lib>``:   connections set up by the app's own
+    ``init_connection``, which uses ``orjson`` when the ``fast`` extra is
+    installed and the standard-library ``json`` otherwise. Run once with and
+    once without the extra to compare the two.
+
+Usage:
+    uv run python -m scripts.bench_jsonb_codec [ROWS]
+
+Runs against ``DATABASE_URL`` using a temporary table, so no application
+data is read or modified.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import Any
+
+import asyncpg
+
+from api.config import get_settings
+from api.repositories import postgres_repository
+from api.repositories.postgres_repository import PostgresDB, init_connection
+
+REPEATS = 5
+
+
+def _payload(i: int) -> dict[str, Any]:
+    now = datetime.now(UTC).isoformat()
+    return {
+        "id": f"bench-{i}",
+        "work": f"Studied FastAPI and built endpoint number {i}",
+        "struggle": "Understanding async/await syntax and when to use it",
+        "intention": "Practice PostgreSQL queries and database design",
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def _best_of(fn: Callable[[], Awaitable[Any]]) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+async def _bench(
+    conn: asyncpg.Connection, payloads: list[dict[str, Any]], encode: Callable[[Any], Any]
+) -> tuple[float, float]:
+    async def write() -> None:
+        await conn.execute("TRUNCATE bench_jsonb")
+        await conn.copy_records_to_table(
+            "bench_jsonb", records=[(encode(p),) for p in payloads], columns=["data"]
+        )
+
+    async def read() -> None:
+        rows = await conn.fetch("SELECT data FROM bench_jsonb")
+        for row in rows:
+            data = row["data"]
+            if isinstance(data, str):
+                data = json.loads(data)
+            assert data["work"]  # noqa: S101
+
+    return await _best_of(write), await _best_of(read)
+
+
+async def main() -> int:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    payloads = [_payload(i) for i in range(rows)]
+    url = get_settings().database_url
+
+    codec = "orjson" if postgres_repository.orjson is not None else "stdlib"
+    variants: list[tuple[str, Callable[[asyncpg.Connection], Awaitable[None]] | None, Any]] = [
+        ("text + json", None, lambda v: json.dumps(v, default=PostgresDB.datetime_serialize)),
+        (f"codec/{codec}", init_connection, lambda v: v),
+    ]
+    if codec == "stdlib":
+        print("orjson not installed; install the 'fast' extra to benchmark it.")
+
+    print(f"{rows} rows, best of {REPEATS}")
+    print(f"{'variant':<14} {'write (s)':>10} {'read (s)':>10}")
+    for name, setup, encode in variants:
+        conn = await asyncpg.connect(url)
+        try:
+            await conn.execute("CREATE TEMP TABLE bench_jsonb (data JSONB NOT NULL)")
+            if setup is not None:
+                await setup(conn)
+            write, read = await _bench(conn, payloads, encode)
+        finally:
+            await conn.close()
+        print(f"{name:<14} {write:>10.3f} {read:>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
@@ -0,0 +1,29 @@
+"""Recompute the ``entry_daily_stats`` table behind ``GET /entries/stats``.
+
+Triggers keep the table current, so this is only needed to repair it, e.g.
+after loading entries with triggers disabled (``pg_restore
+--disable-triggers``) or editing ``created_at`` by hand. Writes to
+``entries`` wait while it runs; reads do not.
+
+Usage:
+    uv run python -m scripts.rebuild_entry_stats
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from api.config import get_settings
+from api.repositories.postgres_repository import PostgresDB
+
+
+async def main() -> int:
+    settings = get_settings()
+    async with PostgresDB(settings.database_url) as db:
+        days = await db.rebuild_entry_stats()
+    print(f"Rebuilt entry stats for {days} days.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
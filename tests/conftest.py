@@ -38,10 +38,12 @@ async def cleanup_database(request):
     database_url = get_settings().database_url
     async with PostgresDB(database_url) as db:
         await db.delete_all_entries()
+        await db.delete_all_cached_analyses()
     yield
     # Clean up after test as well
     async with PostgresDB(database_url) as db:
         await db.delete_all_entries()
+        await db.delete_all_cached_analyses()
 
 
 @pytest.fixture
@@ -61,9 +63,14 @@ async def test_client() -> AsyncGenerator[AsyncClient]:
     """
     Provides an async HTTP client for testing the FastAPI application.
     This client can make requests to the API without starting a server.
+    The app's lifespan is run around the client so shared resources such as
+    the database pool are available exactly as they are in production.
     """
     transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as client:
+    async with (
+        app.router.lifespan_context(app),
+        AsyncClient(transport=transport, base_url="http://test") as client,
+    ):
         yield client
 
 
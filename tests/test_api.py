@@ -10,10 +10,37 @@ These tests verify that the API endpoints work correctly, including:
 - Error handling (404, validation errors, etc.)
 """
 
+import asyncio
+import csv
+import io
+import json
 from unittest.mock import patch
 
+import httpx
+import openai
 from httpx import AsyncClient
 
+from api.config import get_settings
+from api.main import app
+from api.repositories.postgres_repository import PostgresDB
+from api.services.rate_limit import RateLimiter
+from api.services.resilience import CircuitBreaker, ProviderGuard
+
+
+class TestConnectionPool:
+    """Tests for the lifespan-managed database pool."""
+
+    async def test_requests_share_app_pool(self, test_client: AsyncClient, sample_entry_data: dict):
+        """Requests borrow the app pool instead of opening and closing their own."""
+        pool = app.state.db_pool
+
+        await test_client.post("/entries", json=sample_entry_data)
+        response = await test_client.get("/entries")
+
+        assert response.status_code == 200
+        assert app.state.db_pool is pool
+        assert not pool.is_closing()
+
 
 class TestCreateEntry:
     """Tests for POST /entries endpoint."""
@@ -63,6 +90,59 @@ class TestCreateEntry:
         assert response.status_code == 422
 
 
+class TestBulkCreateEntries:
+    """Tests for POST /entries/bulk."""
+
+    async def test_bulk_json_array(self, test_client: AsyncClient, sample_entry_data: dict):
+        """A JSON array is stored in one go and each item gets an id."""
+        items = [{**sample_entry_data, "work": f"Work item {i}"} for i in range(150)]
+
+        response = await test_client.post("/entries/bulk", json=items)
+
+        assert response.status_code == 201
+        result = response.json()
+        assert result["created"] == 150
+        assert result["failed"] == 0
+        assert all("id" in item for item in result["results"])
+
+        listed = (await test_client.get("/entries")).json()
+        assert listed["count"] == 150
+
+    async def test_bulk_ndjson_reports_invalid_items(
+        self, test_client: AsyncClient, sample_entry_data: dict
+    ):
+        """Invalid NDJSON lines are reported by index while valid ones are created."""
+        lines = [
+            json.dumps(sample_entry_data),
+            json.dumps({"work": "missing fields"}),
+            "{not json",
+            json.dumps({**sample_entry_data, "work": "second"}),
+        ]
+
+        response = await test_client.post(
+            "/entries/bulk",
+            content="\n".join(lines) + "\n",
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert response.status_code == 201
+        result = response.json()
+        assert result["created"] == 2
+        assert result["failed"] == 2
+        assert [("id" in item) for item in result["results"]] == [True, False, False, True]
+
+        listed = (await test_client.get("/entries")).json()
+        assert sorted(e["work"] for e in listed["entries"]) == sorted(
+            [sample_entry_data["work"], "second"]
+        )
+
+    async def test_bulk_rejects_non_array(self, test_client: AsyncClient):
+        """A JSON body that is not an array returns 400."""
+        response = await test_client.post("/entries/bulk", json={"work": "x"})
+
+        assert response.status_code == 400
+
+
 class TestGetAllEntries:
     """Tests for GET /entries endpoint."""
 
@@ -109,6 +189,379 @@ class TestGetAllEntries:
         assert len(result["entries"]) == 3
 
 
+class TestMetrics:
+    """Tests for GET /metrics."""
+
+    async def test_entry_cache_counters(self, test_client: AsyncClient, created_entry: dict):
+        """Entry cache hits and misses are exposed."""
+        await test_client.post("/entries/batch-get", json={"ids": [created_entry["id"]]})
+
+        response = await test_client.get("/metrics")
+
+        assert response.status_code == 200
+        stats = response.json()["entry_cache"]
+        assert set(stats) >= {"hits", "misses", "evictions", "size"}
+        assert stats["hits"] == 1
+
+
+class TestPaginatedEntries:
+    """Tests for cursor pagination on GET /entries."""
+
+    async def _create_entries(self, test_client: AsyncClient, sample_entry_data: dict, n: int):
+        for i in range(n):
+            entry_data = sample_entry_data.copy()
+            entry_data["work"] = f"Work item {i}"
+            await test_client.post("/entries", json=entry_data)
+
+    async def test_walk_forward_and_back(self, test_client: AsyncClient, sample_entry_data: dict):
+        """Following next_cursor visits every entry once; prev_cursor walks back."""
+        await self._create_entries(test_client, sample_entry_data, 5)
+
+        first = (await test_client.get("/entries", params={"limit": 2})).json()
+        assert [e["work"] for e in first["entries"]] == ["Work item 0", "Work item 1"]
+        assert first["total"] == 5
+        assert first["prev_cursor"] is None
+
+        second = (
+            await test_client.get("/entries", params={"limit": 2, "after": first["next_cursor"]})
+        ).json()
+        assert [e["work"] for e in second["entries"]] == ["Work item 2", "Work item 3"]
+
+        third = (
+            await test_client.get("/entries", params={"limit": 2, "after": second["next_cursor"]})
+        ).json()
+        assert [e["work"] for e in third["entries"]] == ["Work item 4"]
+        assert third["next_cursor"] is None
+
+        back = (
+            await test_client.get("/entries", params={"limit": 2, "before": third["prev_cursor"]})
+        ).json()
+        assert [e["work"] for e in back["entries"]] == ["Work item 2", "Work item 3"]
+
+    async def test_total_can_be_disabled(self, test_client: AsyncClient, created_entry: dict):
+        """include_total=false skips the count query."""
+        with patch.object(
+            PostgresDB, "get_entries_summary", autospec=True, side_effect=AssertionError
+        ):
+            response = await test_client.get(
+                "/entries", params={"limit": 10, "include_total": False}
+            )
+
+        assert response.status_code == 200
+        assert "total" not in response.json()
+
+    async def test_page_etag(
+        self, test_client: AsyncClient, created_entry: dict, sample_entry_data: dict
+    ):
+        """A page revalidates until one of its rows changes, without a count query."""
+        params = {"limit": 10, "include_total": False}
+        etag = (await test_client.get("/entries", params=params)).headers["etag"]
+
+        with patch.object(
+            PostgresDB, "get_entries_summary", autospec=True, side_effect=AssertionError
+        ):
+            unchanged = await test_client.get(
+                "/entries", params=params, headers={"If-None-Match": etag}
+            )
+        assert unchanged.status_code == 304
+
+        await test_client.patch(f"/entries/{created_entry['id']}", json={"work": "Updated"})
+        changed = await test_client.get("/entries", params=params, headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+
+    async def test_invalid_cursor(self, test_client: AsyncClient):
+        """A malformed cursor returns 400."""
+        response = await test_client.get("/entries", params={"after": "not-a-cursor"})
+
+        assert response.status_code == 400
+
+
+class TestFilteredEntries:
+    """Tests for the date filters and sort order on GET /entries."""
+
+    async def _create_entries(self, test_client: AsyncClient, sample_entry_data: dict, n: int):
+        entries = []
+        for i in range(n):
+            response = await test_client.post(
+                "/entries", json={**sample_entry_data, "work": f"Work item {i}"}
+            )
+            entries.append(response.json()["entry"])
+        return entries
+
+    async def test_created_range(self, test_client: AsyncClient, sample_entry_data: dict):
+        """created_after is inclusive and created_before exclusive."""
+        entries = await self._create_entries(test_client, sample_entry_data, 4)
+
+        params = {
+            "created_after": entries[1]["created_at"],
+            "created_before": entries[3]["created_at"],
+        }
+        response = await test_client.get("/entries", params=params)
+        paged = await test_client.get("/entries", params={**params, "limit": 10})
+
+        assert [e["work"] for e in response.json()["entries"]] == ["Work item 1", "Work item 2"]
+        assert paged.json()["total"] == 2
+
+    async def test_updated_since(self, test_client: AsyncClient, sample_entry_data: dict):
+        """Only entries changed since the given time are returned."""
+        entries = await self._create_entries(test_client, sample_entry_data, 3)
+        updated = await test_client.patch(
+            f"/entries/{entries[0]['id']}", json={"struggle": "Changed"}
+        )
+
+        response = await test_client.get(
+            "/entries", params={"updated_since": updated.json()["updated_at"]}
+        )
+
+        assert [e["id"] for e in response.json()["entries"]] == [entries[0]["id"]]
+
+    async def test_descending_pages(self, test_client: AsyncClient, sample_entry_data: dict):
+        """order=desc lists the newest first, and cursors walk in that order."""
+        await self._create_entries(test_client, sample_entry_data, 5)
+
+        first = (await test_client.get("/entries", params={"limit": 2, "order": "desc"})).json()
+        second = (
+            await test_client.get(
+                "/entries", params={"limit": 2, "order": "desc", "after": first["next_cursor"]}
+            )
+        ).json()
+        back = (
+            await test_client.get(
+                "/entries", params={"limit": 2, "order": "desc", "before": second["prev_cursor"]}
+            )
+        ).json()
+
+        assert [e["work"] for e in first["entries"]] == ["Work item 4", "Work item 3"]
+        assert [e["work"] for e in second["entries"]] == ["Work item 2", "Work item 1"]
+        assert [e["work"] for e in back["entries"]] == ["Work item 4", "Work item 3"]
+
+    async def test_invalid_filter(self, test_client: AsyncClient):
+        response = await test_client.get("/entries", params={"created_after": "last week"})
+
+        assert response.status_code == 422
+
+
+class TestSparseFieldsets:
+    """Tests for the fields= projection on entry reads."""
+
+    async def test_list_returns_only_requested_fields(
+        self, test_client: AsyncClient, created_entry: dict
+    ):
+        response = await test_client.get("/entries", params={"fields": "id,created_at,work"})
+
+        assert response.status_code == 200
+        assert response.json()["entries"] == [
+            {
+                "id": created_entry["id"],
+                "work": created_entry["work"],
+                "created_at": created_entry["created_at"],
+            }
+        ]
+
+    async def test_paging_works_without_key_fields(
+        self, test_client: AsyncClient, sample_entry_data: dict
+    ):
+        """Cursors still work when the projection leaves out created_at and id."""
+        for i in range(3):
+            await test_client.post("/entries", json={**sample_entry_data, "work": f"Item {i}"})
+
+        first = (await test_client.get("/entries", params={"limit": 2, "fields": "work"})).json()
+        second = (
+            await test_client.get(
+                "/entries", params={"limit": 2, "fields": "work", "after": first["next_cursor"]}
+            )
+        ).json()
+
+        assert first["entries"] == [{"work": "Item 0"}, {"work": "Item 1"}]
+        assert second["entries"] == [{"work": "Item 2"}]
+
+    async def test_single_entry_projection(self, test_client: AsyncClient, created_entry: dict):
+        """A projection has its own ETag and does not leak into later full reads."""
+        url = f"/entries/{created_entry['id']}"
+
+        partial = await test_client.get(url, params={"fields": "struggle"})
+        full = await test_client.get(url)
+
+        assert partial.json() == {"struggle": created_entry["struggle"]}
+        assert partial.headers["ETag"] != full.headers["ETag"]
+        assert full.json()["work"] == created_entry["work"]
+
+        revalidated = await test_client.get(
+            url, params={"fields": "struggle"}, headers={"If-None-Match": partial.headers["ETag"]}
+        )
+        assert revalidated.status_code == 304
+
+    async def test_unknown_field(self, test_client: AsyncClient, created_entry: dict):
+        response = await test_client.get("/entries", params={"fields": "id,password"})
+
+        assert response.status_code == 400
+
+
+class TestEntryStats:
+    """Tests for GET /entries/stats."""
+
+    async def test_stats(self, test_client: AsyncClient, created_entry: dict):
+        response = await test_client.get("/entries/stats", params={"period": "week"})
+
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["total_entries"] == 1
+        assert stats["first_entry_at"] == stats["last_entry_at"]
+        assert stats["current_streak"] == 1
+        assert stats["period"] == "week"
+        assert [c["count"] for c in stats["counts"]] == [1]
+
+    async def test_empty_range(self, test_client: AsyncClient, created_entry: dict):
+        response = await test_client.get("/entries/stats", params={"until": "2000-01-01"})
+
+        assert response.json()["counts"] == []
+        assert response.json()["total_entries"] == 1
+
+
+class TestSearchEntries:
+    """Tests for GET /entries/search."""
+
+    async def _create(self, test_client: AsyncClient, sample_entry_data: dict, **fields):
+        response = await test_client.post("/entries", json={**sample_entry_data, **fields})
+        return response.json()["entry"]
+
+    async def test_ranked_and_highlighted(self, test_client: AsyncClient, sample_entry_data: dict):
+        """Matches in work rank above matches in intention; terms are highlighted."""
+        in_work = await self._create(
+            test_client, sample_entry_data, work="Tuned the autovacuum settings"
+        )
+        in_intention = await self._create(
+            test_client, sample_entry_data, intention="Read about autovacuum tuning"
+        )
+        await self._create(test_client, sample_entry_data, work="Wrote unit tests")
+
+        response = await test_client.get("/entries/search", params={"q": "autovacuum"})
+
+        assert response.status_code == 200
+        result = response.json()
+        assert [e["id"] for e in result["entries"]] == [in_work["id"], in_intention["id"]]
+        assert result["entries"][0]["rank"] > result["entries"][1]["rank"]
+        assert "<mark>autovacuum</mark>" in result["entries"][0]["highlights"]["work"]
+        assert result["next_cursor"] is None
+
+    async def test_highlights_escape_entry_text(
+        self, test_client: AsyncClient, sample_entry_data: dict
+    ):
+        """Only the <mark> tags in highlights are HTML; the entry text is escaped."""
+        await self._create(
+            test_client,
+            sample_entry_data,
+            work="Tuned autovacuum <img src=x onerror=alert(1)> & more",
+        )
+
+        response = await test_client.get("/entries/search", params={"q": "autovacuum"})
+
+        highlight = response.json()["entries"][0]["highlights"]["work"]
+        assert (
+            highlight
+            == "Tuned <mark>autovacuum</mark> &lt;img src=x onerror=alert(1)&gt; &amp; more"
+        )
+
+    async def test_walk_pages(self, test_client: AsyncClient, sample_entry_data: dict):
+        """Following next_cursor visits every match once."""
+        for i in range(5):
+            await self._create(test_client, sample_entry_data, work=f"Deploy number {i}")
+
+        seen: list[str] = []
+        params = {"q": "deploy", "limit": 2}
+        while True:
+            page = (await test_client.get("/entries/search", params=params)).json()
+            seen.extend(e["id"] for e in page["entries"])
+            if page["next_cursor"] is None:
+                break
+            params["after"] = page["next_cursor"]
+
+        assert len(seen) == len(set(seen)) == 5
+
+    async def test_web_search_syntax(self, test_client: AsyncClient, sample_entry_data: dict):
+        """Excluded words and unbalanced quotes are accepted, not syntax errors."""
+        await self._create(test_client, sample_entry_data, work="Fixed the flaky build")
+
+        excluded = await test_client.get("/entries/search", params={"q": "build -flaky"})
+        unbalanced = await test_client.get("/entries/search", params={"q": '"flaky build'})
+
+        assert excluded.json()["count"] == 0
+        assert unbalanced.json()["count"] == 1
+
+    async def test_requires_query(self, test_client: AsyncClient):
+        response = await test_client.get("/entries/search")
+
+        assert response.status_code == 422
+
+    async def test_invalid_cursor(self, test_client: AsyncClient):
+        response = await test_client.get(
+            "/entries/search", params={"q": "work", "after": "not-a-cursor"}
+        )
+
+        assert response.status_code == 400
+
+
+class TestExportEntries:
+    """Tests for GET /entries/export."""
+
+    async def test_export_ndjson(self, test_client: AsyncClient, sample_entry_data: dict):
+        """Every entry is streamed as one JSON object per line."""
+        for i in range(3):
+            entry_data = sample_entry_data.copy()
+            entry_data["work"] = f"Work item {i}"
+            await test_client.post("/entries", json=entry_data)
+
+        response = await test_client.get("/entries/export")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["work"] for row in rows] == ["Work item 0", "Work item 1", "Work item 2"]
+        assert all("created_at" in row for row in rows)
+
+    async def test_export_csv(self, test_client: AsyncClient, created_entry: dict):
+        """format=csv streams a header row followed by one row per entry."""
+        response = await test_client.get("/entries/export", params={"format": "csv"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 1
+        assert rows[0]["id"] == created_entry["id"]
+        assert rows[0]["work"] == created_entry["work"]
+
+    async def test_export_empty(self, test_client: AsyncClient):
+        """An empty journal exports an empty body."""
+        response = await test_client.get("/entries/export")
+
+        assert response.status_code == 200
+        assert response.text == ""
+
+
+class TestBatchGetEntries:
+    """Tests for POST /entries/batch-get."""
+
+    async def test_batch_get_preserves_order(
+        self, test_client: AsyncClient, sample_entry_data: dict
+    ):
+        """Entries come back in request order and unknown ids are reported."""
+        ids = []
+        for i in range(3):
+            entry_data = sample_entry_data.copy()
+            entry_data["work"] = f"Work item {i}"
+            response = await test_client.post("/entries", json=entry_data)
+            ids.append(response.json()["entry"]["id"])
+
+        requested = [ids[2], "missing-id", ids[0], ids[2]]
+        response = await test_client.post("/entries/batch-get", json={"ids": requested})
+
+        assert response.status_code == 200
+        result = response.json()
+        assert [e["id"] for e in result["entries"]] == [ids[2], ids[0]]
+        assert [e["work"] for e in result["entries"]] == ["Work item 2", "Work item 0"]
+        assert result["missing"] == ["missing-id"]
+
+
 class TestGetSingleEntry:
     """Tests for GET /entries/{entry_id} endpoint."""
 
@@ -130,6 +583,98 @@ class TestGetSingleEntry:
         assert response.status_code == 404
 
 
+class TestConditionalRequests:
+    """Tests for ETag / Last-Modified handling on entry endpoints."""
+
+    async def test_get_entry_if_none_match(self, test_client: AsyncClient, created_entry: dict):
+        """A matching If-None-Match returns 304 with no body."""
+        url = f"/entries/{created_entry['id']}"
+        first = await test_client.get(url)
+        etag = first.headers["etag"]
+
+        response = await test_client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    async def test_get_entry_if_modified_since(self, test_client: AsyncClient, created_entry: dict):
+        """An If-Modified-Since at or after Last-Modified returns 304."""
+        url = f"/entries/{created_entry['id']}"
+        first = await test_client.get(url)
+
+        response = await test_client.get(
+            url, headers={"If-Modified-Since": first.headers["last-modified"]}
+        )
+
+        assert response.status_code == 304
+
+    async def test_etag_changes_after_update(self, test_client: AsyncClient, created_entry: dict):
+        """An ETag from before a PATCH no longer matches."""
+        url = f"/entries/{created_entry['id']}"
+        etag = (await test_client.get(url)).headers["etag"]
+        await test_client.patch(url, json={"work": "Updated work"})
+
+        response = await test_client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()["work"] == "Updated work"
+
+    async def test_collection_etag(
+        self, test_client: AsyncClient, created_entry: dict, sample_entry_data: dict
+    ):
+        """GET /entries revalidates until the collection changes."""
+        etag = (await test_client.get("/entries")).headers["etag"]
+
+        unchanged = await test_client.get("/entries", headers={"If-None-Match": etag})
+        assert unchanged.status_code == 304
+
+        await test_client.post("/entries", json=sample_entry_data)
+        changed = await test_client.get("/entries", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.json()["count"] == 2
+
+    async def test_patch_if_match(self, test_client: AsyncClient, created_entry: dict):
+        """PATCH applies with the current ETag and fails with a stale one."""
+        url = f"/entries/{created_entry['id']}"
+        etag = (await test_client.get(url)).headers["etag"]
+
+        ok = await test_client.patch(url, json={"work": "First"}, headers={"If-Match": etag})
+        assert ok.status_code == 200
+        assert ok.headers["etag"] != etag
+
+        stale = await test_client.patch(url, json={"work": "Second"}, headers={"If-Match": etag})
+        assert stale.status_code == 412
+        assert (await test_client.get(url)).json()["work"] == "First"
+
+    async def test_if_match_accepts_representation_etags(
+        self, test_client: AsyncClient, created_entry: dict
+    ):
+        """ETags from ?fields= and ?include=analysis responses work as If-Match."""
+        url = f"/entries/{created_entry['id']}"
+        projected = (await test_client.get(url, params={"fields": "work"})).headers["etag"]
+        with_analysis = (await test_client.get(url, params={"include": "analysis"})).headers["etag"]
+
+        ok = await test_client.patch(url, json={"work": "First"}, headers={"If-Match": projected})
+        assert ok.status_code == 200
+
+        stale = await test_client.delete(url, headers={"If-Match": with_analysis})
+        assert stale.status_code == 412
+        current = (await test_client.get(url, params={"include": "analysis"})).headers["etag"]
+        assert (await test_client.delete(url, headers={"If-Match": current})).status_code == 200
+
+    async def test_delete_if_match(self, test_client: AsyncClient, created_entry: dict):
+        """DELETE with a stale ETag is refused and keeps the entry."""
+        url = f"/entries/{created_entry['id']}"
+        etag = (await test_client.get(url)).headers["etag"]
+        await test_client.patch(url, json={"work": "Changed"})
+
+        response = await test_client.delete(url, headers={"If-Match": etag})
+
+        assert response.status_code == 412
+        assert (await test_client.get(url)).status_code == 200
+
+
 class TestUpdateEntry:
     """Tests for PATCH /entries/{entry_id} endpoint."""
 
@@ -156,6 +701,18 @@ class TestUpdateEntry:
 
         assert response.status_code == 404
 
+    async def test_update_rejects_non_string_field(
+        self, test_client: AsyncClient, created_entry: dict
+    ):
+        """Non-string text fields are a client error, not a database error."""
+        entry_id = created_entry["id"]
+
+        response = await test_client.patch(f"/entries/{entry_id}", json={"work": 123})
+
+        assert response.status_code == 422
+        unchanged = (await test_client.get(f"/entries/{entry_id}")).json()
+        assert unchanged["work"] == created_entry["work"]
+
     async def test_update_rejects_oversize_field(
         self, test_client: AsyncClient, created_entry: dict
     ):
@@ -200,6 +757,39 @@ class TestDeleteEntry:
         assert response.status_code == 404
 
 
+class TestBatchDeleteEntries:
+    """Tests for POST /entries/batch-delete."""
+
+    async def test_batch_delete_reports_missing(
+        self, test_client: AsyncClient, sample_entry_data: dict
+    ):
+        """Existing ids are deleted together; unknown ids are reported as missing."""
+        ids = []
+        for i in range(3):
+            entry_data = sample_entry_data.copy()
+            entry_data["work"] = f"Work item {i}"
+            response = await test_client.post("/entries", json=entry_data)
+            ids.append(response.json()["entry"]["id"])
+
+        response = await test_client.post(
+            "/entries/batch-delete", json={"ids": [ids[0], "missing-id", ids[2]]}
+        )
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["deleted"] == [ids[0], ids[2]]
+        assert result["missing"] == ["missing-id"]
+
+        remaining = (await test_client.get("/entries")).json()
+        assert [e["id"] for e in remaining["entries"]] == [ids[1]]
+
+    async def test_batch_delete_requires_ids(self, test_client: AsyncClient):
+        """An empty id list is rejected."""
+        response = await test_client.post("/entries/batch-delete", json={"ids": []})
+
+        assert response.status_code == 422
+
+
 class TestDeleteAllEntries:
     """Tests for DELETE /entries endpoint."""
 
@@ -272,3 +862,515 @@ class TestAnalyzeEntry:
         # Should return a handled error with a JSON detail message
         assert response.status_code == 500
         assert "detail" in response.json()
+
+    @patch("api.routers.journal_router.analyze_journal_entry")
+    async def test_provider_outage_opens_circuit(
+        self, mock_analyze, test_client: AsyncClient, created_entry: dict
+    ):
+        """Provider failures map to 502, then 503 with Retry-After once the circuit opens."""
+        request = httpx.Request("POST", "https://example.invalid/v1/responses")
+        mock_analyze.side_effect = openai.APIConnectionError(request=request)
+        guard = app.state.llm_guard
+        app.state.llm_guard = ProviderGuard(
+            CircuitBreaker(1, 30), max_retries=0, base_delay=0.01, max_delay=0.01
+        )
+        try:
+            first = await test_client.post(f"/entries/{created_entry['id']}/analyze")
+            second = await test_client.post(f"/entries/{created_entry['id']}/analyze")
+        finally:
+            app.state.llm_guard = guard
+
+        assert first.status_code == 502
+        assert second.status_code == 503
+        assert "Retry-After" in second.headers
+        assert mock_analyze.call_count == 1
+
+    @patch("api.routers.journal_router.analyze_journal_entry")
+    async def test_analysis_uses_shared_openai_client(
+        self, mock_analyze, test_client: AsyncClient, created_entry: dict
+    ):
+        """The lifespan-managed client is passed to every analysis."""
+        mock_analyze.return_value = {
+            "entry_id": created_entry["id"],
+            "sentiment": "positive",
+            "summary": "Great progress on learning.",
+            "topics": ["FastAPI", "PostgreSQL"],
+        }
+        client = app.state.openai_client
+
+        await test_client.post(f"/entries/{created_entry['id']}/analyze")
+
+        assert mock_analyze.call_args.kwargs["client"] is client
+        assert not client.is_closed()
+
+    @patch("api.routers.journal_router.analyze_journal_entry")
+    async def test_repeat_analysis_is_served_from_cache(
+        self, mock_analyze, test_client: AsyncClient, created_entry: dict
+    ):
+        """Analyzing unchanged text twice calls the LLM only once."""
+        mock_analyze.return_value = {
+            "entry_id": created_entry["id"],
+            "sentiment": "positive",
+            "summary": "Great progress on learning.",
+            "topics": ["FastAPI", "PostgreSQL"],
+        }
+
+        first = await test_client.post(f"/entries/{created_entry['id']}/analyze")
+        second = await test_client.post(f"/entries/{created_entry['id']}/analyze")
+
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+        assert mock_analyze.call_count == 1
+        metrics = (await test_client.get("/metrics")).json()
+        assert metrics["analysis_cache"]["hits"] == 1
+
+    @patch("api.routers.journal_router.analyze_journal_entry")
+    async def test_editing_entry_invalidates_cached_analysis(
+        self, mock_analyze, test_client: AsyncClient, created_entry: dict
+    ):
+        """Changing the entry text produces a new cache key and a fresh analysis."""
+        mock_analyze.return_value = {
+            "entry_id": created_entry["id"],
+            "sentiment": "neutral",
+            "summary": "An ordinary day.",
+            "topics": ["FastAPI", "PostgreSQL"],
+        }
+        entry_id = created_entry["id"]
+
+        await test_client.post(f"/entries/{entry_id}/analyze")
+        await test_client.patch(f"/entries/{entry_id}", json={"work": "Wrote SQL migrations"})
+        await test_client.post(f"/entries/{entry_id}/analyze")
+
+        assert mock_analyze.call_count == 2
+        assert "Wrote SQL migrations" in mock_analyze.call_args.args[1]
+
+
+class TestAnalyzeBatch:
+    """Tests for POST /entries/analyze-batch."""
+
+    @staticmethod
+    async def _fake_analyze(entry_id: str, entry_text: str, client=None) -> dict:
+        if "fail" in entry_text:
+            raise RuntimeError("model overloaded")
+        return {
+            "entry_id": entry_id,
+            "sentiment": "neutral",
+            "summary": "A day of study.",
+            "topics": ["FastAPI", "PostgreSQL"],
+        }
+
+    async def _create(self, test_client: AsyncClient, sample_entry_data: dict, work: str) -> str:
+        response = await test_client.post("/entries", json={**sample_entry_data, "work": work})
+        return response.json()["entry"]["id"]
+
+    async def test_streams_one_line_per_entry(
+        self, test_client: AsyncClient, sample_entry_data: dict
+    ):
+        """Successes, failures and unknown IDs are each reported on their own line."""
+        ok_id = await self._create(test_client, sample_entry_data, "Built endpoints")
+        failing_id = await self._create(test_client, sample_entry_data, "This one will fail")
+
+        # The packed call returns nothing usable, so every entry falls back to
+        # its own call.
+        with (
+            patch("api.routers.journal_router.analyze_journal_entry", self._fake_analyze),
+            patch("api.routers.journal_router.analyze_journal_entries", return_value={}),
+        ):
+            response = await test_client.post(
+                "/entries/analyze-batch", json={"ids": [ok_id, failing_id, "missing-id"]}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = {line["entry_id"]: line for line in map(json.loads, response.text.splitlines())}
+        assert lines[ok_id]["status"] == "ok"
+        assert lines[ok_id]["analysis"]["topics"] == ["FastAPI", "PostgreSQL"]
+        assert lines[failing_id]["status"] == "error"
+        assert "model overloaded" in lines[failing_id]["error"]
+        assert lines["missing-id"]["status"] == "not_found"
+
+    async def test_entries_are_packed_into_one_call(
+        self, test_client: AsyncClient, sample_entry_data: dict
+    ):
+        """Several uncached entries share a single LLM call."""
+        ids = [
+            await self._create(test_client, sample_entry_data, f"Work item {i}") for i in range(3)
+        ]
+
+        async def fake_batch(entries: list[tuple[str, str]], client=None) -> dict:
+            return {
+                entry_id: await self._fake_analyze(entry_id, text) for entry_id, text in entries
+            }
+
+        with (
+            patch(
+                "api.routers.journal_router.analyze_journal_entries", side_effect=fake_batch
+            ) as batch,
+            patch("api.routers.journal_router.analyze_journal_entry") as single,
+        ):
+            response = await test_client.post("/entries/analyze-batch", json={"ids": ids})
+
+        statuses = {
+            line["entry_id"]: line["status"] for line in map(json.loads, response.text.splitlines())
+        }
+        assert statuses == dict.fromkeys(ids, "ok")
+        assert batch.call_count == 1
+        assert single.call_count == 0
+
+    async def test_selects_entries_by_date_range(
+        self, test_client: AsyncClient, sample_entry_data: dict
+    ):
+        """A created_after/created_before range selects entries instead of IDs."""
+        entry_id = await self._create(test_client, sample_entry_data, "Built endpoints")
+
+        with patch("api.routers.journal_router.analyze_journal_entry", self._fake_analyze):
+            response = await test_client.post(
+                "/entries/analyze-batch", json={"created_after": "2000-01-01T00:00:00Z"}
+            )
+
+        assert response.status_code == 200
+        assert [json.loads(line)["entry_id"] for line in response.text.splitlines()] == [entry_id]
+
+    async def test_too_many_ids_is_rejected(self, test_client: AsyncClient):
+        """The ids path honours ANALYSIS_BATCH_MAX_ITEMS like the date-range path."""
+        settings = get_settings().model_copy(update={"analysis_batch_max_items": 2})
+        app.dependency_overrides[get_settings] = lambda: settings
+        try:
+            response = await test_client.post(
+                "/entries/analyze-batch", json={"ids": ["a", "b", "c"]}
+            )
+        finally:
+            app.dependency_overrides.pop(get_settings)
+
+        assert response.status_code == 413
+
+    async def test_requires_exactly_one_selector(self, test_client: AsyncClient):
+        """IDs and a date range cannot be combined, and one of them is required."""
+        both = await test_client.post(
+            "/entries/analyze-batch",
+            json={"ids": ["a"], "created_after": "2000-01-01T00:00:00Z"},
+        )
+        neither = await test_client.post("/entries/analyze-batch", json={})
+
+        assert both.status_code == 422
+        assert neither.status_code == 422
+
+
+class TestAnalysisJobs:
+    """Tests for ?async=true analysis and GET /jobs/{job_id}."""
+
+    async def _wait_for_job(self, test_client: AsyncClient, location: str) -> dict:
+        for _ in range(100):
+            job = (await test_client.get(location)).json()
+            if job["status"] in ("succeeded", "failed"):
+                return job
+            await asyncio.sleep(0.05)
+        raise AssertionError("job did not finish")
+
+    @patch("api.services.job_service.analyze_journal_entry")
+    async def test_async_analysis_returns_job(
+        self, mock_analyze, test_client: AsyncClient, created_entry: dict
+    ):
+        """The request returns 202 immediately and a worker records the result."""
+        mock_analyze.return_value = {
+            "entry_id": created_entry["id"],
+            "sentiment": "positive",
+            "summary": "Great progress on learning.",
+            "topics": ["FastAPI", "PostgreSQL"],
+        }
+
+        response = await test_client.post(
+            f"/entries/{created_entry['id']}/analyze", params={"async": "true"}
+        )
+
+        assert response.status_code == 202
+        body = response.json()
+        assert body["status"] == "queued"
+        assert response.headers["location"] == f"/jobs/{body['job_id']}"
+        job = await self._wait_for_job(test_client, response.headers["location"])
+        assert job["status"] == "succeeded"
+        assert job["entry_id"] == created_entry["id"]
+        assert job["result"]["sentiment"] == "positive"
+
+    @patch("api.services.job_service.analyze_journal_entry")
+    async def test_failed_job_reports_error(
+        self, mock_analyze, test_client: AsyncClient, created_entry: dict
+    ):
+        """LLM errors end the job as failed with the error message."""
+        mock_analyze.side_effect = Exception("LLM API key is invalid")
+
+        response = await test_client.post(
+            f"/entries/{created_entry['id']}/analyze", params={"async": "true"}
+        )
+        job = await self._wait_for_job(test_client, response.headers["location"])
+
+        assert job["status"] == "failed"
+        assert "LLM API key is invalid" in job["error"]
+
+    async def test_get_job_not_found(self, test_client: AsyncClient):
+        """Unknown job IDs return 404."""
+        response = await test_client.get("/jobs/no-such-job")
+
+        assert response.status_code == 404
+
+
+class TestStoredAnalyses:
+    """Tests for persisted analyses and ?include=analysis."""
+
+    async def _analyze(self, entry_id: str, test_client: AsyncClient) -> None:
+        with patch("api.routers.journal_router.analyze_journal_entry") as mock_analyze:
+            mock_analyze.return_value = {
+                "entry_id": entry_id,
+                "sentiment": "positive",
+                "summary": "Great progress on learning.",
+                "topics": ["FastAPI", "PostgreSQL"],
+            }
+            response = await test_client.post(f"/entries/{entry_id}/analyze")
+        assert response.status_code == 200
+
+    async def test_get_stored_analysis(self, test_client: AsyncClient, created_entry: dict):
+        """The latest analysis is served without calling the LLM again."""
+        entry_id = created_entry["id"]
+        assert (await test_client.get(f"/entries/{entry_id}/analysis")).status_code == 404
+
+        await self._analyze(entry_id, test_client)
+        response = await test_client.get(f"/entries/{entry_id}/analysis")
+
+        assert response.status_code == 200
+        analysis = response.json()
+        assert analysis["entry_id"] == entry_id
+        assert analysis["sentiment"] == "positive"
+        assert analysis["topics"] == ["FastAPI", "PostgreSQL"]
+
+    async def test_include_analysis(
+        self, test_client: AsyncClient, created_entry: dict, sample_entry_data: dict
+    ):
+        """include=analysis embeds the stored analysis, or null when there is none."""
+        await test_client.post("/entries", json=sample_entry_data)
+        await self._analyze(created_entry["id"], test_client)
+
+        listing = (await test_client.get("/entries", params={"include": "analysis"})).json()
+        page = (
+            await test_client.get("/entries", params={"include": "analysis", "limit": 10})
+        ).json()
+        single = (
+            await test_client.get(f"/entries/{created_entry['id']}", params={"include": "analysis"})
+        ).json()
+
+        for entries in (listing["entries"], page["entries"]):
+            analyses = {entry["id"]: entry["analysis"] for entry in entries}
+            assert analyses[created_entry["id"]]["sentiment"] == "positive"
+            assert sorted(analyses.values(), key=bool)[0] is None
+        assert single["analysis"]["summary"] == "Great progress on learning."
+        plain = (await test_client.get(f"/entries/{created_entry['id']}")).json()
+        assert "analysis" not in plain
+
+    async def test_filtered_listing_with_analysis_revalidates(
+        self, test_client: AsyncClient, created_entry: dict, sample_entry_data: dict
+    ):
+        """Analyses of entries outside the filter do not change a filtered listing's ETag."""
+        await self._analyze(created_entry["id"], test_client)
+        later = (await test_client.post("/entries", json=sample_entry_data)).json()["entry"]
+        params = {"include": "analysis", "created_after": later["created_at"]}
+
+        listing = await test_client.get("/entries", params=params)
+        revalidated = await test_client.get(
+            "/entries", params=params, headers={"If-None-Match": listing.headers["ETag"]}
+        )
+
+        assert [entry["id"] for entry in listing.json()["entries"]] == [later["id"]]
+        assert revalidated.status_code == 304
+
+    async def test_editing_text_drops_stored_analysis(
+        self, test_client: AsyncClient, created_entry: dict
+    ):
+        """An analysis of text that was edited away is no longer served."""
+        url = f"/entries/{created_entry['id']}"
+        await self._analyze(created_entry["id"], test_client)
+
+        await test_client.patch(url, json={"work": created_entry["work"]})
+        assert (await test_client.get(f"{url}/analysis")).status_code == 200
+
+        await test_client.patch(url, json={"work": "Rewrote the whole entry"})
+        assert (await test_client.get(f"{url}/analysis")).status_code == 404
+        embedded = (await test_client.get(url, params={"include": "analysis"})).json()
+        assert embedded["analysis"] is None
+
+    async def test_new_analysis_changes_etag(self, test_client: AsyncClient, created_entry: dict):
+        """An entry's ETag with include=analysis changes once it is analyzed."""
+        url = f"/entries/{created_entry['id']}"
+        etag = (await test_client.get(url, params={"include": "analysis"})).headers["etag"]
+
+        await self._analyze(created_entry["id"], test_client)
+        response = await test_client.get(
+            url, params={"include": "analysis"}, headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["analysis"] is not None
+
+
+class TestAnalytics:
+    """Tests for the /analytics rollups over stored analyses."""
+
+    async def _analyze(
+        self, test_client: AsyncClient, entry_id: str, sentiment: str, topics: list[str]
+    ) -> None:
+        with patch("api.routers.journal_router.analyze_journal_entry") as mock_analyze:
+            mock_analyze.return_value = {
+                "entry_id": entry_id,
+                "sentiment": sentiment,
+                "summary": "A day of work.",
+                "topics": topics,
+            }
+            response = await test_client.post(f"/entries/{entry_id}/analyze")
+        assert response.status_code == 200
+
+    async def _create_analyzed(
+        self, test_client: AsyncClient, sample_entry_data: dict
+    ) -> list[dict]:
+        entries = []
+        for i, (sentiment, topics) in enumerate(
+            [("positive", ["FastAPI", "PostgreSQL"]), ("negative", ["fastapi "])]
+        ):
+            response = await test_client.post(
+                "/entries", json={**sample_entry_data, "work": f"Work item {i}"}
+            )
+            entry = response.json()["entry"]
+            await self._analyze(test_client, entry["id"], sentiment, topics)
+            entries.append(entry)
+        return entries
+
+    async def test_sentiment_trend(self, test_client: AsyncClient, sample_entry_data: dict):
+        """Sentiments are counted per day once the rollups are refreshed."""
+        await self._create_analyzed(test_client, sample_entry_data)
+        assert await app.state.analytics_refresher.refresh()
+
+        response = await test_client.get("/analytics/sentiment", params={"period": "week"})
+
+        assert response.status_code == 200
+        buckets = response.json()["buckets"]
+        assert len(buckets) == 1
+        assert buckets[0]["counts"] == {"negative": 1, "positive": 1}
+        assert buckets[0]["total"] == 2
+
+    async def test_top_topics(self, test_client: AsyncClient, sample_entry_data: dict):
+        """Topics are normalized, so differently cased duplicates count together."""
+        entries = await self._create_analyzed(test_client, sample_entry_data)
+        await app.state.analytics_refresher.refresh()
+
+        response = await test_client.get("/analytics/topics", params={"limit": 5})
+
+        assert response.json()["topics"] == [
+            {"topic": "fastapi", "count": 2},
+            {"topic": "postgresql", "count": 1},
+        ]
+
+        # Re-analyzing changed text replaces the entry's topics.
+        await test_client.patch(f"/entries/{entries[0]['id']}", json={"work": "Rewrote it"})
+        await self._analyze(test_client, entries[0]["id"], "neutral", ["Testing"])
+        await app.state.analytics_refresher.refresh()
+        topics = (await test_client.get("/analytics/topics")).json()["topics"]
+
+        assert {t["topic"]: t["count"] for t in topics} == {"fastapi": 1, "testing": 1}
+
+
+class TestStreamingAnalysis:
+    """Tests for POST /entries/{entry_id}/analyze/stream."""
+
+    @staticmethod
+    async def _fake_stream(entry_id: str, entry_text: str, client=None):
+        for delta in ("Great ", "progress."):
+            yield "summary", {"delta": delta}
+        yield (
+            "analysis",
+            {
+                "entry_id": entry_id,
+                "sentiment": "positive",
+                "summary": "Great progress.",
+                "topics": ["FastAPI", "PostgreSQL"],
+            },
+        )
+
+    @staticmethod
+    def _events(body: str) -> list[tuple[str, dict]]:
+        events = []
+        for block in body.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((lines["event"], json.loads(lines["data"])))
+        return events
+
+    async def test_streams_summary_then_analysis(
+        self, test_client: AsyncClient, created_entry: dict
+    ):
+        """Summary deltas arrive as events before the final analysis."""
+        with patch("api.routers.journal_router.stream_journal_entry_analysis", self._fake_stream):
+            response = await test_client.post(f"/entries/{created_entry['id']}/analyze/stream")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = self._events(response.text)
+        assert events[:2] == [("summary", {"delta": "Great "}), ("summary", {"delta": "progress."})]
+        event, analysis = events[-1]
+        assert event == "analysis"
+        assert analysis["entry_id"] == created_entry["id"]
+        assert "created_at" in analysis
+
+    async def test_cached_analysis_is_a_single_event(
+        self, test_client: AsyncClient, created_entry: dict
+    ):
+        """Once analyzed, the same text streams back as one analysis event."""
+        url = f"/entries/{created_entry['id']}/analyze/stream"
+        with patch("api.routers.journal_router.stream_journal_entry_analysis", self._fake_stream):
+            await test_client.post(url)
+            response = await test_client.post(url)
+
+        events = self._events(response.text)
+        assert [event for event, _ in events] == ["analysis"]
+
+    async def test_llm_error_is_reported_in_band(
+        self, test_client: AsyncClient, created_entry: dict
+    ):
+        """Errors after the stream starts become an error event."""
+
+        async def failing_stream(entry_id: str, entry_text: str, client=None):
+            raise RuntimeError("LLM API key is invalid")
+            yield  # pragma: no cover
+
+        with patch("api.routers.journal_router.stream_journal_entry_analysis", failing_stream):
+            response = await test_client.post(f"/entries/{created_entry['id']}/analyze/stream")
+
+        event, data = self._events(response.text)[-1]
+        assert event == "error"
+        assert "LLM API key is invalid" in data["detail"]
+
+    async def test_stream_rejected_before_streaming(
+        self, test_client: AsyncClient, created_entry: dict
+    ):
+        """Rate-limited and circuit-open calls fail with a status, not in-band."""
+        limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=0, max_wait=0)
+        assert limiter.try_acquire(0)
+        breaker = CircuitBreaker(1, 30)
+        breaker.record_failure()
+        guard = app.state.llm_guard
+        url = f"/entries/{created_entry['id']}/analyze/stream"
+        try:
+            app.state.llm_guard = ProviderGuard(
+                CircuitBreaker(1, 30), 0, 0.01, 0.01, limiter=limiter
+            )
+            limited = await test_client.post(url)
+            app.state.llm_guard = ProviderGuard(breaker, 0, 0.01, 0.01)
+            open_circuit = await test_client.post(url)
+        finally:
+            app.state.llm_guard = guard
+
+        assert limited.status_code == 429
+        assert "Retry-After" in limited.headers
+        assert open_circuit.status_code == 503
+        assert "Retry-After" in open_circuit.headers
+
+    async def test_stream_entry_not_found(self, test_client: AsyncClient):
+        """Unknown entries return 404 before any event is sent."""
+        response = await test_client.post("/entries/no-such-entry/analyze/stream")
+
+        assert response.status_code == 404
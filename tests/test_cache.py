@@ -0,0 +1,89 @@
+"""
+Tests for the in-process LRU cache used by the service layer.
+"""
+
+import pytest
+
+from api.services.cache import LRUCache
+
+pytestmark = pytest.mark.no_db
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLRUCache:
+    """Tests for the LRUCache class."""
+
+    async def test_hit_and_miss_are_counted(self):
+        """Gets report hits and misses."""
+        cache = LRUCache(max_size=10, ttl_seconds=60)
+
+        await cache.set("a", 1)
+
+        assert await cache.get("a") == 1
+        assert await cache.get("b") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    async def test_peek_does_not_count_or_refresh(self):
+        """Peeks return live values without touching stats or LRU order."""
+        cache = LRUCache(max_size=2, ttl_seconds=60)
+
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        assert await cache.peek("a") == 1
+        assert await cache.peek("c") is None
+        await cache.set("c", 3)
+
+        assert await cache.peek("a") is None
+        assert cache.stats()["hits"] == 0
+        assert cache.stats()["misses"] == 0
+
+    async def test_least_recently_used_is_evicted(self):
+        """Exceeding max_size evicts the least recently used key."""
+        cache = LRUCache(max_size=2, ttl_seconds=60)
+
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")
+        await cache.set("c", 3)
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == 1
+        assert await cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["size"] == 2
+
+    async def test_entries_expire_after_ttl(self):
+        """Values older than the TTL are treated as misses."""
+        clock = FakeClock()
+        cache = LRUCache(max_size=10, ttl_seconds=5, clock=clock)
+
+        await cache.set("a", 1)
+        clock.now = 4.9
+        assert await cache.get("a") == 1
+
+        clock.now = 5.0
+        assert await cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+        assert cache.stats()["size"] == 0
+
+    async def test_delete_and_clear(self):
+        """Deleted and cleared keys are no longer returned."""
+        cache = LRUCache(max_size=10, ttl_seconds=60)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.set("c", 3)
+
+        await cache.delete("a", "missing")
+        assert await cache.get("a") is None
+        assert await cache.get("b") == 2
+
+        await cache.clear()
+        assert await cache.get("c") is None
@@ -8,12 +8,19 @@ Responses API code path is exercised without making a network call.
 """
 
 import json
+from types import SimpleNamespace
 
 import pytest
 from openai.types.responses import Response
 
 from api.models.entry import AnalysisResponse
-from api.services.llm_service import analyze_journal_entry
+from api.services.llm_service import (
+    analyze_journal_entries,
+    analyze_journal_entry,
+    estimate_tokens,
+    pack_entries,
+    stream_journal_entry_analysis,
+)
 
 pytestmark = pytest.mark.no_db
 
@@ -111,3 +118,88 @@ async def test_analyze_entry_returns_valid_analysis_response():
     assert validated.summary
     assert isinstance(validated.topics, list)
     assert len(validated.topics) >= 1
+
+
+class MockStreamingResponses:
+    def __init__(self, chunks: list[str]) -> None:
+        self.chunks = chunks
+        self.create_calls: list[dict] = []
+
+    async def create(self, **kwargs):
+        self.create_calls.append(kwargs)
+
+        async def events():
+            for chunk in self.chunks:
+                yield SimpleNamespace(type="response.output_text.delta", delta=chunk)
+            yield SimpleNamespace(type="response.completed")
+
+        return events()
+
+
+async def test_stream_yields_summary_deltas_then_analysis():
+    chunks = [VALID_ANALYSIS_JSON[i : i + 7] for i in range(0, len(VALID_ANALYSIS_JSON), 7)]
+    client = SimpleNamespace(responses=MockStreamingResponses(chunks))
+
+    events = [
+        event
+        async for event in stream_journal_entry_analysis(
+            "entry-1",
+            SAMPLE_ENTRY_TEXT,
+            client=client,  # type: ignore[arg-type]
+        )
+    ]
+
+    assert client.responses.create_calls[0]["stream"] is True
+    *deltas, (final_event, final) = events
+    assert final_event == "analysis"
+    assert AnalysisResponse.model_validate(final).entry_id == "entry-1"
+    assert all(event == "summary" for event, _ in deltas)
+    assert len(deltas) > 1
+    assert (
+        "".join(data["delta"] for _, data in deltas) == json.loads(VALID_ANALYSIS_JSON)["summary"]
+    )
+
+
+def test_pack_entries_respects_budget_and_max_entries():
+    entries = [(f"entry-{i}", "x" * 400) for i in range(10)]
+
+    by_count = pack_entries(entries, token_budget=100_000, max_entries=4)
+    by_budget = pack_entries(
+        entries, token_budget=estimate_tokens("x" * 1000) + 400, max_entries=10
+    )
+
+    assert [len(pack) for pack in by_count] == [4, 4, 2]
+    assert all(1 <= len(pack) < 10 for pack in by_budget)
+    assert [entry for pack in by_budget for entry in pack] == entries
+
+
+def test_pack_entries_gives_oversized_entry_its_own_pack():
+    entries = [("small", "x"), ("huge", "x" * 100_000), ("small-2", "x")]
+
+    assert pack_entries(entries, token_budget=2_000, max_entries=10) == [
+        [("small", "x")],
+        [("huge", "x" * 100_000)],
+        [("small-2", "x")],
+    ]
+
+
+async def test_analyze_entries_returns_only_parsed_analyses():
+    output = json.dumps(
+        {
+            "analyses": [
+                {**json.loads(VALID_ANALYSIS_JSON), "entry_id": "entry-1"},
+                {"entry_id": "entry-2", "summary": "Missing fields"},
+                {**json.loads(VALID_ANALYSIS_JSON), "entry_id": "not-requested"},
+            ]
+        }
+    )
+    client = MockAsyncOpenAI(_make_response(output))
+
+    result = await analyze_journal_entries(
+        [("entry-1", SAMPLE_ENTRY_TEXT), ("entry-2", SAMPLE_ENTRY_TEXT)],
+        client=client,  # type: ignore[arg-type]
+    )
+
+    assert list(result) == ["entry-1"]
+    assert AnalysisResponse.model_validate(result["entry-1"]).entry_id == "entry-1"
+    assert client.create_calls[0]["text"]["format"]["type"] == "json_schema"
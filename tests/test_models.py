@@ -13,7 +13,7 @@ from datetime import UTC, datetime
 import pytest
 from pydantic import ValidationError
 
-from api.models.entry import AnalysisResponse, Entry, EntryCreate
+from api.models.entry import AnalysisResponse, AnalyzeBatchRequest, Entry, EntryCreate
 
 pytestmark = pytest.mark.no_db
 
@@ -256,3 +256,18 @@ class TestAnalysisResponseModel:
 
         with pytest.raises(ValidationError):
             AnalysisResponse.model_validate(invalid_data)
+
+
+class TestAnalyzeBatchRequestModel:
+    """Tests for the AnalyzeBatchRequest body model."""
+
+    def test_ids_or_range_accepted(self):
+        """Either selector on its own is valid."""
+        assert AnalyzeBatchRequest(ids=["a", "b"]).ids == ["a", "b"]
+        request = AnalyzeBatchRequest(created_before=datetime(2025, 1, 1, tzinfo=UTC))
+        assert request.ids is None
+
+    def test_both_selectors_rejected(self):
+        """Combining IDs with a date range is ambiguous and rejected."""
+        with pytest.raises(ValidationError):
+            AnalyzeBatchRequest(ids=["a"], created_after=datetime(2025, 1, 1, tzinfo=UTC))
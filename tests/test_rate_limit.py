@@ -0,0 +1,112 @@
+"""
+Tests for the client-side LLM rate limiter.
+"""
+
+import asyncio
+
+import pytest
+
+from api.services.rate_limit import RateLimitedError, RateLimiter, TokenBucket
+from api.services.resilience import CircuitBreaker, ProviderGuard
+
+pytestmark = pytest.mark.no_db
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket:
+    def test_refills_at_the_per_minute_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock)
+        bucket.take(60)
+
+        assert bucket.wait_time(1) == 1
+        clock.now = 30
+        assert bucket.wait_time(30) == 0
+        clock.now = 1000
+        assert bucket.wait_time(61) == 1  # never refills beyond capacity
+
+
+class TestRateLimiter:
+    async def test_burst_within_quota_does_not_wait(self):
+        limiter = RateLimiter(requests_per_minute=3, tokens_per_minute=0, max_wait=0)
+
+        for _ in range(3):
+            await limiter.acquire(100)
+
+        with pytest.raises(RateLimitedError) as exc_info:
+            await limiter.acquire(100)
+        assert exc_info.value.retry_after == pytest.approx(20, abs=0.1)
+        assert limiter.stats() == {"acquired": 3, "waiting": 0, "rejected": 1}
+
+    async def test_token_quota_is_enforced(self):
+        clock = FakeClock()
+        limiter = RateLimiter(
+            requests_per_minute=0, tokens_per_minute=1000, max_wait=5, clock=clock
+        )
+
+        await limiter.acquire(900)
+
+        with pytest.raises(RateLimitedError):
+            await limiter.acquire(500)
+        assert not limiter.try_acquire(500)
+        clock.now = 60
+        assert limiter.try_acquire(500)
+
+    async def test_callers_queue_in_arrival_order(self):
+        """Queued callers get capacity in the order they asked for it."""
+        limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=0, max_wait=1)
+        for _ in range(6000):
+            limiter.try_acquire(0)
+        order: list[int] = []
+
+        async def call(i: int) -> None:
+            await limiter.acquire(0)
+            order.append(i)
+
+        await asyncio.gather(*(call(i) for i in range(5)))
+
+        assert order == [0, 1, 2, 3, 4]
+
+    async def test_cancelled_wait_returns_capacity(self):
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=1, tokens_per_minute=0, max_wait=120, clock=clock)
+        await limiter.acquire(0)
+
+        waiter = asyncio.create_task(limiter.acquire(0))
+        await asyncio.sleep(0)
+        assert limiter.stats()["waiting"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        clock.now = 60
+        assert limiter.try_acquire(0)
+
+    async def test_guard_charges_every_attempt(self):
+        """Calls through the guard spend limiter capacity before reaching the provider."""
+        limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=1000, max_wait=0)
+        guard = ProviderGuard(
+            CircuitBreaker(5, 30), max_retries=0, base_delay=0.01, max_delay=0.01, limiter=limiter
+        )
+        calls = 0
+
+        async def analyze(entry_id: str, text: str) -> dict:
+            nonlocal calls
+            calls += 1
+            return {"entry_id": entry_id}
+
+        guarded = guard.wrap(analyze, cost=lambda entry_id, text: len(text))
+        await guarded("a", "x" * 600)
+
+        with pytest.raises(RateLimitedError):
+            await guarded("b", "x" * 600)
+        assert calls == 1
+        assert guard.stats()["rate_limiter"]["rejected"] == 1
+        assert guard.breaker.state == "closed"
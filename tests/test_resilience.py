@@ -0,0 +1,210 @@
+"""
+Tests for the retry, circuit breaker and hedging layer around LLM calls.
+"""
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from api.services.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ProviderGuard,
+    is_provider_failure,
+    retry_after_seconds,
+)
+
+pytestmark = pytest.mark.no_db
+
+REQUEST = httpx.Request("POST", "https://example.invalid/v1/responses")
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _status_error(status: int, headers: dict[str, str] | None = None) -> openai.APIStatusError:
+    response = httpx.Response(status, headers=headers, request=REQUEST)
+    if status == 429:
+        return openai.RateLimitError("rate limited", response=response, body=None)
+    if status >= 500:
+        return openai.InternalServerError("server error", response=response, body=None)
+    return openai.BadRequestError("bad request", response=response, body=None)
+
+
+def _guard(clock: FakeClock | None = None, **kwargs) -> ProviderGuard:
+    clock = clock or FakeClock()
+    options = {"max_retries": 3, "base_delay": 0.001, "max_delay": 0.01, **kwargs}
+    return ProviderGuard(CircuitBreaker(3, 30, clock=clock), clock=clock, **options)
+
+
+class FlakyCall:
+    """Raises the queued errors in order, then succeeds."""
+
+    def __init__(self, *errors: Exception) -> None:
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+class TestFailureClassification:
+    def test_provider_failures_are_retryable(self):
+        assert is_provider_failure(_status_error(429))
+        assert is_provider_failure(_status_error(503))
+        assert is_provider_failure(openai.APIConnectionError(request=REQUEST))
+        assert is_provider_failure(TimeoutError())
+
+    def test_client_errors_are_not_retryable(self):
+        assert not is_provider_failure(_status_error(400))
+        assert not is_provider_failure(ValueError("unparseable output"))
+
+    def test_retry_after_headers_are_read(self):
+        assert retry_after_seconds(_status_error(429, {"retry-after": "2"})) == 2
+        assert retry_after_seconds(_status_error(429, {"retry-after-ms": "1500"})) == 1.5
+        assert retry_after_seconds(_status_error(429)) is None
+        assert retry_after_seconds(ValueError()) is None
+
+
+class TestProviderGuard:
+    async def test_transient_failures_are_retried(self):
+        """Connection errors and 5xx responses are retried until the call succeeds."""
+        guard = _guard()
+        call = FlakyCall(openai.APIConnectionError(request=REQUEST), _status_error(502))
+
+        assert await guard.call(call) == "ok"
+        assert call.calls == 3
+        assert guard.stats()["retries"] == 2
+        assert guard.stats()["circuit_state"] == "closed"
+
+    async def test_client_errors_are_not_retried(self):
+        guard = _guard()
+        call = FlakyCall(_status_error(400))
+
+        with pytest.raises(openai.BadRequestError):
+            await guard.call(call)
+        assert call.calls == 1
+
+    async def test_gives_up_after_max_retries(self):
+        guard = _guard(max_retries=1)
+        call = FlakyCall(_status_error(500), _status_error(500), _status_error(500))
+
+        with pytest.raises(openai.InternalServerError):
+            await guard.call(call)
+        assert call.calls == 2
+
+    async def test_long_retry_after_is_not_waited_out(self):
+        """A Retry-After beyond the max delay fails fast instead of sleeping."""
+        guard = _guard(max_delay=1)
+        call = FlakyCall(_status_error(429, {"retry-after": "60"}))
+
+        with pytest.raises(openai.RateLimitError):
+            await guard.call(call)
+        assert call.calls == 1
+
+    async def test_circuit_opens_and_recovers(self):
+        """Consecutive failures open the circuit; a trial call after the reset closes it."""
+        clock = FakeClock()
+        guard = _guard(clock, max_retries=0)
+        for _ in range(3):
+            with pytest.raises(openai.InternalServerError):
+                await guard.call(FlakyCall(_status_error(500)))
+
+        call = FlakyCall()
+        with pytest.raises(CircuitOpenError) as exc_info:
+            await guard.call(call)
+        assert call.calls == 0
+        assert exc_info.value.retry_after == 30
+        assert guard.stats()["circuit_state"] == "open"
+
+        clock.now = 31
+        assert await guard.call(call) == "ok"
+        assert guard.stats()["circuit_state"] == "closed"
+        assert guard.stats()["circuit_opened"] == 1
+
+    async def test_failed_trial_reopens_circuit(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(1, 30, clock=clock)
+        breaker.record_failure()
+        clock.now = 31
+
+        breaker.before_call()
+        assert breaker.state == "half_open"
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()  # only one trial call at a time
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+
+    async def test_slow_call_is_hedged(self):
+        """Once latencies are known, a call slower than the percentile is duplicated."""
+        guard = _guard(hedge_percentile=50, hedge_min_samples=1)
+        await guard.call(FlakyCall())
+        calls = 0
+
+        async def slow_then_fast() -> str:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(10)
+                return "slow"
+            return "fast"
+
+        assert await guard.call(slow_then_fast) == "fast"
+        assert guard.stats()["hedges"] == 1
+        assert guard.stats()["hedge_wins"] == 1
+
+    async def test_hedged_calls_are_cancelled_with_the_caller(self):
+        """A caller that times out does not leave its provider requests running."""
+        clock = FakeClock()
+        guard = _guard(clock, hedge_percentile=50, hedge_min_samples=1)
+
+        async def one_second() -> None:
+            clock.now += 1
+
+        # Hedging now waits a second, well past the caller's timeout.
+        await guard.call(one_second)
+        cancelled = 0
+
+        async def slow() -> str:
+            nonlocal cancelled
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled += 1
+                raise
+            return "slow"
+
+        with pytest.raises(TimeoutError):
+            await asyncio.wait_for(guard.call(slow), timeout=0.05)
+        await asyncio.sleep(0)
+
+        assert cancelled == 1
+        assert guard.stats()["hedges"] == 0
+
+    async def test_stream_failures_trip_the_breaker(self):
+        guard = _guard(max_retries=0)
+
+        async def failing_stream():
+            yield "summary", {"delta": "Good"}
+            raise _status_error(503)
+
+        stream = guard.wrap_stream(failing_stream)
+        for _ in range(3):
+            with pytest.raises(openai.InternalServerError):
+                async for _event in stream():
+                    pass
+
+        with pytest.raises(CircuitOpenError):
+            async for _event in stream():
+                pass
@@ -5,8 +5,17 @@ These tests verify that the service layer correctly interacts with the database
 and handles business logic properly.
 """
 
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from api.repositories import postgres_repository
 from api.repositories.postgres_repository import PostgresDB
+from api.services.analysis_service import AnalysisService
+from api.services.cache import LRUCache
 from api.services.entry_service import EntryService
+from api.services.job_service import JobService
 
 
 class TestEntryService:
@@ -101,6 +110,29 @@ class TestEntryService:
         assert result["struggle"] == entry_data["struggle"]  # Unchanged
         assert result["intention"] == entry_data["intention"]  # Unchanged
 
+    async def test_concurrent_partial_updates_do_not_clobber(self, test_db: PostgresDB):
+        """Concurrent PATCHes to different fields both persist."""
+        service = EntryService(test_db)
+
+        entry_data = {
+            "id": "test-concurrent",
+            "work": "Original work",
+            "struggle": "Original struggle",
+            "intention": "Original intention",
+        }
+        await service.create_entry(entry_data)
+
+        await asyncio.gather(
+            service.update_entry("test-concurrent", {"work": "New work"}),
+            service.update_entry("test-concurrent", {"intention": "New intention"}),
+        )
+
+        result = await service.get_entry("test-concurrent")
+        assert result is not None
+        assert result["work"] == "New work"
+        assert result["struggle"] == "Original struggle"
+        assert result["intention"] == "New intention"
+
     async def test_update_nonexistent_entry(self, test_db: PostgresDB):
         """Test updating an entry that doesn't exist."""
         service = EntryService(test_db)
@@ -134,6 +166,12 @@ class TestEntryService:
         entry = await service.get_entry("test-delete")
         assert entry is None
 
+    async def test_delete_nonexistent_entry(self, test_db: PostgresDB):
+        """Deleting an entry that doesn't exist reports False."""
+        service = EntryService(test_db)
+
+        assert await service.delete_entry("nonexistent-id") is False
+
     async def test_delete_all_entries(self, test_db: PostgresDB):
         """Test deleting all entries."""
         service = EntryService(test_db)
@@ -158,3 +196,277 @@ class TestEntryService:
         # Verify all are gone
         entries = await service.get_all_entries()
         assert len(entries) == 0
+
+    async def test_get_legacy_json_entry(self, test_db: PostgresDB):
+        """Rows that only carry their text in the legacy ``data`` column still read."""
+        service = EntryService(test_db)
+
+        async with test_db.pool.acquire() as conn:
+            await conn.execute(
+                """
+                INSERT INTO entries (id, data, created_at, updated_at)
+                VALUES ($1, $2, now(), now())
+                """,
+                "test-legacy",
+                {"work": "Legacy work", "struggle": "Legacy struggle", "intention": "Legacy"},
+            )
+
+        result = await service.get_entry("test-legacy")
+
+        assert result is not None
+        assert result["work"] == "Legacy work"
+        assert result["struggle"] == "Legacy struggle"
+        assert result["intention"] == "Legacy"
+
+    async def test_jsonb_values_round_trip_as_python_objects(self, test_db: PostgresDB):
+        """The pool's jsonb codec accepts and returns Python objects, not strings."""
+        payload = {"topics": ["FastAPI", "async"], "score": 1}
+
+        async with test_db.pool.acquire() as conn:
+            result = await conn.fetchval("SELECT $1::jsonb", payload)
+
+        assert result == payload
+
+    async def test_stdlib_codecs_without_orjson(
+        self, test_db: PostgresDB, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Without orjson, json/jsonb still round trip as Python objects."""
+        monkeypatch.setattr(postgres_repository, "orjson", None)
+        payload = {"topics": ["FastAPI", "async"], "at": datetime(2026, 1, 1, tzinfo=UTC)}
+
+        async with test_db.pool.acquire() as conn:
+            await postgres_repository.init_connection(conn)
+            result = await conn.fetchval("SELECT $1::jsonb", payload)
+            # Pooled connections are reused; put the usual codecs back.
+            monkeypatch.undo()
+            await postgres_repository.init_connection(conn)
+
+        assert result == {"topics": ["FastAPI", "async"], "at": "2026-01-01T00:00:00+00:00"}
+
+
+class TestEntryServiceCache:
+    """Tests for EntryService's read-through cache."""
+
+    async def _create(self, service: EntryService, entry_id: str) -> None:
+        await service.create_entry(
+            {
+                "id": entry_id,
+                "work": "Studied FastAPI",
+                "struggle": "Understanding async",
+                "intention": "Practice more",
+            }
+        )
+
+    async def test_get_entry_served_from_cache(self, test_db: PostgresDB):
+        """A cached entry is returned without reading Postgres."""
+        cache = LRUCache(max_size=10, ttl_seconds=60)
+        service = EntryService(test_db, cache=cache)
+        await self._create(service, "test-cached")
+
+        # Remove the row behind the service's back; the cache still answers.
+        async with test_db.pool.acquire() as conn:
+            await conn.execute("DELETE FROM entries WHERE id = $1", "test-cached")
+
+        result = await service.get_entry("test-cached")
+
+        assert result is not None
+        assert result["id"] == "test-cached"
+        assert cache.stats()["hits"] == 1
+
+    async def test_update_refreshes_cache(self, test_db: PostgresDB):
+        """Updates write the new version through to the cache."""
+        cache = LRUCache(max_size=10, ttl_seconds=60)
+        service = EntryService(test_db, cache=cache)
+        await self._create(service, "test-cached")
+        await service.get_entry("test-cached")
+
+        await service.update_entry("test-cached", {"work": "Updated work"})
+        result = await service.get_entry("test-cached")
+
+        assert result is not None
+        assert result["work"] == "Updated work"
+
+    async def test_stale_read_does_not_replace_newer_cached_entry(
+        self, test_db: PostgresDB, monkeypatch: pytest.MonkeyPatch
+    ):
+        """A read that raced an update cannot overwrite the updated cached entry."""
+        cache = LRUCache(max_size=10, ttl_seconds=60)
+        service = EntryService(test_db, cache=cache)
+        await self._create(service, "test-cached")
+        stale = await test_db.get_entry("test-cached")
+        await service.update_entry("test-cached", {"work": "Updated work"})
+
+        async def stale_get_entry(*args, **kwargs):
+            return stale
+
+        # The read bypasses the cache (include_analysis) and returns the row
+        # as it was before the update.
+        monkeypatch.setattr(test_db, "get_entry", stale_get_entry)
+        await service.get_entry("test-cached", include_analysis=True)
+        monkeypatch.undo()
+        result = await service.get_entry("test-cached")
+
+        assert result is not None
+        assert result["work"] == "Updated work"
+
+    async def test_stale_read_does_not_resurrect_deleted_entry(
+        self, test_db: PostgresDB, monkeypatch: pytest.MonkeyPatch
+    ):
+        """A read that raced a delete cannot put the deleted entry back in the cache."""
+        cache = LRUCache(max_size=10, ttl_seconds=60)
+        service = EntryService(test_db, cache=cache)
+        await self._create(service, "test-cached")
+        stale = await test_db.get_entry("test-cached")
+        await service.delete_entry("test-cached")
+
+        async def stale_get_entry(*args, **kwargs):
+            return stale
+
+        monkeypatch.setattr(test_db, "get_entry", stale_get_entry)
+        await service.get_entry("test-cached", include_analysis=True)
+        monkeypatch.undo()
+
+        assert await service.get_entry("test-cached") is None
+        await self._create(service, "test-cached")
+        # The tombstone only blocks versions older than the delete.
+        assert await cache.peek("entry:test-cached") == await test_db.get_entry("test-cached")
+
+    async def test_deletes_invalidate_cache(self, test_db: PostgresDB):
+        """Single, batch and delete-all operations drop cached entries."""
+        cache = LRUCache(max_size=10, ttl_seconds=60)
+        service = EntryService(test_db, cache=cache)
+        for i in range(4):
+            await self._create(service, f"test-{i}")
+
+        await service.delete_entry("test-0")
+        await service.delete_entries(["test-1"])
+        assert await service.get_entry("test-0") is None
+        assert await service.get_entry("test-1") is None
+
+        await service.delete_all_entries()
+        assert await service.get_entry("test-2") is None
+        assert cache.stats()["size"] == 0
+
+    async def test_batch_get_only_fetches_misses(self, test_db: PostgresDB):
+        """Batch reads combine cached entries with one query for the rest."""
+        cache = LRUCache(max_size=10, ttl_seconds=60)
+        service = EntryService(test_db, cache=cache)
+        await self._create(service, "test-a")
+        await self._create(EntryService(test_db), "test-b")
+
+        result = await service.get_entries(["test-b", "test-a"])
+
+        assert [e["id"] for e in result["entries"]] == ["test-b", "test-a"]
+        assert cache.stats()["hits"] == 1
+        assert await cache.get("entry:test-b") is not None
+
+
+class TestAnalysisService:
+    """Tests for AnalysisService's batch fan-out."""
+
+    async def test_analyze_many_caps_concurrency_and_times_out(self, test_db: PostgresDB):
+        """No more than ``concurrency`` analyses run at once; slow ones time out."""
+        in_flight = 0
+        peak = 0
+
+        async def analyzer(entry_id: str, entry_text: str) -> dict:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                await asyncio.sleep(10 if "slow" in entry_text else 0.01)
+            finally:
+                in_flight -= 1
+            return {"sentiment": "neutral", "summary": entry_text, "topics": []}
+
+        service = AnalysisService(test_db, "test-model", analyzer=analyzer)
+        entries = [
+            {
+                "id": f"e{i}",
+                "work": "slow" if i == 0 else f"work {i}",
+                "struggle": "",
+                "intention": "",
+            }
+            for i in range(6)
+        ]
+
+        results = [
+            result
+            async for result in service.analyze_many(entries, concurrency=2, item_timeout=0.5)
+        ]
+
+        assert peak == 2
+        statuses = {result["entry_id"]: result["status"] for result in results}
+        assert statuses.pop("e0") == "error"
+        assert set(statuses.values()) == {"ok"}
+        # The slow entry finishes last instead of holding back the others.
+        assert results[-1]["entry_id"] == "e0"
+
+
+class TestEntryStats:
+    """Tests for the trigger-maintained entry statistics."""
+
+    @staticmethod
+    def _entries(days_ago: list[int]) -> list[dict]:
+        noon = datetime.now(UTC).replace(hour=12, minute=0, second=0, microsecond=0)
+        return [
+            {
+                "id": f"e{i}",
+                "work": "w",
+                "struggle": "s",
+                "intention": "i",
+                "created_at": noon - timedelta(days=days),
+                "updated_at": noon,
+            }
+            for i, days in enumerate(days_ago)
+        ]
+
+    async def test_stats_follow_inserts_and_deletes(self, test_db: PostgresDB):
+        """Bulk inserts and deletes update the per-day counts and streaks."""
+        service = EntryService(test_db)
+        await test_db.create_entries(self._entries([0, 0, 1, 2, 5]))
+
+        stats = await service.get_stats()
+
+        assert stats["total_entries"] == 5
+        assert [c["count"] for c in stats["counts"]] == [1, 1, 1, 2]
+        assert stats["current_streak"] == 3
+        assert stats["longest_streak"] == 3
+
+        await test_db.delete_entries(["e0", "e1"])
+        stats = await service.get_stats()
+
+        # A streak ending yesterday is still current.
+        assert stats["total_entries"] == 3
+        assert len(stats["counts"]) == 3
+        assert stats["current_streak"] == 2
+
+    async def test_rebuild_repairs_drift(self, test_db: PostgresDB):
+        await test_db.create_entries(self._entries([0, 3]))
+        async with test_db.pool.acquire() as conn:
+            await conn.execute("DELETE FROM entry_daily_stats")
+
+        days = await test_db.rebuild_entry_stats()
+
+        stats = await EntryService(test_db).get_stats(period="week")
+        assert days == 2
+        assert stats["total_entries"] == 2
+        assert sum(c["count"] for c in stats["counts"]) == 2
+
+
+class TestJobService:
+    """Tests for the analysis job queue."""
+
+    async def test_concurrent_claims_never_share_a_job(self, test_db: PostgresDB):
+        """SKIP LOCKED hands each queued job to exactly one claimer."""
+        await EntryService(test_db).create_entry(
+            {"id": "job-entry", "work": "Work", "struggle": "Struggle", "intention": "Intent"}
+        )
+        service = JobService(test_db)
+        queued = {(await service.enqueue_analysis("job-entry"))["id"] for _ in range(3)}
+
+        claimed = await asyncio.gather(*(test_db.claim_job() for _ in range(5)))
+
+        claimed_ids = [job["id"] for job in claimed if job is not None]
+        assert sorted(claimed_ids) == sorted(queued)
+        assert all(job["status"] == "running" for job in claimed if job is not None)